@@ -0,0 +1,207 @@
+"""Benchmark the SCCNN layer with the aggregation normalisation on the cocitation datasets.
+
+A training step of SCCNNCustom with `aggr_norm=True` is timed with the
+former implementation of the layer, which densified the Laplacian to compute
+its row sums at every order of every Chebyshev filter and wrote the orders to
+a preallocated tensor, and with the current one, which computes the row sums
+once per batch from the sparse values and stacks the terms of each rank once.
+Each implementation runs in its own process so that the peak memory of one
+does not hide the other's.
+
+Usage:
+    python scripts/benchmarks/benchmark_sccnn.py --datasets Cora CiteSeer PubMed
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+
+import torch
+from torch_geometric.datasets import Planetoid
+
+from topobenchmarkx.nn.backbones.simplicial import SCCNNCustom
+from topobenchmarkx.nn.backbones.simplicial.sccnn import SCCNNLayer
+from topobenchmarkx.transforms.liftings.graph2simplicial import (
+    SimplicialCliqueLifting,
+)
+
+
+class DenseSCCNNLayer(SCCNNLayer):
+    """SCCNN layer with the former Chebyshev convolution and normalisation."""
+
+    def get_aggr_norms(self, laplacian_all):
+        """Skip the precomputation of the normalisations.
+
+        Parameters
+        ----------
+        laplacian_all : tuple of tensors
+            Tuple of Laplacian tensors.
+
+        Returns
+        -------
+        tuple
+            No normalisation for every Laplacian.
+        """
+        return (None,) * len(laplacian_all)
+
+    def _chebyshev_terms(
+        self, conv_operator, conv_order, x, neighborhood_size_inv=None
+    ):
+        """Compute the Chebyshev terms as the former implementation did.
+
+        Parameters
+        ----------
+        conv_operator : torch.sparse
+            Convolution operator.
+        conv_order : int
+            Order of the convolution.
+        x : torch.Tensor
+            Feature tensor.
+        neighborhood_size_inv : torch.Tensor, optional
+            Ignored.
+
+        Returns
+        -------
+        list[torch.Tensor]
+            Terms of order 1 to `conv_order`.
+        """
+
+        def aggr_norm_func(x):
+            neighborhood_size = torch.sum(conv_operator.to_dense(), dim=1)
+            neighborhood_size_inv = 1 / neighborhood_size
+            neighborhood_size_inv[~(torch.isfinite(neighborhood_size_inv))] = 0
+            x = torch.einsum("i,ij->ij ", neighborhood_size_inv, x)
+            x[~torch.isfinite(x)] = 0
+            return x
+
+        num_simplices, num_channels = x.shape
+        X = torch.empty(size=(num_simplices, num_channels, conv_order)).to(
+            x.device
+        )
+        X[:, :, 0] = torch.mm(conv_operator, x)
+        if self.aggr_norm:
+            X[:, :, 0] = aggr_norm_func(X[:, :, 0])
+        for k in range(1, conv_order):
+            X[:, :, k] = torch.mm(conv_operator, X[:, :, k - 1])
+            if self.aggr_norm:
+                X[:, :, k] = aggr_norm_func(X[:, :, k])
+        return list(X.unbind(2))
+
+
+def run(args, name, implementation, queue):
+    """Time the training steps of one implementation on one dataset.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Arguments of the benchmark.
+    name : str
+        Name of the Planetoid dataset.
+    implementation : str
+        Either "before" or "after".
+    queue : multiprocessing.Queue
+        Queue receiving the mean step time in milliseconds and the peak
+        memory growth in MB.
+    """
+    torch.manual_seed(0)
+    data = Planetoid(root=args.root, name=name)[0]
+    data = SimplicialCliqueLifting(complex_dim=3, signed=True)(data)
+    device = torch.device(args.device)
+    x_all = tuple(data[f"x_{rank}"].to(device) for rank in range(3))
+    laplacian_all = tuple(
+        data[key].to(device)
+        for key in [
+            "hodge_laplacian_0",
+            "down_laplacian_1",
+            "up_laplacian_1",
+            "down_laplacian_2",
+            "up_laplacian_2",
+        ]
+    )
+    incidence_all = (data.incidence_1.to(device), data.incidence_2.to(device))
+    in_channels = tuple(x.size(1) for x in x_all)
+    model = SCCNNCustom(
+        in_channels,
+        (args.hidden_channels,) * 3,
+        conv_order=args.conv_order,
+        sc_order=3,
+        aggr_norm=True,
+        update_func="relu",
+        n_layers=args.n_layers,
+    ).to(device)
+    if implementation == "before":
+        for layer in model.layers:
+            layer.__class__ = DenseSCCNNLayer
+
+    def step():
+        out = model(x_all, laplacian_all, incidence_all)
+        sum(x.sum() for x in out).backward()
+
+    if device.type == "cuda":
+        torch.cuda.reset_peak_memory_stats()
+        start_memory = torch.cuda.memory_allocated()
+    else:
+        start_memory = (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        )
+    step()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        step()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+        peak_memory = torch.cuda.max_memory_allocated()
+    else:
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    queue.put(
+        (
+            (time.perf_counter() - start) / args.repeats * 1000,
+            (peak_memory - start_memory) / 2**20,
+        )
+    )
+
+
+def main():
+    """Run the benchmark on the requested cocitation datasets."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--datasets", nargs="+", default=["Cora", "CiteSeer", "PubMed"]
+    )
+    parser.add_argument("--root", default="datasets/graph/cocitation")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--hidden-channels", type=int, default=32)
+    parser.add_argument("--conv-order", type=int, default=2)
+    parser.add_argument("--n-layers", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{'dataset':<10}{'before (ms)':>13}{'after (ms)':>12}{'speedup':>10}"
+        f"{'before (MB)':>13}{'after (MB)':>12}"
+    )
+    for name in args.datasets:
+        results = {}
+        for implementation in ["before", "after"]:
+            queue = context.Queue()
+            process = context.Process(
+                target=run, args=(args, name, implementation, queue)
+            )
+            process.start()
+            results[implementation] = queue.get()
+            process.join()
+        (before, before_memory), (after, after_memory) = (
+            results["before"],
+            results["after"],
+        )
+        print(
+            f"{name:<10}{before:>13.1f}{after:>12.1f}{before / after:>9.2f}x"
+            f"{before_memory:>13.1f}{after_memory:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Benchmark the sparse matrices of a CWN training step on batches of cell complexes.
+
+The sparse matrices are coalesced once at preprocessing time and `collate_fn`
+keeps them coalesced. A training step of CWN is timed on the collated batch
+and on the same matrices without the coalesced flag, as they were batched by
+concatenation. The split of the batch back into data objects is timed with
+the former `torch_sparse.SparseTensor` round trip and with `to_data_list`.
+
+Usage:
+    python scripts/benchmarks/benchmark_sparse_step.py --num-graphs 128 --avg-num-nodes 400
+"""
+
+import argparse
+import time
+
+import torch
+from topomodelx.nn.cell.cwn import CWN
+from torch_geometric.datasets import FakeDataset
+from torch_sparse import SparseTensor
+
+from topobenchmarkx.dataloader import DataloadDataset
+from topobenchmarkx.dataloader.utils import collate_fn, to_data_list
+from topobenchmarkx.transforms.liftings.graph2cell import CellCycleLifting
+
+
+def to_data_list_torch_sparse(batch):
+    """Split a batch through `torch_sparse.SparseTensor`, as done before.
+
+    Parameters
+    ----------
+    batch : torch_geometric.data.Batch
+        The batch of data.
+
+    Returns
+    -------
+    list
+        List of data objects.
+    """
+    batch = batch.clone()
+    for key, value in batch:
+        if isinstance(value, torch.Tensor) and value.is_sparse:
+            batch[key] = SparseTensor.from_torch_sparse_coo_tensor(
+                value.coalesce()
+            )
+    data_list = batch.to_data_list()
+    for data in data_list:
+        for key, value in data:
+            if isinstance(value, SparseTensor):
+                data[key] = value.to_torch_sparse_coo_tensor()
+    return data_list
+
+
+def uncoalesce(batch):
+    """Copy a batch and drop the coalesced flag of its sparse matrices.
+
+    Parameters
+    ----------
+    batch : torch_geometric.data.Batch
+        The batch of data.
+
+    Returns
+    -------
+    torch_geometric.data.Batch
+        The batch, with the same sparse matrices flagged as not coalesced.
+    """
+    batch = batch.clone()
+    for key, value in batch:
+        if isinstance(value, torch.Tensor) and value.is_sparse:
+            batch[key] = torch.sparse_coo_tensor(
+                value.indices(), value.values(), value.shape
+            )
+    return batch
+
+
+def benchmark(fn, repeats):
+    """Time a function, after a warm-up call.
+
+    Parameters
+    ----------
+    fn : callable
+        Function to time.
+    repeats : int
+        Number of timed calls.
+
+    Returns
+    -------
+    float
+        Mean time of a call in milliseconds.
+    """
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    """Run the benchmark on a batch of lifted random graphs."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--num-graphs", type=int, default=128)
+    parser.add_argument("--avg-num-nodes", type=int, default=400)
+    parser.add_argument("--avg-degree", type=float, default=4)
+    parser.add_argument("--channels", type=int, default=32)
+    parser.add_argument("--n-layers", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    dataset = FakeDataset(
+        num_graphs=args.num_graphs,
+        avg_num_nodes=args.avg_num_nodes,
+        avg_degree=args.avg_degree,
+        num_channels=args.channels,
+    )
+    lifting = CellCycleLifting(max_cell_length=10)
+    data_list = []
+    for data in dataset:
+        data = lifting(data)
+        data.x_1 = torch.randn(data.x_1.size(0), args.channels)
+        data.x_2 = torch.randn(data.x_2.size(0), args.channels)
+        data_list.append(data)
+    dataset = DataloadDataset(data_list)
+    batch = collate_fn([dataset[i] for i in range(len(dataset))])
+    model = CWN(
+        args.channels,
+        args.channels,
+        args.channels,
+        args.channels,
+        n_layers=args.n_layers,
+    )
+
+    def step(batch):
+        x_0, x_1, x_2 = model(
+            x_0=batch.x_0,
+            x_1=batch.x_1,
+            x_2=batch.x_2,
+            incidence_1_t=batch.incidence_1.T,
+            adjacency_0=batch.adjacency_1,
+            incidence_2=batch.incidence_2,
+        )
+        (x_0.sum() + x_1.sum() + x_2.sum()).backward()
+
+    print(
+        f"{args.num_graphs} graphs, {batch.x_0.size(0)} nodes, "
+        f"{batch.incidence_1._nnz()} incidence_1 entries"
+    )
+    print(f"{'':<15}{'before (ms)':>13}{'after (ms)':>12}{'speedup':>10}")
+    uncoalesced = uncoalesce(batch)
+    for name, before, after in [
+        ("CWN step", lambda: step(uncoalesced), lambda: step(batch)),
+        (
+            "to_data_list",
+            lambda: to_data_list_torch_sparse(batch),
+            lambda: to_data_list(batch),
+        ),
+    ]:
+        before = benchmark(before, args.repeats)
+        after = benchmark(after, args.repeats)
+        print(
+            f"{name:<15}{before:>13.1f}{after:>12.1f}{before / after:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,16 @@
 import hydra
 import rootutils
 import torch
+import torch_geometric
 
 from topobenchmarkx.data.preprocessor import PreProcessor
-from topobenchmarkx.dataloader import TBXDataloader
-from topobenchmarkx.dataloader.utils import to_data_list
+from topobenchmarkx.dataloader import DataloadDataset, TBXDataloader
+from topobenchmarkx.data.utils import get_hasse_index_key
+from topobenchmarkx.dataloader.utils import DomainData, collate_fn, to_data_list
+from topobenchmarkx.transforms.data_manipulations import HasseGraphExpansion
+from topobenchmarkx.transforms.liftings.graph2simplicial import (
+    SimplicialCliqueLifting,
+)
 
 from omegaconf import OmegaConf
 import os
@@ -121,7 +127,10 @@ class TestCollateFunction:
 
         # assert 0
         batch = next(iter(self.val_dataloader))
-        elems = [self.val_dataset.data_lst[i] for i in range(self.batch_size)]
+        elems = [
+            self.val_dataset.data_lst[i]
+            for i in self.val_dataset.indices()[: self.batch_size]
+        ]
 
         # Check shape
         for key, val in batch:
@@ -165,6 +174,189 @@ class TestCollateFunction:
                         )
 
 
+class TestLazyConnectivity:
+    """Test the connectivity derived on access from batched incidences."""
+
+    def collate(self, graphs, **kwargs):
+        """Lift and collate graphs.
+
+        Parameters
+        ----------
+        graphs : list[torch_geometric.data.Data]
+            The graphs to lift.
+        **kwargs : optional
+            Arguments of the lifting.
+
+        Returns
+        -------
+        torch_geometric.data.Batch
+            The batched lifted graphs.
+        """
+        lifting = SimplicialCliqueLifting(complex_dim=2, **kwargs)
+        dataset = DataloadDataset([lifting(graph) for graph in graphs])
+        return collate_fn([dataset[i] for i in range(len(dataset))])
+
+    def test_derive_on_access(self, simple_graph_0, simple_graph_1):
+        """Test that lazy batches match eager batches.
+
+        Parameters
+        ----------
+        simple_graph_0 : torch_geometric.data.Data
+            A simple graph data object.
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        graphs = [simple_graph_0, simple_graph_1]
+        eager = self.collate(graphs, signed=True)
+        lazy = self.collate(graphs, signed=True, lazy_connectivity=True)
+
+        assert "down_laplacian_1" not in lazy.keys()
+        for key in [
+            "down_laplacian_1",
+            "up_laplacian_1",
+            "hodge_laplacian_2",
+            "adjacency_0",
+        ]:
+            assert torch.equal(
+                getattr(lazy, key).to_dense(), eager[key].to_dense()
+            )
+            assert torch.equal(lazy[key].to_dense(), eager[key].to_dense())
+        # Derived matrices are cached until the incidences change
+        assert lazy.up_laplacian_1 is lazy.up_laplacian_1
+        lazy.incidence_2 = lazy.incidence_2.coalesce() * 2
+        assert torch.equal(
+            lazy.up_laplacian_1.to_dense(),
+            4 * eager.up_laplacian_1.to_dense(),
+        )
+        assert torch.equal(
+            getattr(lazy, "up_adjacency-0").to_dense(),
+            eager.adjacency_0.to_dense(),
+        )
+        assert not hasattr(lazy, "unknown_1")
+        assert len(to_data_list(lazy)) == len(graphs)
+
+
+class TestCollateMatchesBatch:
+    """Test that collate_fn matches batching DomainData objects with PyG."""
+
+    def test_collate(self, simple_graph_0, simple_graph_1):
+        """Test collate_fn against torch_geometric.data.Batch.from_data_list.
+
+        Parameters
+        ----------
+        simple_graph_0 : torch_geometric.data.Data
+            A simple graph data object.
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        lifting = SimplicialCliqueLifting(complex_dim=3)
+        dataset = DataloadDataset(
+            [lifting(graph) for graph in [simple_graph_0, simple_graph_1]]
+        )
+        samples = [dataset[i] for i in range(len(dataset))]
+        batch = collate_fn(samples)
+        expected = torch_geometric.data.Batch.from_data_list(
+            [DomainData(**dict(zip(keys, values))) for values, keys in samples]
+        )
+        expected["batch_0"] = expected.pop("batch")
+        expected["cell_statistics"] = torch.tensor(expected.pop("shape"))
+
+        assert batch.num_graphs == 2
+        assert set(batch.keys()) == set(expected.keys()) | {
+            "batch_1",
+            "batch_2",
+            "batch_3",
+        }
+        for key in expected.keys():
+            if not isinstance(expected[key], torch.Tensor):
+                assert batch[key] == expected[key]
+            elif expected[key].is_sparse:
+                assert batch[key].is_coalesced()
+                assert torch.equal(
+                    batch[key].to_dense(), expected[key].to_dense()
+                )
+            else:
+                assert torch.equal(batch[key], expected[key])
+        for rank in range(1, 4):
+            assert torch.equal(
+                batch[f"batch_{rank}"],
+                torch.repeat_interleave(
+                    torch.arange(2), batch.cell_statistics[:, rank]
+                ),
+            )
+        for data, graph in zip(to_data_list(batch), dataset.data_lst, strict=True):
+            assert torch.equal(data.x_2, graph.x_2)
+            assert torch.equal(
+                data.incidence_2.to_dense(), graph.incidence_2.to_dense()
+            )
+
+    def test_to_data_list(self, simple_graph_0, simple_graph_1):
+        """Test that to_data_list splits the sparse matrices of a batch.
+
+        Parameters
+        ----------
+        simple_graph_0 : torch_geometric.data.Data
+            A simple graph data object.
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        lifting = SimplicialCliqueLifting(complex_dim=3)
+        graphs = [lifting(graph) for graph in [simple_graph_0, simple_graph_1]]
+        for graph in graphs:
+            # Sparse matrix concatenated along the first dimension only
+            graph.sparse_feat = graph.x_1.to_sparse()
+        dataset = DataloadDataset(graphs)
+        batch = collate_fn([dataset[i] for i in range(len(dataset))])
+        incidence_2 = batch.incidence_2
+        keys = list(batch.keys())
+        data_list = to_data_list(batch)
+        # The batch is not modified
+        assert batch.incidence_2 is incidence_2
+        assert list(batch.keys()) == keys
+        for data, graph in zip(data_list, graphs, strict=True):
+            for key, value in graph:
+                if isinstance(value, torch.Tensor) and value.is_sparse:
+                    assert data[key].is_coalesced(), key
+                    assert data[key].shape == value.shape, key
+                    assert torch.equal(
+                        data[key].to_dense(), value.to_dense()
+                    ), key
+
+    def test_hasse_index(self, simple_graph_0, simple_graph_1):
+        """Test that the precomputed Hasse graph indices are offset as the batched matrices.
+
+        Parameters
+        ----------
+        simple_graph_0 : torch_geometric.data.Data
+            A simple graph data object.
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        neighborhoods = ["up_adjacency-0", "down_incidence-2", "up_incidence-1"]
+        lifting = SimplicialCliqueLifting(
+            complex_dim=3, neighborhoods=neighborhoods
+        )
+        expansion = HasseGraphExpansion(neighborhoods=neighborhoods)
+        graphs = [
+            expansion(lifting(graph))
+            for graph in [simple_graph_0, simple_graph_1]
+        ]
+        dataset = DataloadDataset(graphs)
+        samples = [dataset[i] for i in range(len(dataset))]
+        batch = collate_fn(samples)
+        expected = torch_geometric.data.Batch.from_data_list(
+            [DomainData(**dict(zip(keys, values))) for values, keys in samples]
+        )
+        for neighborhood in neighborhoods:
+            key = get_hasse_index_key(neighborhood)
+            assert torch.equal(
+                batch[key], batch[neighborhood].coalesce().indices()
+            )
+            assert torch.equal(batch[key], expected[key])
+            for data, graph in zip(to_data_list(batch), graphs, strict=True):
+                assert torch.equal(data[key], graph[key])
+
+
 if __name__ == "__main__":
     t = TestCollateFunction()
     t.setup_method()
@@ -1,3 +1,4 @@
+import pytest
 import torch
 from torch_geometric.data import Data
 
@@ -8,11 +9,15 @@ class TestDataloadDataset:
 
     def setup_method(self):
         self.data_list = [
-            Data(x=torch.randn(4, 6), edge_index=torch.randint(0, 4, (2, 4))),
             Data(
+                x=torch.randn(4, 6),
+                edge_index=torch.randint(0, 4, (2, 4)),
+                x_1=torch.randn(2, 6),
+            ),
+            Data(
+                x_1=torch.randn(5, 6),
                 x=torch.randn(3, 6),
                 edge_index=torch.randint(0, 3, (2, 3)),
-                x_1=torch.randn(5, 6),
             ),
         ]
         self.dataset = DataloadDataset(self.data_list)
@@ -28,10 +33,33 @@ class TestDataloadDataset:
         for i in range(len(self.data_list)):
             data, keys = self.dataset.get(i)
 
-            expected_keys = list(self.data_list[i].keys())
+            # The values follow the schema of the dataset
+            expected_keys = list(self.data_list[0].keys())
             expected_data = [self.data_list[i][key] for key in expected_keys]
 
             assert keys == expected_keys
 
-        for d, expected in zip(data, expected_data, strict=False):
-            assert torch.equal(d, expected)
+            for d, expected in zip(data, expected_data, strict=True):
+                assert torch.equal(d, expected)
+
+    def test_shared_attrs(self):
+        mask = torch.tensor([1])
+        dataset = DataloadDataset(self.data_list, shared_attrs={"train_mask": mask})
+        data, keys = dataset.get(1)
+        assert keys == list(self.data_list[0].keys()) + ["train_mask"]
+        assert data[-1] is mask
+
+    def test_schema_layout(self):
+        self.data_list[0].incidence_1 = torch.eye(4).to_sparse()
+        self.data_list[1].incidence_1 = torch.eye(3).to_sparse()
+        dataset = DataloadDataset(self.data_list, shared_attrs={"num_classes": 2})
+        schema = dict(zip(dataset.schema, zip(dataset.schema.layouts, dataset.schema.cat_dims)))
+        assert schema["x"] == ("dense", 0)
+        assert schema["edge_index"] == ("dense", -1)
+        assert schema["incidence_1"] == ("sparse", (0, 1))
+        assert schema["num_classes"] == ("scalar", None)
+
+    def test_schema_validation(self):
+        self.data_list.append(Data(x=torch.randn(4, 6), edge_index=torch.randint(0, 4, (2, 4))))
+        with pytest.raises(ValueError):
+            DataloadDataset(self.data_list)
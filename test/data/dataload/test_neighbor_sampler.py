@@ -0,0 +1,131 @@
+"""Test the SubComplexSampler class."""
+
+import pytest
+import torch
+
+from topobenchmarkx.data.utils import get_hasse_index_key
+from topobenchmarkx.dataloader import (
+    DataloadDataset,
+    SubComplexSampler,
+    TBXDataloader,
+)
+from topobenchmarkx.dataloader.neighbor_sampler import get_key_ranks
+from topobenchmarkx.transforms.data_manipulations import HasseGraphExpansion
+from topobenchmarkx.transforms.liftings.graph2simplicial import (
+    SimplicialCliqueLifting,
+)
+
+
+class TestSubComplexSampler:
+    """Test SubComplexSampler."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, simple_graph_1):
+        """Setup the test.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        lifting = SimplicialCliqueLifting(complex_dim=3, signed=True)
+        self.data = lifting(simple_graph_1)
+        self.data.train_mask = torch.tensor([0, 3, 5, 6])
+        self.data.val_mask = torch.tensor([1, 7])
+        self.data.test_mask = torch.tensor([2, 4])
+
+    def test_get_key_ranks(self):
+        """Test get_key_ranks."""
+        assert get_key_ranks("x_2") == (2,)
+        assert get_key_ranks("incidence_0") == (None, 0)
+        assert get_key_ranks("incidence_2") == (1, 2)
+        assert get_key_ranks("hodge_laplacian_1") == (1, 1)
+        assert get_key_ranks("incidence_hyperedges") == (0, "hyperedges")
+        assert get_key_ranks("up_incidence-0") == (1, 0)
+        assert get_key_ranks("2-up_adjacency-0") == (0, 0)
+        assert get_key_ranks("edge_index") is None
+
+    def test_sample(self):
+        """Test that the sampled sub-complex is the one induced by the neighbourhood of the seeds."""
+        sampler = SubComplexSampler(self.data, num_hops=1)
+        seeds = torch.tensor([3, 6])
+        masks = sampler.get_cell_masks(seeds)
+        # Node 3 is adjacent to 2 and 6, and node 6 to 3 and 5
+        assert masks[0].nonzero().view(-1).tolist() == [2, 3, 5, 6]
+        for rank in range(1, 4):
+            # A cell is kept if and only if all its faces are kept
+            incidence = self.data[f"incidence_{rank}"].to_dense().abs()
+            expected = incidence[~masks[rank - 1]].sum(0) == 0
+            assert torch.equal(masks[rank], expected)
+
+        sub = sampler.sample(seeds)
+        index = {rank: mask.nonzero().view(-1) for rank, mask in masks.items()}
+        for key, ranks in sampler.key_ranks.items():
+            expected = self.data[key]
+            expected = expected.to_dense() if expected.is_sparse else expected
+            for dim, rank in enumerate(ranks):
+                if rank is not None:
+                    expected = expected.index_select(dim, index[rank])
+            value = sub[key].to_dense() if sub[key].is_sparse else sub[key]
+            assert torch.equal(value, expected), key
+        assert sub["shape"] == [len(index[rank]) for rank in range(4)]
+        assert sub["edge_index"].max() < len(index[0])
+        assert torch.equal(index[0][sub["train_mask"]], seeds)
+        assert "val_mask" not in sub and "test_mask" not in sub
+
+    def test_sample_hasse_index(self, simple_graph_1):
+        """Test that the Hasse graph indices are restricted to the sampled cells.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        neighborhoods = [
+            "up_adjacency-0",
+            "down_adjacency-1",
+            "up_incidence-1",
+            "down_incidence-2",
+        ]
+        data = SimplicialCliqueLifting(
+            complex_dim=3, neighborhoods=neighborhoods
+        )(simple_graph_1)
+        data = HasseGraphExpansion(neighborhoods=neighborhoods)(data)
+        sampler = SubComplexSampler(data, num_hops=1)
+        # The neighbourhood of node 0 keeps some of the cells of every rank
+        sub = sampler.sample(torch.tensor([0]))
+        for neighborhood in neighborhoods:
+            index = sub[get_hasse_index_key(neighborhood)]
+            matrix = sub[neighborhood].coalesce()
+            assert matrix.shape < data[neighborhood].shape
+            assert (index.max(1).values < torch.tensor(matrix.shape)).all()
+            assert torch.equal(index, matrix.indices())
+
+    def test_seed_rows(self):
+        """Test that the connectivity rows of the seeds are the same as in the whole complex."""
+        sampler = SubComplexSampler(self.data, num_hops=1)
+        seeds = torch.tensor([0, 5])
+        batch = sampler(seeds.tolist())
+        for key in ["hodge_laplacian_0", "adjacency_0"]:
+            expected = torch.sparse.mm(self.data[key], self.data.x_0)[seeds]
+            out = torch.sparse.mm(batch[key], batch.x_0)[batch.train_mask]
+            assert torch.allclose(out, expected)
+        assert torch.equal(batch.y[batch.train_mask], self.data.y[seeds])
+        assert torch.equal(batch.batch_0, torch.zeros_like(batch.batch_0))
+
+    def test_dataloader(self):
+        """Test TBXDataloader with neighbourhood sampling in the transductive setting."""
+        datamodule = TBXDataloader(
+            dataset_train=DataloadDataset([self.data]),
+            batch_size=3,
+            num_hops=2,
+        )
+        for loader, mask_key in [
+            (datamodule.train_dataloader(), "train_mask"),
+            (datamodule.val_dataloader(), "val_mask"),
+            (datamodule.test_dataloader(), "test_mask"),
+        ]:
+            labels = torch.cat([batch.y[batch[mask_key]] for batch in loader])
+            assert sorted(labels.tolist()) == sorted(
+                self.data.y[self.data[mask_key]].tolist()
+            )
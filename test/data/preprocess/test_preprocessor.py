@@ -1,12 +1,16 @@
 """Test the GraphLoader class."""
 
+import os
 from unittest.mock import ANY, MagicMock, patch
 
 import pytest
+import torch
 import torch_geometric
 from omegaconf import DictConfig
 
 from topobenchmarkx.data.preprocessor import PreProcessor
+from topobenchmarkx.data.preprocessor.preprocessor import apply_pre_transform
+from topobenchmarkx.transforms.data_transform import DataTransform
 
 from ..._utils.flow_mocker import FlowMocker
 
@@ -154,3 +158,132 @@ class TestPreProcessor:
         split_params = DictConfig({"learning_setting": "invalid"})
         with pytest.raises(ValueError):
             self.preprocessor.load_dataset_splits(split_params)
+
+
+def test_apply_pre_transform_parallel(simple_graph_0, simple_graph_1):
+    """Test that the parallel pre-transform matches the serial one.
+
+    Parameters
+    ----------
+    simple_graph_0 : torch_geometric.data.Data
+        A simple graph data object.
+    simple_graph_1 : torch_geometric.data.Data
+        A simple graph data object.
+    """
+    pre_transform = DataTransform(
+        transform_name="SimplicialCliqueLifting", complex_dim=2
+    )
+    data_list = [simple_graph_0, simple_graph_1, simple_graph_0]
+
+    serial, serial_times = apply_pre_transform(data_list, pre_transform)
+    parallel, parallel_times = apply_pre_transform(
+        data_list, pre_transform, num_workers=2, chunksize=2
+    )
+
+    assert serial_times.shape == parallel_times.shape == (len(data_list),)
+    assert len(serial) == len(parallel)
+    for data_serial, data_parallel in zip(serial, parallel):
+        assert set(data_serial.keys()) == set(data_parallel.keys())
+        for key in data_serial.keys():
+            value_serial, value_parallel = data_serial[key], data_parallel[key]
+            if isinstance(value_serial, torch.Tensor):
+                if value_serial.is_sparse:
+                    value_serial = value_serial.to_dense()
+                    value_parallel = value_parallel.to_dense()
+                assert torch.equal(value_serial, value_parallel)
+            else:
+                assert value_serial == value_parallel
+
+
+def test_sharded_storage_matches_memory(simple_graph_0, simple_graph_1, tmp_path):
+    """Test that sharded storage serves the same graphs as in-memory storage.
+
+    Parameters
+    ----------
+    simple_graph_0 : torch_geometric.data.Data
+        A simple graph data object.
+    simple_graph_1 : torch_geometric.data.Data
+        A simple graph data object.
+    tmp_path : pathlib.Path
+        Temporary directory.
+    """
+    dataset = torch_geometric.data.InMemoryDataset()
+    dataset.data, dataset.slices = dataset.collate(
+        [simple_graph_0, simple_graph_1, simple_graph_0]
+    )
+    transforms_config = DictConfig(
+        {
+            "lifting": {
+                "transform_name": "SimplicialCliqueLifting",
+                "transform_type": "lifting",
+                "complex_dim": 2,
+            }
+        }
+    )
+    in_memory = PreProcessor(
+        dataset, str(tmp_path / "memory"), transforms_config
+    )
+    sharded = PreProcessor(
+        dataset,
+        str(tmp_path / "sharded"),
+        transforms_config,
+        storage="sharded",
+        shard_size=2,
+    )
+
+    assert sharded.storage is not None
+    assert len(sharded) == len(in_memory) == 3
+    for data_memory, data_sharded in zip(
+        in_memory.data_list, sharded.data_list
+    ):
+        for key in data_memory.keys():
+            value_memory, value_sharded = data_memory[key], data_sharded[key]
+            if isinstance(value_memory, torch.Tensor):
+                assert torch.equal(
+                    value_memory.to_dense(), value_sharded.to_dense()
+                )
+
+    with pytest.raises(ValueError):
+        PreProcessor(
+            dataset, str(tmp_path / "invalid"), transforms_config, storage="x"
+        )
+
+
+def test_content_addressed_processed_dir(simple_graph_0, simple_graph_1, tmp_path):
+    """Test that the processed directory depends on the raw data.
+
+    Parameters
+    ----------
+    simple_graph_0 : torch_geometric.data.Data
+        A simple graph data object.
+    simple_graph_1 : torch_geometric.data.Data
+        A simple graph data object.
+    tmp_path : pathlib.Path
+        Temporary directory.
+    """
+    transforms_config = DictConfig(
+        {
+            "lifting": {
+                "transform_name": "SimplicialCliqueLifting",
+                "transform_type": "lifting",
+                "complex_dim": 2,
+            }
+        }
+    )
+    data_dir = str(tmp_path)
+    first = PreProcessor(simple_graph_0, data_dir, transforms_config)
+    cached = PreProcessor(simple_graph_0, data_dir, transforms_config)
+    other = PreProcessor(simple_graph_1, data_dir, transforms_config)
+
+    assert first.processed_data_dir == cached.processed_data_dir
+    assert first.processed_data_dir != other.processed_data_dir
+    assert os.path.exists(
+        os.path.join(first.processed_data_dir, "cache_key.json")
+    )
+    # Temporary directories are renamed once the processing is complete
+    assert sorted(os.listdir(os.path.join(data_dir, "lifting"))) == sorted(
+        [
+            os.path.basename(first.processed_data_dir),
+            os.path.basename(other.processed_data_dir),
+        ]
+    )
@@ -0,0 +1,150 @@
+"""Test the cache of the pre-transform stages."""
+
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+import torch
+import torch_geometric
+from omegaconf import DictConfig
+
+from topobenchmarkx.data.preprocessor import PreProcessor
+from topobenchmarkx.data.preprocessor.stage_cache import (
+    StageCache,
+    TopologyLiftingStage,
+    main,
+)
+
+
+def lifting_config(feature_lifting):
+    """Return the configuration of a clique lifting.
+
+    Parameters
+    ----------
+    feature_lifting : str
+        Name of the feature lifting.
+
+    Returns
+    -------
+    DictConfig
+        Configuration of the transforms.
+    """
+    return DictConfig(
+        {
+            "lifting": {
+                "transform_name": "SimplicialCliqueLifting",
+                "transform_type": "lifting",
+                "complex_dim": 2,
+                "feature_lifting": feature_lifting,
+            }
+        }
+    )
+
+
+class TestStageCache:
+    """Test the StageCache class."""
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, simple_graph_0, simple_graph_1, tmp_path):
+        """Build a small dataset.
+
+        Parameters
+        ----------
+        simple_graph_0 : torch_geometric.data.Data
+            A simple graph data object.
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        tmp_path : pathlib.Path
+            Temporary directory.
+        """
+        self.dataset = torch_geometric.data.InMemoryDataset()
+        self.dataset.data, self.dataset.slices = self.dataset.collate(
+            [simple_graph_0, simple_graph_1]
+        )
+        self.data_dir = str(tmp_path)
+        self.cache = StageCache(str(tmp_path / "stage_cache"))
+
+    def test_reuse_topology(self):
+        """Test that changing the feature lifting reuses the topology."""
+        PreProcessor(
+            self.dataset,
+            self.data_dir,
+            lifting_config("ProjectionSum"),
+            cache_stages=True,
+        )
+        assert len(self.cache.entries()) == 1
+        assert self.cache.entries()[0]["stages"] == ["lifting.topology"]
+
+        with patch.object(
+            TopologyLiftingStage,
+            "forward",
+            autospec=True,
+            side_effect=TopologyLiftingStage.forward,
+        ) as mock_forward:
+            cached = PreProcessor(
+                self.dataset,
+                self.data_dir,
+                lifting_config("Concatenation"),
+                cache_stages=True,
+            )
+        mock_forward.assert_not_called()
+        assert len(self.cache.entries()) == 1
+
+        uncached = PreProcessor(
+            self.dataset,
+            self.data_dir + "/uncached",
+            lifting_config("Concatenation"),
+            cache_stages=False,
+        )
+        for data_cached, data_uncached in zip(
+            cached.data_list, uncached.data_list, strict=True
+        ):
+            assert set(data_cached.keys()) == set(data_uncached.keys())
+            for key in data_cached.keys():
+                if isinstance(data_cached[key], torch.Tensor):
+                    assert torch.equal(
+                        data_cached[key].to_dense(),
+                        data_uncached[key].to_dense(),
+                    )
+
+    def test_cli(self, capsys):
+        """Test listing and pruning the cache from the command line.
+
+        Parameters
+        ----------
+        capsys : pytest.CaptureFixture
+            Fixture capturing the standard output.
+        """
+        PreProcessor(
+            self.dataset,
+            self.data_dir,
+            lifting_config("ProjectionSum"),
+            cache_stages=True,
+        )
+        key = self.cache.entries()[0]["key"]
+
+        main(["list", self.cache.root])
+        assert key in capsys.readouterr().out
+
+        with pytest.raises(SystemExit):
+            main(["prune", self.cache.root])
+        main(["prune", self.cache.root, "--older-than", "1"])
+        assert len(self.cache.entries()) == 1
+        main(["prune", self.cache.root, "--all"])
+        assert f"Removed {key}" in capsys.readouterr().out
+        assert self.cache.entries() == []
+
+    def test_prune_tmp_dirs(self):
+        """Test that pruning keeps the entries being written by other runs."""
+        os.makedirs(self.cache.root)
+        writing = self.cache.path(".key.tmp-writing")
+        interrupted = self.cache.path(".key.tmp-interrupted")
+        os.makedirs(writing)
+        os.makedirs(interrupted)
+        last_modified = time.time() - self.cache.tmp_grace_period - 1
+        os.utime(interrupted, (last_modified, last_modified))
+
+        self.cache.prune()
+        assert os.path.isdir(writing)
+        assert not os.path.exists(interrupted)
@@ -0,0 +1,74 @@
+"""Test the sharded storage of preprocessed datasets."""
+
+import pytest
+import torch
+
+from topobenchmarkx.data.preprocessor.storage import (
+    LazyDataList,
+    ShardedStorage,
+)
+from topobenchmarkx.transforms.liftings.graph2simplicial import (
+    SimplicialCliqueLifting,
+)
+
+
+class TestShardedStorage:
+    """Test the ShardedStorage class."""
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, simple_graph_0, simple_graph_1, tmp_path):
+        """Write a small lifted dataset to sharded storage.
+
+        Parameters
+        ----------
+        simple_graph_0 : torch_geometric.data.Data
+            A simple graph data object.
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        tmp_path : pathlib.Path
+            Temporary directory.
+        """
+        lifting = SimplicialCliqueLifting(complex_dim=3, signed=True)
+        self.data_list = [
+            lifting(graph.clone())
+            for graph in [simple_graph_0, simple_graph_1] * 3
+        ]
+        self.root = str(tmp_path / "sharded")
+        self.storage = ShardedStorage.write(
+            iter(self.data_list), self.root, shard_size=4
+        )
+
+    def test_write(self):
+        """Test that the shards and the index are written."""
+        assert ShardedStorage.exists(self.root)
+        assert len(self.storage) == len(self.data_list)
+        assert len(self.storage.shard_files) == 2
+
+    def test_get(self):
+        """Test that the stored data objects are recovered."""
+        for idx, data in enumerate(self.data_list):
+            stored = ShardedStorage(self.root).get(idx)
+            assert set(stored.keys()) == set(data.keys())
+            for key in data.keys():
+                if isinstance(data[key], torch.Tensor):
+                    assert torch.equal(
+                        stored[key].to_dense(), data[key].to_dense()
+                    )
+                else:
+                    assert stored[key] == data[key]
+
+        with pytest.raises(IndexError):
+            self.storage.get(len(self.data_list))
+
+    def test_invalid_shard_size(self):
+        """Test that an invalid shard size raises an error."""
+        with pytest.raises(ValueError):
+            ShardedStorage.write(iter(self.data_list), self.root, shard_size=0)
+
+    def test_lazy_data_list(self):
+        """Test the lazy view over the storage."""
+        lazy = LazyDataList(self.storage)
+        assert len(lazy) == len(self.data_list)
+        assert torch.equal(lazy[-1].x_0, self.data_list[-1].x_0)
+        assert len(lazy[1:3]) == 2
+        assert len(list(lazy)) == len(self.data_list)
@@ -1,10 +1,20 @@
 """Unit tests for data utils."""
 
+from types import SimpleNamespace
+
+import networkx as nx
+import numpy as np
 import omegaconf
 import pytest
 import torch_geometric
 import torch
 from topobenchmarkx.data.utils import *
+from topobenchmarkx.data.utils.split_utils import (
+    assing_train_val_test_mask_to_graphs,
+    load_node_partition,
+    split_into_partitions,
+)
+from topobenchmarkx.transforms.liftings.graph2simplicial import SimplicialCliqueLifting
 import toponetx as tnx
 from toponetx.classes import CellComplex
 
@@ -26,6 +36,46 @@ class TestDataUtils:
         out = get_complex_connectivity(self.complex, 2, neighborhoods=self.neighborhoods2)
         assert 'up_laplacian-0' in out.keys()
         
+    def test_get_complex_connectivity_derived(self):
+        """Test the matrices derived from the incidences in get_complex_connectivity."""
+        out = get_complex_connectivity(self.complex, 2, signed=True)
+        for rank in range(3):
+            assert torch.equal(
+                out[f'hodge_laplacian_{rank}'].to_dense(),
+                out[f'up_laplacian_{rank}'].to_dense() + out[f'down_laplacian_{rank}'].to_dense(),
+            )
+        incidence_2 = abs(out['incidence_2'].to_dense())
+        adjacency_1 = incidence_2 @ incidence_2.T
+        adjacency_1.fill_diagonal_(0)
+        assert torch.equal(out['adjacency_1'].to_dense(), adjacency_1)
+
+        # Only the matrices needed by the neighborhoods are computed
+        out = get_complex_connectivity(self.complex, 2, neighborhoods=['up_adjacency-0', 'down_laplacian-1'])
+        assert set(out.keys()) == {'up_adjacency-0', 'down_laplacian-1', 'incidence_0', 'incidence_1', 'incidence_2', 'shape'}
+
+    def test_lazy_connectivity(self):
+        """Test deriving the connectivity from the incidences stored in lazy mode."""
+        eager = get_complex_connectivity(self.complex, 2, signed=True)
+        lazy = get_complex_connectivity(self.complex, 2, signed=True, lazy=True)
+        assert set(lazy.keys()) == {'incidence_0', 'incidence_1', 'incidence_2', 'connectivity_manifest', 'shape'}
+        assert lazy['shape'] == eager['shape']
+
+        connectivity = LazyConnectivity.from_manifest(
+            {rank: lazy[f'incidence_{rank}'] for rank in range(3)}, lazy['connectivity_manifest']
+        )
+        for key in eager:
+            if key != 'shape':
+                assert torch.equal(connectivity[key].to_dense(), eager[key].to_dense())
+        assert 'up_laplacian_1' in connectivity
+
+        # Neighborhoods are derived on access as well
+        out = select_neighborhoods_of_interest(connectivity, self.neighborhoods2)
+        expected = get_complex_connectivity(self.complex, 2, neighborhoods=self.neighborhoods2, signed=True)
+        for key in self.neighborhoods2:
+            assert torch.equal(out[key].to_dense(), expected[key].to_dense())
+        with pytest.raises(KeyError):
+            connectivity['hodge_laplacian_3']
+
     def test_select_neighborhoods_of_interest(self):
         """Test select_neighborhoods_of_interest."""
         connectivity = get_complex_connectivity(self.complex, 2)
@@ -41,7 +91,21 @@ class TestDataUtils:
         out = generate_zero_sparse_connectivity(10, 10)
         assert out.shape == (10, 10)
         assert torch.sum(out) == 0
-        
+
+    def test_transpose_coalesced(self):
+        """Test transpose_coalesced."""
+        matrix = torch.randn(6, 4).relu().to_sparse()
+        out = transpose_coalesced(matrix)
+        assert out.is_coalesced()
+        assert torch.equal(out.to_dense(), matrix.to_dense().T)
+        assert torch.equal(out.indices(), matrix.T.coalesce().indices())
+
+    def test_get_cell_faces(self):
+        """Test get_cell_faces."""
+        incidence = torch.tensor([[1, 0, 1], [1, 1, 0], [0, 1, 1], [0, 0, 1]])
+        assert get_cell_faces(incidence[:3].to_sparse()).tolist() == [[0, 1], [1, 2], [0, 2]]
+        assert get_cell_faces(incidence.to_sparse()).tolist() == [[0, 1, -1], [1, 2, -1], [0, 2, 3]]
+
     def test_load_cell_complex_dataset(self):
         """Test load_cell_complex_dataset."""
         with pytest.raises(NotImplementedError) as e:
@@ -67,6 +131,130 @@ class TestDataUtils:
         objects = ['test', 1, 1.0, [1, 2, 3], {'a': 1, 'b': 2}, set([1, 2, 3]), omegaconf.dictconfig.DictConfig({'a': 1, 'b': 2}), torch_geometric.data.Data()]
         for obj in objects:
             out = ensure_serializable(obj)
+
+    def test_canonicalize_parameters(self):
+        """Test canonicalize_parameters."""
+        params = {'b': [1, 2], 'a': {'y': 1, 'x': set([3, 2])}}
+        reordered = omegaconf.DictConfig({'a': {'x': [2, 3], 'y': 1}, 'b': [1, 2]})
+        assert canonicalize_parameters(params) == canonicalize_parameters(reordered)
+        assert canonicalize_parameters(params) != canonicalize_parameters({'b': [2, 1]})
+
+    def test_get_clique_complex(self):
+        """Test get_clique_complex and get_boundary_matrices."""
+        # Tetrahedron 0-1-2-3 plus the edge 3-4 and a self-loop
+        edge_index = torch.tensor([[0, 0, 0, 1, 1, 2, 3, 4], [1, 2, 3, 2, 3, 3, 4, 4]])
+        simplices = get_clique_complex(edge_index, 5, 3)
+        assert [len(s) for s in simplices] == [5, 7, 4, 1]
+        assert simplices[2].tolist() == [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]
+        boundaries = get_boundary_matrices(simplices)
+        for rank in range(2, 4):
+            product = torch.sparse.mm(boundaries[rank - 1], boundaries[rank])
+            assert torch.all(product.to_dense() == 0)
+
+    def test_get_k_hop_neighborhoods(self):
+        """Test get_k_hop_neighborhoods against k_hop_subgraph."""
+        # Directed path 0-1-2-3, a separate edge 4-5 and an isolated node 6
+        edge_index = torch.tensor([[0, 1, 2, 4], [1, 2, 3, 5]])
+        undirected = torch_geometric.utils.to_undirected(edge_index)
+        for k in range(4):
+            out = get_k_hop_neighborhoods(edge_index, 7, k).to_dense()
+            for node in range(7):
+                neighbors, _, _, _ = torch_geometric.utils.k_hop_subgraph(node, k, undirected, num_nodes=7)
+                expected = torch.zeros(7)
+                expected[neighbors] = 1
+                assert torch.equal(out[node], expected)
+
+    def test_get_cycle_basis(self):
+        """Test get_cycle_basis against networkx.cycle_basis."""
+        # Squares 0-1-2-3 and 1-4-5-2 sharing the edge 1-2, a triangle 6-7-8
+        # and a self-loop on 9
+        edge_index = torch.tensor(
+            [[0, 1, 2, 3, 1, 4, 5, 6, 7, 8, 9], [1, 2, 3, 0, 4, 5, 2, 7, 8, 6, 9]]
+        )
+        graph = nx.Graph()
+        graph.add_nodes_from(range(10))
+        graph.add_edges_from(edge_index.t().tolist())
+        expected = [cycle for cycle in nx.cycle_basis(graph) if len(cycle) != 1]
+        ptr, nodes = get_cycle_basis(edge_index, 10)
+        assert [nodes[ptr[i] : ptr[i + 1]].tolist() for i in range(len(ptr) - 1)] == expected
+        ptr, nodes = get_cycle_basis(edge_index, 10, max_cell_length=3)
+        assert [nodes[ptr[i] : ptr[i + 1]].tolist() for i in range(len(ptr) - 1)] == [
+            cycle for cycle in expected if len(cycle) == 3
+        ]
+
+    def test_assing_train_val_test_mask_to_graphs(self):
+        """Test assing_train_val_test_mask_to_graphs."""
+        data_list = [torch_geometric.data.Data(x=torch.full((2, 1), i)) for i in range(6)]
+        dataset = SimpleNamespace(data_list=data_list)
+        split_idx = {"train": np.array([4, 0, 2]), "valid": np.array([1]), "test": np.array([3, 5])}
+        train, val, test = assing_train_val_test_mask_to_graphs(dataset, split_idx)
+        assert [len(train), len(val), len(test)] == [3, 1, 2]
+        for split, masks in zip([train, val, test], [[1, 0, 0], [0, 1, 0], [0, 0, 1]]):
+            for values, keys in split:
+                sample = dict(zip(keys, values))
+                assert [int(sample[f"{name}_mask"]) for name in ["train", "val", "test"]] == masks
+        assert [int(values[0][0]) for values, _ in train] == [4, 0, 2]
+        # The graphs are not copied nor modified
+        assert train.data_lst is data_list
+        assert "train_mask" not in data_list[0]
+
+        with pytest.raises(ValueError):
+            assing_train_val_test_mask_to_graphs(dataset, {**split_idx, "test": np.array([3])})
+
+    def test_get_node_partition(self):
+        """Test get_node_partition."""
+        # Path 0-...-11 with shuffled labels
+        perm = torch.randperm(12)
+        edge_index = perm[torch.stack([torch.arange(11), torch.arange(1, 12)])]
+        partition = get_node_partition(edge_index, 12, 3)
+        assert torch.bincount(partition).tolist() == [4, 4, 4]
+        # Every part is a sub-path
+        for part in range(3):
+            positions = perm.argsort()[partition == part]
+            assert (positions.max() - positions.min()).item() == 3
+        with pytest.raises(ValueError):
+            get_node_partition(edge_index, 12, 13)
+
+    def test_split_into_partitions(self, simple_graph_1, tmp_path):
+        """Test load_node_partition and split_into_partitions.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        tmp_path : pathlib.Path
+            Temporary directory.
+        """
+        data = SimplicialCliqueLifting(complex_dim=2)(simple_graph_1)
+        data.train_mask = torch.tensor([0, 1, 2, 3])
+        data.val_mask = torch.tensor([4, 5])
+        data.test_mask = torch.tensor([6, 7])
+        parameters = omegaconf.DictConfig({"num_parts": 2, "data_split_dir": str(tmp_path)})
+        partition = load_node_partition(data.edge_index, 8, parameters)
+        assert (tmp_path / "partitions" / "num_parts=2.npy").is_file()
+        assert torch.equal(load_node_partition(None, 8, parameters), partition)
+
+        parts = split_into_partitions(data, partition)
+        assert len(parts) == 2
+        assert sum(part.x_0.shape[0] for part in parts) == 8
+        for part in parts:
+            assert part.train_mask.dtype == torch.bool
+            assert part.shape == [part.x_0.shape[0], part.x_1.shape[0], part.x_2.shape[0]]
+            # Only the cells inside the part are kept
+            assert torch.all(part.incidence_1.to_dense().abs().sum(0) == 2)
+        assert sum(int(part.train_mask.sum()) for part in parts) == 4
+        labels = torch.cat([part.y[part.val_mask] for part in parts])
+        assert sorted(labels.tolist()) == sorted(data.y[data.val_mask].tolist())
+
+    def test_hash_data_list(self):
+        """Test hash_data_list."""
+        data = load_manual_graph()
+        out = hash_data_list([data])
+        assert out == hash_data_list([data.clone()])
+        other = data.clone()
+        other.x = other.x + 1
+        assert out != hash_data_list([other])
+        assert out != hash_data_list([data, data])
         
 
     
@@ -5,6 +5,7 @@ import torch
 from torch_geometric.data import Data
 from test._utils.nn_module_auto_test import NNModuleAutoTest
 from topobenchmarkx.nn.backbones.combinatorial.gccn import TopoTune, interrank_boundary_index, get_activation
+from topobenchmarkx.transforms.data_manipulations import HasseGraphExpansion
 from torch_geometric.nn import GCNConv
 from omegaconf import OmegaConf
 
@@ -177,6 +178,11 @@ def test_topotune_methods():
     assert membership[1].shape == (batch.x_1.shape[0],)
     assert membership[2].shape == (batch.x_2.shape[0],)
 
+    # The membership vectors generated by the collate function are reused
+    batch["batch_1"] = torch.zeros(batch.x_1.shape[0], dtype=torch.long)
+    assert topotune.generate_membership_vectors(batch)[1] is batch.batch_1
+    assert torch.equal(topotune.generate_membership_vectors(batch)[0], membership[0])
+
     # Test get_nbhd_cache
     nbhd_cache = topotune.get_nbhd_cache(batch)
     assert (1, 0) in nbhd_cache
@@ -210,6 +216,23 @@ def test_topotune_methods():
     assert 0 in aggregated
     assert aggregated[0].shape == (3, 16)
 
+def test_topotune_hasse_index():
+    """Test that the Hasse graph indices precomputed by HasseGraphExpansion give the same outputs."""
+    batch = create_mock_complex_batch()
+    gnn = MockGNN(16, 32, 16)
+    neighborhoods = OmegaConf.create(["up_adjacency-0", "up_adjacency-1", "down_incidence-1", "down_incidence-2"])
+    topotune = TopoTune(GNN=gnn, neighborhoods=neighborhoods, layers=2, use_edge_attr=False, activation="relu")
+    expanded = HasseGraphExpansion(neighborhoods=list(neighborhoods))(batch.clone())
+    # The backbone does not read the matrices
+    for neighborhood in neighborhoods:
+        del expanded[neighborhood]
+
+    out = topotune(batch.clone())
+    out_expanded = topotune(expanded)
+    assert out.keys() == out_expanded.keys()
+    for rank in out:
+        assert torch.allclose(out[rank], out_expanded[rank], atol=1e-6)
+
 def test_interrank_boundary_index():
     """Test the interrank_boundary_index function."""
     x_src = torch.randn(15, 16)
@@ -5,6 +5,10 @@ import torch
 from torch_geometric.data import Data
 from test._utils.nn_module_auto_test import NNModuleAutoTest
 from topobenchmarkx.nn.backbones.combinatorial.gccn_onehasse import TopoTune_OneHasse, get_activation
+from topobenchmarkx.transforms.data_manipulations import HasseGraphExpansion
+from topobenchmarkx.transforms.liftings.graph2simplicial import SimplicialCliqueLifting
+from topobenchmarkx.dataloader import DataloadDataset
+from topobenchmarkx.dataloader.utils import collate_fn
 from torch_geometric.nn import GCNConv
 from omegaconf import OmegaConf
 
@@ -207,6 +211,54 @@ def test_topotune_onehasse_methods():
     assert output[1].shape == (3, 16)  # 3 edges * 2 batches
     assert output[2].shape == (1, 16)  # 1 face * 2 batches
 
+def test_topotune_onehasse_hasse_index():
+    """Test that the Hasse graph indices precomputed by HasseGraphExpansion give the same outputs."""
+    batch = create_mock_complex_batch()
+    gnn = MockGNN(16, 32, 16)
+    neighborhoods = OmegaConf.create(["up_adjacency-0", "up_adjacency-1", "down_incidence-1", "down_incidence-2"])
+    topotune = TopoTune_OneHasse(GNN=gnn, neighborhoods=neighborhoods, layers=2, use_edge_attr=False, activation="relu")
+    expanded = HasseGraphExpansion(neighborhoods=list(neighborhoods))(batch.clone())
+    # The backbone does not read the matrices
+    for neighborhood in neighborhoods:
+        del expanded[neighborhood]
+
+    out = topotune(batch.clone())
+    out_expanded = topotune(expanded)
+    assert out.keys() == out_expanded.keys()
+    for rank in out:
+        assert torch.allclose(out[rank], out_expanded[rank], atol=1e-6)
+
+def test_topotune_onehasse_rank_offsets(simple_graph_1):
+    """Test the offsets of the ranks of the neighborhoods in the Hasse graph of a rank 3 complex.
+
+    Parameters
+    ----------
+    simple_graph_1 : torch_geometric.data.Data
+        A simple graph data object.
+    """
+    neighborhoods = ["up_adjacency-0", "up_incidence-1", "down_incidence-3", "up_adjacency-2"]
+    lifting = SimplicialCliqueLifting(complex_dim=3, neighborhoods=neighborhoods)
+    dataset = DataloadDataset([lifting(simple_graph_1.clone()) for _ in range(2)])
+    batch = collate_fn([dataset[i] for i in range(len(dataset))])
+    gnn = MockGNN(batch.x_0.shape[1], 32, batch.x_0.shape[1])
+    topotune = TopoTune_OneHasse(GNN=gnn, neighborhoods=OmegaConf.create(neighborhoods), layers=2, use_edge_attr=False, activation="relu")
+    assert topotune.max_rank == 3
+
+    membership = topotune.generate_membership_vectors(batch)
+    expanded = topotune.all_nbhds_expand(batch, membership)
+    offsets = torch.cumsum(batch.cell_statistics.sum(0), dim=0) - batch.cell_statistics.sum(0)
+    # Rows and columns of the matrices: (0, 0), (2, 1), (2, 3), (2, 2)
+    expected = torch.cat([
+        batch[neighborhood].coalesce().indices() + offsets[[row_rank, col_rank]].unsqueeze(1)
+        for neighborhood, (row_rank, col_rank) in zip(neighborhoods, [(0, 0), (2, 1), (2, 3), (2, 2)])
+    ], dim=1)
+    assert torch.equal(expanded.edge_index, expected)
+    assert expanded.x.shape[0] == int(batch.cell_statistics.sum())
+
+    output = topotune(batch)
+    for rank in range(4):
+        assert output[rank].shape[0] == batch.cell_statistics[:, rank].sum()
+
 def test_get_activation():
     """Test the get_activation function."""
     relu_func = get_activation("relu")
@@ -1,5 +1,6 @@
 """Unit tests for GraphMLP."""
 
+import pytest
 import torch
 import torch_geometric
 from topobenchmarkx.nn.backbones.graph import GraphMLP
@@ -35,3 +36,45 @@ def testGraphMLP(random_graph_input):
     assert loss == torch.tensor(0.0)
     
     
+
+def testGraphMLPSampledLoss(random_graph_input):
+    """ Unit test for the sampled GraphMLP loss.
+    
+    Parameters
+    ----------
+    random_graph_input : Tuple[torch.Tensor, torch.Tensor, torch.Tensor, Tuple[torch.Tensor, torch.Tensor], Tuple[torch.Tensor, torch.Tensor]]
+        A tuple of input tensors for testing EDGNN.
+    """
+    x, x_1, x_2, edges_1, edges_2 = random_graph_input
+    # Every node has an edge so that the dense adjacency covers all the nodes
+    ring = torch.arange(x.shape[0])
+    edge_index = torch.cat([edges_1, torch.stack([ring, ring.roll(1)])], 1)
+    batch = torch_geometric.data.Data(x_0=x, y=x, edge_index=edge_index, batch_0=torch.zeros(x.shape[0], dtype=torch.long))
+    dense_loss_fn = GraphMLPLoss(r_adj_power=3)
+    sampled_loss_fn = GraphMLPLoss(r_adj_power=3, num_negatives=x.shape[0])
+    
+    adj_power = sampled_loss_fn.get_sparse_power_adj(edge_index, x.shape[0])
+    assert torch.equal(adj_power.to_dense(), dense_loss_fn.get_power_adj(edge_index)[0])
+    assert sampled_loss_fn.get_sparse_power_adj(edge_index.clone(), x.shape[0]) is adj_power
+    
+    model = GraphMLP(x.shape[1], x.shape[1])
+    sampled_model = GraphMLP(x.shape[1], x.shape[1], num_negatives=x.shape[0])
+    sampled_model.load_state_dict(model.state_dict())
+    model_out = GraphMLPWrapper(model, **{"out_channels": x.shape[1], "num_cell_dimensions": 1})(batch)
+    sampled_out = GraphMLPWrapper(sampled_model, **{"out_channels": x.shape[1], "num_cell_dimensions": 1})(batch)
+    assert list(sampled_out["x_dis"].shape) == [8, 12]
+    
+    # All the nodes are sampled, so the denominator is exact
+    loss = sampled_loss_fn(sampled_out, batch)
+    assert torch.allclose(loss, dense_loss_fn(model_out, batch), atol=1e-5)
+    
+    sampled_loss_fn.num_negatives = 3
+    loss = sampled_loss_fn(sampled_out, batch)
+    assert torch.isfinite(loss)
+    loss.backward()
+    
+    # The backbone and the loss must agree on the number of negatives
+    with pytest.raises(ValueError):
+        dense_loss_fn(sampled_out, batch)
+    with pytest.raises(ValueError):
+        GraphMLPLoss(num_negatives=0)
@@ -4,6 +4,7 @@ import torch
 from torch_geometric.utils import get_laplacian
 from ...._utils.nn_module_auto_test import NNModuleAutoTest
 from topobenchmarkx.nn.backbones.simplicial import SCCNNCustom
+from topobenchmarkx.nn.backbones.simplicial.sccnn import SCCNNLayer
 from topobenchmarkx.transforms.liftings.graph2simplicial import (
     SimplicialCliqueLifting,
 )
@@ -36,3 +37,53 @@ def test_SCCNNCustom(simple_graph_1):
         },
     ])
     auto_test.run()
+
+
+def test_SCCNNLayer_aggr_norm(simple_graph_1):
+    lifting_signed = SimplicialCliqueLifting(
+            complex_dim=3, signed=True
+        )
+    data = lifting_signed(simple_graph_1)
+    conv_order = 3
+    layer = SCCNNLayer(
+        (data.x.shape[1], data.x_1.shape[1], data.x_2.shape[1]),
+        (4, 4, 4),
+        conv_order,
+        3,
+        aggr_norm=True,
+    )
+    laplacian = data.down_laplacian_1
+    dense = laplacian.to_dense()
+    neighborhood_size_inv = 1 / dense.sum(1)
+    neighborhood_size_inv[~torch.isfinite(neighborhood_size_inv)] = 0
+    assert torch.allclose(
+        layer.get_neighborhood_size_inv(laplacian), neighborhood_size_inv
+    )
+
+    # The Chebyshev terms are normalised at every order
+    x = data.x_1
+    out = layer.chebyshev_conv(laplacian, conv_order, x)
+    assert out.shape == (x.shape[0], x.shape[1], conv_order)
+    for k in range(conv_order):
+        x = neighborhood_size_inv[:, None] * (dense @ x)
+        assert torch.allclose(out[:, :, k], x, atol=1e-6)
+
+    # Precomputing the normalisations gives the same output
+    laplacian_all = (
+            data.hodge_laplacian_0,
+            data.down_laplacian_1,
+            data.up_laplacian_1,
+            data.down_laplacian_2,
+            data.up_laplacian_2,
+        )
+    incidence_all = (data.incidence_1, data.incidence_2)
+    x_all = (data.x, data.x_1, data.x_2)
+    out = layer(x_all, laplacian_all, incidence_all)
+    out_precomputed = layer(
+        x_all,
+        laplacian_all,
+        incidence_all,
+        aggr_norms=layer.get_aggr_norms(laplacian_all),
+    )
+    for y, y_precomputed in zip(out, out_precomputed):
+        assert torch.allclose(y, y_precomputed)
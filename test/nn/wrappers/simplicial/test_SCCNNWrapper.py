@@ -85,6 +85,18 @@ class TestSimplicialWrappers:
         for key in ["labels", "batch_0", "x_0", "x_1", "x_2"]:
             assert key in out
 
+        # The normalization matches its dense definition
+        for rank in range(3):
+            matrix = data[f"hodge_laplacian_{rank}"]
+            dense = matrix.to_dense()
+            diag_sum = dense.abs().sum(1)
+            diag = torch.where(diag_sum != 0, diag_sum.rsqrt(), 0)
+            normalized = wrapper.normalize_matrix(matrix)
+            assert normalized.is_coalesced()
+            assert torch.allclose(
+                normalized.to_dense(), diag[:, None] * dense * diag[None, :]
+            )
+
     def test_SCCNWrapper(self, sg1_clique_lifted):
         """Test SCCNWrapper.
         
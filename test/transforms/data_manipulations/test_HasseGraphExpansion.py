@@ -0,0 +1,68 @@
+"""Test HasseGraphExpansion class."""
+
+import torch
+from topobenchmarkx.data.utils import get_hasse_index_key
+from topobenchmarkx.transforms.data_manipulations import HasseGraphExpansion
+from topobenchmarkx.transforms.liftings.graph2simplicial import (
+    SimplicialCliqueLifting,
+)
+
+
+class TestHasseGraphExpansion:
+    """Test HasseGraphExpansion class."""
+
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.neighborhoods = [
+            "up_adjacency-0",
+            "down_adjacency-1",
+            "down_incidence-1",
+            "up_incidence-1",
+            "2-up_adjacency-0",
+        ]
+        self.transform = HasseGraphExpansion(neighborhoods=self.neighborhoods)
+
+    def test_repr(self):
+        """Test string representation of the transform."""
+        repr_str = repr(self.transform)
+        assert "HasseGraphExpansion" in repr_str
+        assert "hasse_graph_expansion" in repr_str
+
+    def test_forward(self, simple_graph_1):
+        """Test the precomputed indices of eager and lazy lifted data.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        eager = SimplicialCliqueLifting(
+            complex_dim=3, neighborhoods=self.neighborhoods
+        )(simple_graph_1)
+        lazy = SimplicialCliqueLifting(
+            complex_dim=3,
+            neighborhoods=self.neighborhoods,
+            lazy_connectivity=True,
+        )(simple_graph_1)
+        eager = self.transform(eager)
+        lazy = self.transform(lazy)
+        for neighborhood in self.neighborhoods:
+            key = get_hasse_index_key(neighborhood)
+            assert torch.equal(
+                eager[key], eager[neighborhood].coalesce().indices()
+            )
+            assert torch.equal(lazy[key], eager[key])
+            # The matrices are not materialized in the lazy data
+            assert neighborhood not in lazy
+
+    def test_no_neighborhoods(self, simple_graph_1):
+        """Test that the data is unchanged without neighborhoods.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        keys = set(simple_graph_1.keys())
+        data = HasseGraphExpansion(neighborhoods=None)(simple_graph_1)
+        assert set(data.keys()) == keys
@@ -1,7 +1,12 @@
 """Test the message passing module."""
 
+import pytest
 import torch
+import torch_geometric
 
+from topobenchmarkx.dataloader import DataloadDataset
+from topobenchmarkx.dataloader.utils import collate_fn
+from topobenchmarkx.transforms.liftings.graph2cell import CellCycleLifting
 from topobenchmarkx.transforms.liftings.graph2simplicial import (
     SimplicialCliqueLifting,
 )
@@ -106,3 +111,70 @@ class TestConcatention:
         assert (
             expected_x3 == lifted_data.x_3
         ).all(), "Something is wrong with the lifted features x_3."
+
+    def test_lift_features_ragged(self, simple_graph_1):
+        """Test the lift_features method on cells with different sizes.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        lifting = CellCycleLifting(
+            feature_lifting="Concatenation",
+            feature_lifting_kwargs={"max_num_faces": 10},
+            max_cell_length=10,
+        )
+        lifted_data = lifting.forward(simple_graph_1.clone())
+        incidence_2 = lifted_data.incidence_2.to_dense()
+        sizes = incidence_2.sum(dim=0).long()
+        assert len(sizes.unique()) > 1
+        assert lifted_data.x_2.shape == (
+            incidence_2.shape[1],
+            10 * lifted_data.x_1.shape[1],
+        )
+        for cell, size in enumerate(sizes):
+            edges = torch.nonzero(incidence_2[:, cell]).squeeze(1)
+            expected = lifted_data.x_1[edges].flatten()
+            assert torch.equal(lifted_data.x_2[cell, : len(expected)], expected)
+            assert torch.all(lifted_data.x_2[cell, len(expected) :] == 0)
+
+        # Without a maximum number of faces, the width is not defined
+        lifting = CellCycleLifting(feature_lifting="Concatenation")
+        with pytest.raises(ValueError):
+            lifting.forward(simple_graph_1.clone())
+
+    def test_lift_features_ragged_batch(self, simple_graph_1):
+        """Test that cell complexes with different largest cells can be batched.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        triangle = torch_geometric.data.Data(
+            x=torch.randn(3, simple_graph_1.x.shape[1]),
+            edge_index=torch.tensor([[0, 0, 1], [1, 2, 2]]),
+            y=simple_graph_1.y,
+            num_nodes=3,
+        )
+        lifting = CellCycleLifting(
+            feature_lifting="Concatenation",
+            feature_lifting_kwargs={"max_num_faces": 10},
+            max_cell_length=10,
+        )
+        data_list = [
+            lifting.forward(graph.clone())
+            for graph in [triangle, simple_graph_1]
+        ]
+        max_sizes = [
+            int(data.incidence_2.to_dense().sum(dim=0).max())
+            for data in data_list
+        ]
+        assert max_sizes[0] != max_sizes[1]
+        dataset = DataloadDataset(data_list)
+        batch = collate_fn([dataset[0], dataset[1]])
+        assert batch.x_2.shape == (
+            sum(data.x_2.shape[0] for data in data_list),
+            10 * batch.x_1.shape[1],
+        )
@@ -2,6 +2,7 @@
 
 import torch
 
+from topobenchmarkx.transforms.liftings.graph2cell import CellCycleLifting
 from topobenchmarkx.transforms.liftings.graph2simplicial import (
     SimplicialCliqueLifting,
 )
@@ -62,3 +63,22 @@ class TestSetLifting:
         assert (
             expected_x3 == lifted_data.x_3
         ).all(), "Something is wrong with the lifted features x_3."
+
+    def test_lift_features_ragged(self, simple_graph_1):
+        """Test the lift_features method on cells with different sizes.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        lifting = CellCycleLifting(feature_lifting="Set")
+        lifted_data = lifting.forward(simple_graph_1.clone())
+        incidence_2 = lifted_data.incidence_2.to_dense()
+        assert len(incidence_2.sum(dim=0).unique()) > 1
+        # The padding only repeats features of the faces of each cell
+        for cell in range(incidence_2.shape[1]):
+            edges = torch.nonzero(incidence_2[:, cell]).squeeze(1)
+            assert set(lifted_data.x_2[cell].tolist()) == set(
+                lifted_data.x_1[edges].flatten().tolist()
+            )
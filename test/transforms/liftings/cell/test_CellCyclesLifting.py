@@ -1,6 +1,10 @@
 """Test the message passing module."""
 
+import networkx as nx
+import pytest
 import torch
+import torch_geometric
+from toponetx.classes import CellComplex
 
 from topobenchmarkx.transforms.liftings.graph2cell import CellCycleLifting
 
@@ -167,3 +171,82 @@ class TestCellCycleLifting:
         assert (
             expected_incidence_2 == lifted_data.incidence_2.to_dense()
         ).all(), "Something is wrong with incidence_2."
+
+
+def lift_topology_toponetx(lifting, data):
+    """Lift the topology through NetworkX and TopoNetX.
+
+    Parameters
+    ----------
+    lifting : CellCycleLifting
+        The lifting whose parameters are used.
+    data : torch_geometric.data.Data
+        The input graph.
+
+    Returns
+    -------
+    dict
+        The lifted topology.
+    """
+    graph = lifting._generate_graph_from_data(data)
+    cell_complex = CellComplex(graph)
+    cycles = [
+        cycle
+        for cycle in nx.cycle_basis(graph)
+        if len(cycle) != 1
+        and (
+            lifting.max_cell_length is None
+            or len(cycle) <= lifting.max_cell_length
+        )
+    ]
+    if len(cycles) != 0:
+        cell_complex.add_cells_from(cycles, rank=2)
+    return lifting._get_lifted_topology(cell_complex, graph)
+
+
+@pytest.mark.parametrize("max_cell_length", [None, 2, 4])
+@pytest.mark.parametrize(
+    "neighborhoods", [None, ["up_adjacency-0", "down_laplacian-2"]]
+)
+def test_lift_topology_matches_toponetx(max_cell_length, neighborhoods):
+    """Test that the lifting matches the NetworkX/TopoNetX implementation.
+
+    Parameters
+    ----------
+    max_cell_length : int or None
+        Maximum length of the cycles.
+    neighborhoods : list or None
+        Neighborhoods of interest.
+    """
+    lifting = CellCycleLifting(
+        max_cell_length=max_cell_length,
+        preserve_edge_attr=True,
+        neighborhoods=neighborhoods,
+    )
+    for seed in range(5):
+        graph = nx.gnp_random_graph(15, 0.25, seed=seed)
+        graph.add_node(15)  # Isolated node
+        graph.add_edge(3, 3)  # Self-loop
+        edges = torch.tensor(list(graph.edges), dtype=torch.long).t()
+        edge_index, edge_attr = torch_geometric.utils.to_undirected(
+            edges, torch.randn(edges.shape[1], 3)
+        )
+        data = torch_geometric.data.Data(
+            x=torch.randn(16, 2), edge_index=edge_index, edge_attr=edge_attr
+        )
+        expected = lift_topology_toponetx(lifting, data)
+        lifted = lifting.lift_topology(data)
+
+        assert lifted.keys() == expected.keys()
+        for key, value in expected.items():
+            if key == "shape":
+                assert lifted[key] == [int(n) for n in value]
+            elif value.is_sparse:
+                assert torch.equal(lifted[key].to_dense(), value.to_dense())
+            else:
+                assert torch.equal(lifted[key], value)
+
+    def test_lazy_connectivity(self):
+        # Unsigned incidences do not keep the orientation of the cells
+        with pytest.raises(ValueError, match="not supported"):
+            CellCycleLifting(lazy_connectivity=True)
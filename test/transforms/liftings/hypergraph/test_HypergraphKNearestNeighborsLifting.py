@@ -125,6 +125,14 @@ class TestHypergraphKNNLifting:
         assert lifted_data["num_hyperedges"] == 4
         assert torch.equal(lifted_data["x_0"], data.x)
 
+        # Every node is its own neighbor, ties are broken by index
+        lifting = HypergraphKNNLifting(k_value=2, loop=True)
+        data = Data(x=torch.tensor([[0.0], [1.0], [1.0], [1.0], [2.0]]))
+        incidence_matrix = lifting.lift_topology(data)["incidence_hyperedges"].to_dense()
+        assert torch.all(torch.diag(incidence_matrix) == 1)
+        assert torch.all(incidence_matrix.sum(dim=1) == 2)
+        assert torch.equal(incidence_matrix[4], torch.tensor([0.0, 1.0, 0.0, 0.0, 1.0]))
+
     @pytest.mark.parametrize("k_value", [1, 2, 3, 4])
     def test_different_k_values(self, k_value, simple_graph_2):
         """Test lift_topology with different k values.
@@ -1,6 +1,12 @@
 """Test the message passing module."""
 
+from itertools import combinations
+
+import networkx as nx
+import pytest
 import torch
+import torch_geometric
+from toponetx.classes import SimplicialComplex
 
 from topobenchmarkx.transforms.liftings.graph2simplicial import (
     SimplicialCliqueLifting,
@@ -285,3 +291,76 @@ class TestSimplicialCliqueLifting:
         assert (
             excepted_features_3 == lifted_data.x_3
         ).all(), "Something is wrong with x_3 features."
+
+
+def lift_topology_toponetx(lifting, data):
+    """Lift the topology through NetworkX and TopoNetX.
+
+    Parameters
+    ----------
+    lifting : SimplicialCliqueLifting
+        The lifting whose parameters are used.
+    data : torch_geometric.data.Data
+        The input graph.
+
+    Returns
+    -------
+    dict
+        The lifted topology.
+    """
+    graph = lifting._generate_graph_from_data(data)
+    simplicial_complex = SimplicialComplex(graph)
+    simplices = [set() for _ in range(2, lifting.complex_dim + 1)]
+    for clique in nx.find_cliques(graph):
+        for i in range(2, lifting.complex_dim + 1):
+            for c in combinations(clique, i + 1):
+                simplices[i - 2].add(tuple(c))
+    for set_k_simplices in simplices:
+        simplicial_complex.add_simplices_from(list(set_k_simplices))
+    return lifting._get_lifted_topology(simplicial_complex, graph)
+
+
+@pytest.mark.parametrize("signed", [True, False])
+@pytest.mark.parametrize("complex_dim", [1, 2, 3])
+@pytest.mark.parametrize(
+    "neighborhoods", [None, ["up_adjacency-0", "down_laplacian-1"]]
+)
+def test_lift_topology_matches_toponetx(signed, complex_dim, neighborhoods):
+    """Test that the lifting matches the NetworkX/TopoNetX implementation.
+
+    Parameters
+    ----------
+    signed : bool
+        Whether the connectivity matrices are signed.
+    complex_dim : int
+        Maximum dimension of the complex.
+    neighborhoods : list or None
+        Neighborhoods of interest.
+    """
+    lifting = SimplicialCliqueLifting(
+        complex_dim=complex_dim,
+        signed=signed,
+        preserve_edge_attr=True,
+        neighborhoods=neighborhoods,
+    )
+    for seed in range(5):
+        graph = nx.gnp_random_graph(15, 0.4, seed=seed)
+        graph.add_node(15)  # Isolated node
+        edges = torch.tensor(list(graph.edges), dtype=torch.long).t()
+        edge_index, edge_attr = torch_geometric.utils.to_undirected(
+            edges, torch.randn(edges.shape[1], 3)
+        )
+        data = torch_geometric.data.Data(
+            x=torch.randn(16, 2), edge_index=edge_index, edge_attr=edge_attr
+        )
+        expected = lift_topology_toponetx(lifting, data)
+        lifted = lifting.lift_topology(data)
+
+        assert lifted.keys() == expected.keys()
+        for key, value in expected.items():
+            if key == "shape":
+                assert lifted[key] == [int(n) for n in value]
+            elif value.is_sparse:
+                assert torch.equal(lifted[key].to_dense(), value.to_dense())
+            else:
+                assert torch.equal(lifted[key], value)
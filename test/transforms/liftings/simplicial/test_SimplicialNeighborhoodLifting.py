@@ -1,5 +1,6 @@
 """Test the message passing module."""
 
+import pytest
 import torch
 
 from topobenchmarkx.transforms.liftings.graph2simplicial import (
@@ -1493,3 +1494,35 @@ class TestSimplicialKHopLifting:
         assert (
             expected_features_2 == lifted_data.x_2
         ).all(), "Something is wrong with x_2 features."
+
+    def test_sampling(self, simple_graph_1):
+        """Test that the sampling of the simplices is capped and seeded.
+
+        Parameters
+        ----------
+        simple_graph_1 : torch_geometric.data.Data
+            A simple graph data object.
+        """
+        full = self.lifting_unsigned.lift_topology(simple_graph_1.clone())
+        assert self.lifting_unsigned.num_dropped_simplices.sum() == 0
+        assert "num_dropped_simplices" not in full
+        num_triangles = full["incidence_2"].shape[1]
+
+        lifting = SimplicialKHopLifting(complex_dim=3, max_k_simplices=5, seed=1)
+        with pytest.warns(
+            UserWarning, match=f"max_k_simplices=5.*2: {num_triangles - 5}"
+        ):
+            lifted = lifting.lift_topology(simple_graph_1.clone())
+        assert lifted["incidence_2"].shape[1] == 5
+        num_dropped = lifting.num_dropped_simplices.clone()
+        assert num_dropped.shape == (4,)
+        assert num_dropped[2] == num_triangles - 5
+        assert "num_dropped_simplices" not in lifted
+        # The same seed samples the same simplices
+        with pytest.warns(UserWarning, match="max_k_simplices=5"):
+            again = lifting.lift_topology(simple_graph_1.clone())
+        assert torch.equal(
+            lifted["incidence_2"].to_dense(), again["incidence_2"].to_dense()
+        )
+        # The dropped candidates are accumulated over the lifted graphs
+        assert torch.equal(lifting.num_dropped_simplices, 2 * num_dropped)
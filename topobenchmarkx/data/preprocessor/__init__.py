@@ -1,7 +1,11 @@
 """Init file for Preprocessor module."""
 
 from .preprocessor import PreProcessor
+from .stage_cache import StageCache
+from .storage import ShardedStorage
 
 __all__ = [
     "PreProcessor",
+    "ShardedStorage",
+    "StageCache",
 ]
@@ -1,21 +1,41 @@
 """Preprocessor for datasets."""
 
+import functools
+import hashlib
 import json
+import multiprocessing as mp
 import os
+import shutil
+import tempfile
+import time
 
 import hydra
 import torch
 import torch_geometric
+from torch_geometric.data.dataset import files_exist
 from torch_geometric.io import fs
+from tqdm import tqdm
 
+from topobenchmarkx.data.preprocessor.stage_cache import (
+    StageCache,
+    get_pipeline_stages,
+)
+from topobenchmarkx.data.preprocessor.storage import (
+    LazyDataList,
+    ShardedStorage,
+)
 from topobenchmarkx.data.utils import (
+    canonicalize_parameters,
     ensure_serializable,
+    hash_data_list,
     load_inductive_splits,
     load_transductive_splits,
-    make_hash,
 )
 from topobenchmarkx.dataloader import DataloadDataset
 from topobenchmarkx.transforms.data_transform import DataTransform
+from topobenchmarkx.utils import pylogger
+
+log = pylogger.RankedLogger(__name__, rank_zero_only=True)
 
 
 class PreProcessor(torch_geometric.data.InMemoryDataset):
@@ -29,11 +49,53 @@ class PreProcessor(torch_geometric.data.InMemoryDataset):
         Path to the directory containing the data.
     transforms_config : DictConfig, optional
         Configuration parameters for the transforms (default: None).
+    num_workers : int, optional
+        Number of worker processes used to apply the pre-transform. If 0,
+        the pre-transform is applied in the main process (default: 0).
+    chunksize : int, optional
+        Number of graphs sent to a worker at once (default: 1).
+    storage : str, optional
+        How the transformed data is stored. Either "memory", to collate it
+        into a single file loaded in memory, or "sharded", to write it into
+        fixed-size shards that are memory-mapped and read on access
+        (default: "memory").
+    shard_size : int, optional
+        Number of graphs per shard when `storage` is "sharded"
+        (default: 1024).
+    cache_stages : bool, optional
+        Whether to cache the output of every intermediate stage of the
+        pre-transform pipeline, so that changing a stage only recomputes the
+        stages from that one onward. Every cached stage stores a copy of the
+        dataset on disk (default: False).
     **kwargs : optional
         Optional additional arguments.
     """
 
-    def __init__(self, dataset, data_dir, transforms_config=None, **kwargs):
+    def __init__(
+        self,
+        dataset,
+        data_dir,
+        transforms_config=None,
+        num_workers=0,
+        chunksize=1,
+        storage="memory",
+        shard_size=1024,
+        cache_stages=False,
+        **kwargs,
+    ):
+        if storage not in ["memory", "sharded"]:
+            raise ValueError(
+                f"Invalid '{storage}' storage. Please define either 'memory' or 'sharded'."
+            )
+        self.num_workers = num_workers
+        self.chunksize = chunksize
+        self.shard_size = shard_size
+        self.storage = None
+        self.stage_cache = (
+            StageCache(os.path.join(data_dir, "stage_cache"))
+            if cache_stages
+            else None
+        )
         if isinstance(dataset, torch_geometric.data.Dataset):
             data_list = [dataset.get(idx) for idx in range(len(dataset))]
         elif isinstance(dataset, torch.utils.data.Dataset):
@@ -43,6 +105,7 @@ class PreProcessor(torch_geometric.data.InMemoryDataset):
         self.data_list = data_list
         if transforms_config is not None:
             self.transforms_applied = True
+            self.sharded = storage == "sharded"
             pre_transform = self.instantiate_pre_transform(
                 data_dir, transforms_config
             )
@@ -50,13 +113,23 @@ class PreProcessor(torch_geometric.data.InMemoryDataset):
                 self.processed_data_dir, None, pre_transform, **kwargs
             )
             self.save_transform_parameters()
-            self.load(self.processed_paths[0])
+            if self.sharded:
+                self.storage = ShardedStorage(self.processed_dir)
+            else:
+                self.load(self.processed_paths[0])
         else:
+            # Without transforms the data is loaded from the raw dataset
+            # directory, which is always collated in memory
             self.transforms_applied = False
+            self.sharded = False
             super().__init__(data_dir, None, None, **kwargs)
             self.load(data_dir + "/processed/data.pt")
 
-        self.data_list = [self.get(idx) for idx in range(len(self))]
+        self.data_list = (
+            LazyDataList(self)
+            if self.sharded
+            else [self.get(idx) for idx in range(len(self))]
+        )
         # Some datasets have fixed splits, and those are stored as split_idx during loading
         # We need to store this information to be able to reproduce the splits afterwards
         if hasattr(dataset, "split_idx"):
@@ -85,8 +158,39 @@ class PreProcessor(torch_geometric.data.InMemoryDataset):
         str
             Name of the processed file.
         """
+        if self.sharded:
+            return ShardedStorage.index_file_name
         return "data.pt"
 
+    def len(self) -> int:
+        """Return the number of graphs in the dataset.
+
+        Returns
+        -------
+        int
+            Number of graphs in the dataset.
+        """
+        if self.storage is not None:
+            return len(self.storage)
+        return super().len()
+
+    def get(self, idx: int) -> torch_geometric.data.Data:
+        """Get the graph at index `idx`.
+
+        Parameters
+        ----------
+        idx : int
+            Index of the graph.
+
+        Returns
+        -------
+        torch_geometric.data.Data
+            The graph at index `idx`.
+        """
+        if self.storage is not None:
+            return self.storage.get(idx)
+        return super().get(idx)
+
     def instantiate_pre_transform(
         self, data_dir, transforms_config
     ) -> torch_geometric.transforms.Compose:
@@ -115,6 +219,7 @@ class PreProcessor(torch_geometric.data.InMemoryDataset):
         self.set_processed_data_dir(
             pre_transforms_dict, data_dir, transforms_config
         )
+        self.pipeline_stages = get_pipeline_stages(pre_transforms_dict)
         return pre_transforms
 
     def set_processed_data_dir(
@@ -131,17 +236,83 @@ class PreProcessor(torch_geometric.data.InMemoryDataset):
         transforms_config : DictConfig
             Configuration parameters for the transforms.
         """
-        # Use self.transform_parameters to define unique save/load path for each transform parameters
+        # The save/load path is addressed by the content it is computed from:
+        # the raw data, the transform parameters and the transform code
         repo_name = "_".join(list(transforms_config.keys()))
         transforms_parameters = {
             transform_name: transform.parameters
             for transform_name, transform in pre_transforms_dict.items()
         }
-        params_hash = make_hash(transforms_parameters)
         self.transforms_parameters = ensure_serializable(transforms_parameters)
+        self.cache_key = {
+            "data": hash_data_list(self.data_list),
+            "parameters": hashlib.sha256(
+                canonicalize_parameters(transforms_parameters).encode()
+            ).hexdigest(),
+            "code": get_transforms_code_version(),
+        }
+        digest = hashlib.sha256(
+            canonicalize_parameters(self.cache_key).encode()
+        ).hexdigest()
         self.processed_data_dir = os.path.join(
-            *[data_dir, repo_name, f"{params_hash}"]
+            *[data_dir, repo_name, digest[:16]]
+        )
+
+    def _process(self) -> None:
+        """Process the data into a temporary directory and move it in place.
+
+        The processed files are only visible under `processed_data_dir` once
+        they are complete, so concurrent runs sharing the same directory never
+        read partially written files.
+        """
+        if not self.transforms_applied:
+            super()._process()
+            return
+        if not self.force_reload and files_exist(self.processed_paths):
+            return
+
+        final_dir = self.processed_data_dir
+        parent_dir = os.path.dirname(final_dir)
+        os.makedirs(parent_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(
+            dir=parent_dir, prefix=f".{os.path.basename(final_dir)}.tmp-"
         )
+        try:
+            self.root = tmp_dir
+            super()._process()
+            with open(
+                os.path.join(tmp_dir, "path_transform_parameters_dict.json"),
+                "w",
+            ) as f:
+                json.dump(self.transforms_parameters, f, indent=4)
+            with open(os.path.join(tmp_dir, "cache_key.json"), "w") as f:
+                json.dump(self.cache_key, f, indent=4)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        finally:
+            self.root = final_dir
+
+        # Leftovers of an interrupted run (or a forced reload) are moved
+        # aside so that the rename below can succeed
+        stale_dir = None
+        if os.path.exists(final_dir) and (
+            self.force_reload or not files_exist(self.processed_paths)
+        ):
+            stale_dir = tempfile.mkdtemp(
+                dir=parent_dir, prefix=f".{os.path.basename(final_dir)}.old-"
+            )
+            os.replace(final_dir, os.path.join(stale_dir, "data"))
+        try:
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            # Another run completed the same directory in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not files_exist(self.processed_paths):
+                raise
+            log.info(f"Using data processed concurrently in {final_dir}")
+        if stale_dir is not None:
+            shutil.rmtree(stale_dir, ignore_errors=True)
 
     def save_transform_parameters(self) -> None:
         """Save the transform parameters."""
@@ -166,13 +337,92 @@ class PreProcessor(torch_geometric.data.InMemoryDataset):
                 f"Transform parameters are the same, using existing data_dir: {self.processed_data_dir}"
             )
 
+    def apply_cached_stages(self) -> tuple:
+        """Apply all but the last pipeline stage, using the stage cache.
+
+        The longest prefix of the pipeline whose output is cached is loaded,
+        and the following stages are applied and cached one by one.
+
+        Returns
+        -------
+        LazyDataList or list
+            Data objects after all but the last stage.
+        torch_geometric.transforms.Compose
+            Remaining stage to apply.
+        """
+        names, parameters, transforms = zip(*self.pipeline_stages, strict=True)
+        keys = [
+            StageCache.key(
+                self.cache_key["data"],
+                list(parameters[: i + 1]),
+                self.cache_key["code"],
+            )
+            for i in range(len(transforms) - 1)
+        ]
+
+        data_list, start = self.data_list, 0
+        for i in reversed(range(len(keys))):
+            if self.stage_cache.exists(keys[i]):
+                log.info(
+                    f"Reusing cached stages {' -> '.join(names[: i + 1])} "
+                    f"from {self.stage_cache.path(keys[i])}"
+                )
+                data_list = LazyDataList(self.stage_cache.load(keys[i]))
+                start = i + 1
+                break
+
+        for i in range(start, len(keys)):
+            metadata = {
+                "stages": list(names[: i + 1]),
+                "parameters": ensure_serializable(list(parameters[: i + 1])),
+                "cache_key": self.cache_key,
+            }
+            storage = self.stage_cache.write(
+                keys[i],
+                iter_pre_transform(
+                    data_list,
+                    transforms[i],
+                    num_workers=self.num_workers,
+                    chunksize=self.chunksize,
+                ),
+                metadata,
+                shard_size=self.shard_size,
+            )
+            data_list = LazyDataList(storage)
+        return data_list, torch_geometric.transforms.Compose(
+            list(transforms[len(keys) :])
+        )
+
     def process(self) -> None:
         """Method that processes the data."""
-        self.data_list = (
-            [self.pre_transform(d) for d in self.data_list]
-            if self.pre_transform is not None
-            else self.data_list
-        )
+        data_list, pre_transform = self.data_list, self.pre_transform
+        if self.stage_cache is not None and pre_transform is not None:
+            data_list, pre_transform = self.apply_cached_stages()
+
+        if self.sharded:
+            # Transformed graphs are written shard by shard instead of being
+            # gathered in memory first
+            times = []
+            transformed = iter_pre_transform(
+                data_list,
+                pre_transform,
+                num_workers=self.num_workers,
+                chunksize=self.chunksize,
+                times=times,
+            )
+            ShardedStorage.write(
+                transformed, self.processed_dir, shard_size=self.shard_size
+            )
+            self.pre_transform_times = torch.tensor(times)
+            return
+
+        if pre_transform is not None:
+            self.data_list, self.pre_transform_times = apply_pre_transform(
+                data_list,
+                pre_transform,
+                num_workers=self.num_workers,
+                chunksize=self.chunksize,
+            )
 
         self._data, self.slices = self.collate(self.data_list)
         self._data_list = None  # Reset cache.
@@ -232,3 +482,189 @@ class PreProcessor(torch_geometric.data.InMemoryDataset):
                 f"Invalid '{split_params.learning_setting}' learning setting.\
                 Please define either 'inductive' or 'transductive'."
             )
+
+
+@functools.cache
+def get_transforms_code_version() -> str:
+    """Return a digest identifying the code of the transforms.
+
+    The digest combines the library version with the source of the transforms
+    and of the modules they rely on (the data utilities, which hold the lifting
+    engines, and the domain data of the dataloader), so that processed data is
+    not reused once the code producing it changes.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest of the transforms code.
+    """
+    import topobenchmarkx
+
+    package_dir = os.path.dirname(os.path.abspath(topobenchmarkx.__file__))
+    # Every module the transforms import, so that editing a lifting engine
+    # outside of the transforms package also invalidates the processed data
+    source_files = [os.path.join(package_dir, "dataloader", "utils.py")]
+    for source_dir in [("data", "utils"), ("transforms",)]:
+        for dir_path, _, file_names in os.walk(
+            os.path.join(package_dir, *source_dir)
+        ):
+            source_files.extend(
+                os.path.join(dir_path, file_name)
+                for file_name in file_names
+                if file_name.endswith(".py")
+            )
+
+    hasher = hashlib.sha256(topobenchmarkx.__version__.encode())
+    for source_file in sorted(source_files):
+        hasher.update(os.path.relpath(source_file, package_dir).encode())
+        with open(source_file, "rb") as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+_worker_pre_transform = None
+
+
+def _init_worker(pre_transform) -> None:
+    """Store the pre-transform in the global scope of a worker process.
+
+    Parameters
+    ----------
+    pre_transform : callable
+        Pre-transform to apply to each data object.
+    """
+    global _worker_pre_transform
+    _worker_pre_transform = pre_transform
+    # Avoid oversubscription, each worker already processes its own graphs
+    torch.set_num_threads(1)
+
+
+def _timed_pre_transform(data, pre_transform=None):
+    """Apply the pre-transform to a data object, coalesce its sparse matrices and time it.
+
+    Parameters
+    ----------
+    data : torch_geometric.data.Data
+        Data object to transform.
+    pre_transform : callable, optional
+        Pre-transform to apply. If None, the one stored by `_init_worker` is
+        used (default: None).
+
+    Returns
+    -------
+    tuple
+        The transformed data object and the elapsed time in seconds.
+    """
+    if pre_transform is None:
+        pre_transform = _worker_pre_transform
+    start = time.perf_counter()
+    data = pre_transform(data)
+    # Sparse matrices are coalesced once here instead of at every batch
+    for key, value in data.items():
+        if isinstance(value, torch.Tensor) and value.is_sparse:
+            data[key] = value.coalesce()
+    return data, time.perf_counter() - start
+
+
+def iter_pre_transform(
+    data_list, pre_transform, num_workers=0, chunksize=1, times=None
+):
+    """Lazily apply the pre-transform to every data object.
+
+    The transformed data objects are yielded in the same order as
+    `data_list`, so the processed dataset does not depend on the number of
+    workers.
+
+    Parameters
+    ----------
+    data_list : list[torch_geometric.data.Data]
+        Data objects to transform.
+    pre_transform : callable
+        Pre-transform to apply to each data object.
+    num_workers : int, optional
+        Number of worker processes. If 0, the data objects are transformed in
+        the main process (default: 0).
+    chunksize : int, optional
+        Number of data objects sent to a worker at once (default: 1).
+    times : list, optional
+        If given, the time in seconds spent on each data object is appended
+        to it (default: None).
+
+    Yields
+    ------
+    torch_geometric.data.Data
+        The next transformed data object.
+    """
+    times = [] if times is None else times
+    progress = tqdm(
+        total=len(data_list), desc="Pre-transforming", unit="graph"
+    )
+    start = time.perf_counter()
+    if num_workers > 0 and len(data_list) > 1:
+        # Fork (when available) so that the workers inherit the pre-transform
+        # instead of having to pickle it
+        ctx = (
+            mp.get_context("fork")
+            if "fork" in mp.get_all_start_methods()
+            else mp.get_context()
+        )
+        with ctx.Pool(
+            num_workers, initializer=_init_worker, initargs=(pre_transform,)
+        ) as pool:
+            for data, elapsed in pool.imap(
+                _timed_pre_transform, data_list, chunksize=chunksize
+            ):
+                times.append(elapsed)
+                progress.update()
+                yield data
+    else:
+        for data in data_list:
+            data, elapsed = _timed_pre_transform(data, pre_transform)
+            times.append(elapsed)
+            progress.update()
+            yield data
+    progress.close()
+
+    if len(times) > 0:
+        elapsed = torch.tensor(times)
+        log.info(
+            f"Pre-transformed {len(elapsed)} graphs in "
+            f"{time.perf_counter() - start:.2f}s (num_workers={num_workers}): "
+            f"mean {elapsed.mean():.4f}s, max {elapsed.max():.4f}s "
+            f"(graph {int(elapsed.argmax())}) per graph"
+        )
+
+
+def apply_pre_transform(data_list, pre_transform, num_workers=0, chunksize=1):
+    """Apply the pre-transform to every data object, optionally in parallel.
+
+    Parameters
+    ----------
+    data_list : list[torch_geometric.data.Data]
+        Data objects to transform.
+    pre_transform : callable
+        Pre-transform to apply to each data object.
+    num_workers : int, optional
+        Number of worker processes. If 0, the data objects are transformed in
+        the main process (default: 0).
+    chunksize : int, optional
+        Number of data objects sent to a worker at once (default: 1).
+
+    Returns
+    -------
+    list[torch_geometric.data.Data]
+        Transformed data objects, in the same order as `data_list`.
+    torch.Tensor
+        Time in seconds spent on each data object.
+    """
+    times = []
+    transformed = list(
+        iter_pre_transform(
+            data_list,
+            pre_transform,
+            num_workers=num_workers,
+            chunksize=chunksize,
+            times=times,
+        )
+    )
+    return transformed, torch.tensor(times)
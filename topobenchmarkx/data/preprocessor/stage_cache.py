@@ -0,0 +1,425 @@
+"""Cache of the intermediate stages of the pre-transform pipeline.
+
+Each cache entry stores the output of a prefix of the pipeline, addressed by
+a digest of the raw data, of the parameters of the stages in the prefix and
+of the transforms code. Entries can be inspected and pruned from the command
+line:
+
+    python -m topobenchmarkx.data.preprocessor.stage_cache list <root>
+    python -m topobenchmarkx.data.preprocessor.stage_cache prune <root> --older-than 7
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import torch_geometric
+
+from topobenchmarkx.data.preprocessor.storage import ShardedStorage
+from topobenchmarkx.data.utils import canonicalize_parameters
+from topobenchmarkx.transforms.liftings import AbstractLifting
+
+
+class TopologyLiftingStage(torch_geometric.transforms.BaseTransform):
+    r"""Stage applying only the topology lifting of a lifting transform.
+
+    Parameters
+    ----------
+    lifting : AbstractLifting
+        The lifting whose topology lifting is applied.
+    """
+
+    def __init__(self, lifting):
+        super().__init__()
+        self.lifting = lifting
+
+    def forward(
+        self, data: torch_geometric.data.Data
+    ) -> torch_geometric.data.Data:
+        r"""Lift the topology, keeping the original attributes of the data.
+
+        Parameters
+        ----------
+        data : torch_geometric.data.Data
+            The input data to be lifted.
+
+        Returns
+        -------
+        torch_geometric.data.Data
+            The data with the lifted topology.
+        """
+        initial_data = data.to_dict()
+        lifted_topology = self.lifting.lift_topology(data)
+        return torch_geometric.data.Data(**initial_data, **lifted_topology)
+
+
+class FeatureLiftingStage(torch_geometric.transforms.BaseTransform):
+    r"""Stage applying only the feature lifting of a lifting transform.
+
+    Parameters
+    ----------
+    lifting : AbstractLifting
+        The lifting whose feature lifting is applied.
+    """
+
+    def __init__(self, lifting):
+        super().__init__()
+        self.lifting = lifting
+
+    def forward(
+        self, data: torch_geometric.data.Data
+    ) -> torch_geometric.data.Data:
+        r"""Lift the features of data whose topology is already lifted.
+
+        Parameters
+        ----------
+        data : torch_geometric.data.Data
+            The data with the lifted topology.
+
+        Returns
+        -------
+        torch_geometric.data.Data
+            The lifted data.
+        """
+        return torch_geometric.data.Data(
+            **self.lifting.feature_lifting(data.to_dict())
+        )
+
+
+def get_pipeline_stages(pre_transforms_dict) -> list[tuple]:
+    r"""Split the pre-transforms into the stages that are cached separately.
+
+    Liftings are split into their topology lifting and their feature lifting,
+    so that changing only the feature lifting reuses the lifted topology.
+
+    Parameters
+    ----------
+    pre_transforms_dict : dict
+        Dictionary of `DataTransform` objects, in the order they are applied.
+
+    Returns
+    -------
+    list[tuple]
+        List of `(name, parameters, transform)` tuples, one per stage.
+    """
+    stages = []
+    for name, transform in pre_transforms_dict.items():
+        if isinstance(transform.transform, AbstractLifting):
+            topology_parameters = {
+                key: value
+                for key, value in transform.parameters.items()
+                if key != "feature_lifting"
+            }
+            stages.append(
+                (
+                    f"{name}.topology",
+                    topology_parameters,
+                    TopologyLiftingStage(transform.transform),
+                )
+            )
+            stages.append(
+                (
+                    f"{name}.features",
+                    transform.parameters,
+                    FeatureLiftingStage(transform.transform),
+                )
+            )
+        else:
+            stages.append((name, transform.parameters, transform))
+    return stages
+
+
+class StageCache:
+    r"""On-disk cache of the outputs of pipeline prefixes.
+
+    Every entry is a directory named after its key, holding the transformed
+    data in sharded storage and a `stage.json` file describing the stages
+    that produced it. Entries are written to a temporary directory first and
+    renamed into place once complete. Pruning only removes the temporary
+    directories unmodified for `tmp_grace_period` seconds, as more recent
+    ones may still be written by another run.
+
+    Parameters
+    ----------
+    root : str
+        Directory containing the cache entries.
+    """
+
+    stage_file_name = "stage.json"
+    tmp_grace_period = 24 * 3600
+
+    def __init__(self, root):
+        self.root = root
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(root={self.root!r})"
+
+    @staticmethod
+    def key(data_digest, stages_parameters, code_version) -> str:
+        r"""Compute the key of the output of a pipeline prefix.
+
+        Parameters
+        ----------
+        data_digest : str
+            Digest of the raw data.
+        stages_parameters : list[dict]
+            Parameters of the stages in the prefix, in order.
+        code_version : str
+            Version of the transforms code.
+
+        Returns
+        -------
+        str
+            Key of the cache entry.
+        """
+        key = canonicalize_parameters(
+            {
+                "data": data_digest,
+                "parameters": stages_parameters,
+                "code": code_version,
+            }
+        )
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    def path(self, key) -> str:
+        r"""Return the directory of an entry.
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry.
+
+        Returns
+        -------
+        str
+            Directory of the entry.
+        """
+        return os.path.join(self.root, key)
+
+    def exists(self, key) -> bool:
+        r"""Check whether a complete entry exists.
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry.
+
+        Returns
+        -------
+        bool
+            Whether the entry exists.
+        """
+        return os.path.exists(
+            os.path.join(self.path(key), self.stage_file_name)
+        )
+
+    def load(self, key) -> ShardedStorage:
+        r"""Load an entry, marking it as used.
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry.
+
+        Returns
+        -------
+        ShardedStorage
+            Storage of the transformed data.
+        """
+        # The modification time of the stage file records the last use
+        os.utime(os.path.join(self.path(key), self.stage_file_name))
+        return ShardedStorage(self.path(key))
+
+    def write(
+        self, key, data_iterable, metadata, shard_size=1024
+    ) -> ShardedStorage:
+        r"""Write an entry.
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry.
+        data_iterable : iterable[torch_geometric.data.Data]
+            Transformed data objects.
+        metadata : dict
+            Description of the stages that produced the data.
+        shard_size : int, optional
+            Number of data objects per shard (default: 1024).
+
+        Returns
+        -------
+        ShardedStorage
+            Storage of the transformed data.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.root, prefix=f".{key}.tmp-")
+        try:
+            ShardedStorage.write(data_iterable, tmp_dir, shard_size)
+            with open(os.path.join(tmp_dir, self.stage_file_name), "w") as f:
+                json.dump(metadata, f, indent=4)
+            os.rename(tmp_dir, self.path(key))
+        except OSError:
+            # Another run wrote the same entry in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not self.exists(key):
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return ShardedStorage(self.path(key))
+
+    def entries(self) -> list[dict]:
+        r"""List the complete entries of the cache.
+
+        Returns
+        -------
+        list[dict]
+            Description of each entry, with its key, stages, number of
+            graphs, size in bytes and time of last use.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for key in sorted(os.listdir(self.root)):
+            if key.startswith(".") or not self.exists(key):
+                continue
+            stage_file = os.path.join(self.path(key), self.stage_file_name)
+            with open(stage_file) as f:
+                metadata = json.load(f)
+            entries.append(
+                {
+                    "key": key,
+                    "stages": metadata.get("stages", []),
+                    "num_graphs": len(ShardedStorage(self.path(key))),
+                    "size": _directory_size(self.path(key)),
+                    "last_used": os.path.getmtime(stage_file),
+                }
+            )
+        return entries
+
+    def prune(self, keys=None, older_than=None) -> list[str]:
+        r"""Remove entries from the cache.
+
+        Leftovers of interrupted writes are removed once they are unmodified
+        for `tmp_grace_period` seconds.
+
+        Parameters
+        ----------
+        keys : list[str], optional
+            Keys of the entries to remove. If None, all the entries are
+            candidates for removal (default: None).
+        older_than : float, optional
+            If given, only the entries unused for more than `older_than`
+            seconds are removed (default: None).
+
+        Returns
+        -------
+        list[str]
+            Keys of the removed entries.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        now = time.time()
+        for name in os.listdir(self.root):
+            if not name.startswith("."):
+                continue
+            # Writing a shard updates the modification time of the directory
+            try:
+                last_modified = os.path.getmtime(self.path(name))
+            except OSError:  # Renamed into place in the meantime
+                continue
+            if now - last_modified > self.tmp_grace_period:
+                shutil.rmtree(self.path(name), ignore_errors=True)
+
+        removed = []
+        for entry in self.entries():
+            if keys is not None and entry["key"] not in keys:
+                continue
+            if (
+                older_than is not None
+                and now - entry["last_used"] <= older_than
+            ):
+                continue
+            shutil.rmtree(self.path(entry["key"]))
+            removed.append(entry["key"])
+        return removed
+
+
+def _directory_size(path) -> int:
+    r"""Return the total size of the files in a directory.
+
+    Parameters
+    ----------
+    path : str
+        Path to the directory.
+
+    Returns
+    -------
+    int
+        Size in bytes.
+    """
+    return sum(
+        os.path.getsize(os.path.join(dir_path, file_name))
+        for dir_path, _, file_names in os.walk(path)
+        for file_name in file_names
+    )
+
+
+def main(argv=None) -> None:
+    r"""Command line interface to list and prune the stage cache.
+
+    Parameters
+    ----------
+    argv : list[str], optional
+        Command line arguments. If None, `sys.argv` is used (default: None).
+    """
+    parser = argparse.ArgumentParser(
+        description="Inspect the cache of pre-transform stages."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="List the entries.")
+    list_parser.add_argument("root", help="Directory of the stage cache.")
+    prune_parser = subparsers.add_parser("prune", help="Remove entries.")
+    prune_parser.add_argument("root", help="Directory of the stage cache.")
+    prune_parser.add_argument(
+        "--key", action="append", help="Key of an entry to remove."
+    )
+    prune_parser.add_argument(
+        "--older-than",
+        type=float,
+        help="Only remove the entries unused for this many days.",
+    )
+    prune_parser.add_argument(
+        "--all", action="store_true", help="Remove all the entries."
+    )
+    args = parser.parse_args(argv)
+
+    cache = StageCache(args.root)
+    if args.command == "list":
+        for entry in cache.entries():
+            last_used = time.strftime(
+                "%Y-%m-%d %H:%M", time.localtime(entry["last_used"])
+            )
+            print(
+                f"{entry['key']}  {entry['num_graphs']:>8} graphs  "
+                f"{entry['size'] / 2**20:>10.2f} MiB  {last_used}  "
+                f"{' -> '.join(entry['stages'])}"
+            )
+    else:
+        if args.key is None and args.older_than is None and not args.all:
+            parser.error("prune requires --key, --older-than or --all")
+        older_than = (
+            args.older_than * 24 * 3600
+            if args.older_than is not None
+            else None
+        )
+        for key in cache.prune(keys=args.key, older_than=older_than):
+            print(f"Removed {key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Sharded on-disk storage for preprocessed datasets."""
+
+import json
+import os
+
+import torch
+import torch_geometric
+
+
+class ShardedStorage:
+    r"""Store data objects in fixed-size shards served through memory maps.
+
+    Data objects are grouped into shards of `shard_size` elements, each saved
+    in its own file, and an index file describing the shards is written once
+    all of them are on disk. Shards are loaded with `mmap=True`, so tensors
+    are only paged in when they are accessed and the resident memory stays
+    proportional to the data that is actually used.
+
+    Parameters
+    ----------
+    root : str
+        Directory containing the shards and the index file.
+    """
+
+    index_file_name = "index.json"
+
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, self.index_file_name)) as f:
+            index = json.load(f)
+        self.num_graphs = index["num_graphs"]
+        self.shard_size = index["shard_size"]
+        self.shard_files = index["shards"]
+        self._shards = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(root={self.root!r}, num_graphs={self.num_graphs}, num_shards={len(self.shard_files)})"
+
+    def __len__(self) -> int:
+        """Return the number of stored data objects.
+
+        Returns
+        -------
+        int
+            Number of stored data objects.
+        """
+        return self.num_graphs
+
+    @classmethod
+    def exists(cls, root) -> bool:
+        r"""Check whether a complete storage exists in `root`.
+
+        Parameters
+        ----------
+        root : str
+            Directory of the storage.
+
+        Returns
+        -------
+        bool
+            Whether the index file exists.
+        """
+        return os.path.exists(os.path.join(root, cls.index_file_name))
+
+    @classmethod
+    def write(cls, data_iterable, root, shard_size=1024):
+        r"""Write data objects to sharded storage.
+
+        The data objects are consumed lazily, so at most `shard_size` of them
+        are kept in memory at the same time.
+
+        Parameters
+        ----------
+        data_iterable : iterable[torch_geometric.data.Data]
+            Data objects to store.
+        root : str
+            Directory where the shards and the index file are written.
+        shard_size : int, optional
+            Number of data objects per shard (default: 1024).
+
+        Returns
+        -------
+        ShardedStorage
+            Storage reading from `root`.
+        """
+        if shard_size < 1:
+            raise ValueError("shard_size must be greater than or equal to 1")
+        os.makedirs(root, exist_ok=True)
+        shard_files, shard, num_graphs = [], [], 0
+
+        def flush():
+            """Save the current shard to disk."""
+            file_name = f"shard_{len(shard_files):05d}.pt"
+            torch.save(shard, os.path.join(root, file_name))
+            shard_files.append(file_name)
+
+        for data in data_iterable:
+            shard.append(data.to_dict())
+            num_graphs += 1
+            if len(shard) == shard_size:
+                flush()
+                shard = []
+        if len(shard) > 0:
+            flush()
+
+        # The index is written last so its presence marks a complete storage
+        with open(os.path.join(root, cls.index_file_name), "w") as f:
+            json.dump(
+                {
+                    "num_graphs": num_graphs,
+                    "shard_size": shard_size,
+                    "shards": shard_files,
+                },
+                f,
+                indent=4,
+            )
+        return cls(root)
+
+    def _get_shard(self, shard_idx):
+        r"""Return a shard, memory-mapping it on first access.
+
+        Parameters
+        ----------
+        shard_idx : int
+            Index of the shard.
+
+        Returns
+        -------
+        list[dict]
+            Data objects of the shard, as dictionaries.
+        """
+        if shard_idx not in self._shards:
+            self._shards[shard_idx] = torch.load(
+                os.path.join(self.root, self.shard_files[shard_idx]),
+                mmap=True,
+                weights_only=False,
+            )
+        return self._shards[shard_idx]
+
+    def get(self, idx) -> torch_geometric.data.Data:
+        r"""Get a data object from the storage.
+
+        Parameters
+        ----------
+        idx : int
+            Index of the data object.
+
+        Returns
+        -------
+        torch_geometric.data.Data
+            Data object whose tensors are backed by the memory-mapped shard.
+        """
+        if idx < 0 or idx >= self.num_graphs:
+            raise IndexError(
+                f"Index {idx} out of range for storage of size {self.num_graphs}"
+            )
+        shard = self._get_shard(idx // self.shard_size)
+        return torch_geometric.data.Data.from_dict(
+            shard[idx % self.shard_size]
+        )
+
+    def __getstate__(self):
+        """Return the state to pickle, without the opened shards.
+
+        Memory maps are not shared with dataloader workers, they are re-opened
+        lazily in each process.
+
+        Returns
+        -------
+        dict
+            State of the object.
+        """
+        state = self.__dict__.copy()
+        state["_shards"] = {}
+        return state
+
+
+class LazyDataList:
+    r"""Read-only sequence view over a dataset that fetches items on access.
+
+    Parameters
+    ----------
+    dataset : torch_geometric.data.Dataset
+        Dataset whose `get` method is used to fetch the items.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)})"
+
+    def __len__(self) -> int:
+        """Return the length of the underlying dataset.
+
+        Returns
+        -------
+        int
+            Length of the dataset.
+        """
+        return len(self.dataset)
+
+    def __getitem__(self, idx):
+        """Get one item, or a list of items for a slice.
+
+        Parameters
+        ----------
+        idx : int or slice
+            Index of the item(s).
+
+        Returns
+        -------
+        torch_geometric.data.Data or list[torch_geometric.data.Data]
+            The requested item(s).
+        """
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        return self.dataset.get(idx)
+
+    def __iter__(self):
+        """Iterate over the items of the dataset.
+
+        Yields
+        ------
+        torch_geometric.data.Data
+            The next item.
+        """
+        for idx in range(len(self)):
+            yield self.dataset.get(idx)
@@ -1,27 +1,39 @@
 """Init file for data/utils module."""
 
 from .utils import (
+    LazyConnectivity,  # noqa: F401
+    canonicalize_parameters,  # noqa: F401
     ensure_serializable,  # noqa: F401
     generate_zero_sparse_connectivity,  # noqa: F401
+    get_cell_faces,  # noqa: F401
     get_complex_connectivity,  # noqa: F401
+    get_connectivity_from_boundaries,  # noqa: F401
     get_routes_from_neighborhoods,  # noqa: F401
+    hash_data_list,  # noqa: F401
     load_cell_complex_dataset,  # noqa: F401
     load_manual_graph,  # noqa: F401
     load_simplicial_dataset,  # noqa: F401
     make_hash,  # noqa: F401
     select_neighborhoods_of_interest,  # noqa: F401
+    transpose_coalesced,  # noqa: F401
 )
 
 utils_functions = [
+    "LazyConnectivity",
+    "canonicalize_parameters",
+    "get_cell_faces",
     "get_complex_connectivity",
+    "get_connectivity_from_boundaries",
     "get_routes_from_neighborhoods",
     "generate_zero_sparse_connectivity",
     "load_cell_complex_dataset",
     "load_simplicial_dataset",
     "load_manual_graph",
     "make_hash",
+    "hash_data_list",
     "ensure_serializable",
     "select_neighborhoods_of_interest",
+    "transpose_coalesced",
 ]
 
 from .split_utils import (  # noqa: E402
@@ -48,4 +60,67 @@ io_helper_functions = [
     "download_file_from_drive",
 ]
 
-__all__ = utils_functions + split_helper_functions + io_helper_functions
+from .clique_utils import (  # noqa: E402
+    get_boundary_matrices,  # noqa: F401
+    get_clique_complex,  # noqa: F401
+    get_undirected_edges,  # noqa: F401
+)
+
+clique_helper_functions = [
+    "get_boundary_matrices",
+    "get_clique_complex",
+    "get_undirected_edges",
+]
+
+from .khop_utils import (  # noqa: E402
+    get_k_hop_neighborhoods,  # noqa: F401
+)
+
+khop_helper_functions = [
+    "get_k_hop_neighborhoods",
+]
+
+from .cycle_utils import (  # noqa: E402
+    get_adjacency_in_insertion_order,  # noqa: F401
+    get_cell_boundary_matrices,  # noqa: F401
+    get_cycle_basis,  # noqa: F401
+)
+
+cycle_helper_functions = [
+    "get_adjacency_in_insertion_order",
+    "get_cell_boundary_matrices",
+    "get_cycle_basis",
+]
+
+from .partition_utils import (  # noqa: E402
+    get_node_partition,  # noqa: F401
+)
+
+partition_helper_functions = [
+    "get_node_partition",
+]
+
+from .hasse_utils import (  # noqa: E402
+    HASSE_INDEX_SUFFIX,  # noqa: F401
+    get_hasse_index,  # noqa: F401
+    get_hasse_index_key,  # noqa: F401
+    get_neighborhood_ranks,  # noqa: F401
+)
+
+hasse_helper_functions = [
+    "HASSE_INDEX_SUFFIX",
+    "get_hasse_index",
+    "get_hasse_index_key",
+    "get_neighborhood_ranks",
+]
+
+__all__ = (
+    utils_functions
+    + split_helper_functions
+    + io_helper_functions
+    + clique_helper_functions
+    + khop_helper_functions
+    + cycle_helper_functions
+    + partition_helper_functions
+    + hasse_helper_functions
+)
@@ -0,0 +1,163 @@
+"""Clique complex utilities."""
+
+import torch
+
+
+def get_undirected_edges(edge_index, num_nodes, remove_self_loops=True):
+    r"""Return the sorted, deduplicated undirected edges of a graph.
+
+    Every edge is given as `(u, v)` with `u <= v`, and the edges are sorted
+    lexicographically.
+
+    Parameters
+    ----------
+    edge_index : torch.Tensor
+        Edge indices of the graph, of shape `(2, num_edges)`.
+    num_nodes : int
+        Number of nodes of the graph.
+    remove_self_loops : bool, optional
+        If True, the self-loops are discarded (default: True).
+
+    Returns
+    -------
+    torch.Tensor
+        Undirected edges, of shape `(num_undirected_edges, 2)`.
+    """
+    edge_index = edge_index.to(torch.long)
+    if remove_self_loops:
+        edge_index = edge_index[:, edge_index[0] != edge_index[1]]
+    low = torch.minimum(edge_index[0], edge_index[1])
+    high = torch.maximum(edge_index[0], edge_index[1])
+    keys = torch.unique(low * num_nodes + high)
+    return torch.stack([keys // num_nodes, keys % num_nodes], dim=1)
+
+
+def get_clique_complex(edge_index, num_nodes, max_rank):
+    r"""Enumerate the simplices of the clique complex of a graph.
+
+    The k-cliques are obtained by extending every (k-1)-clique with the
+    neighbours of its largest vertex that are larger than it, and keeping
+    the candidates adjacent to all the other vertices of the clique. Both
+    steps are vectorised over all the cliques of a rank using the CSR
+    representation of the graph.
+
+    Parameters
+    ----------
+    edge_index : torch.Tensor
+        Edge indices of the graph, of shape `(2, num_edges)`.
+    num_nodes : int
+        Number of nodes of the graph.
+    max_rank : int
+        Maximum rank of the simplices.
+
+    Returns
+    -------
+    list[torch.Tensor]
+        Simplices of each rank, as tensors of shape `(num_simplices, rank + 1)`
+        whose rows are sorted vertex indices, sorted lexicographically. Ranks
+        without simplices are omitted, so the length of the list is the
+        dimension of the complex plus one.
+    """
+    simplices = [torch.arange(num_nodes).unsqueeze(1)]
+    if max_rank < 1:
+        return simplices
+    edges = get_undirected_edges(edge_index, num_nodes)
+    if len(edges) == 0:
+        return simplices
+    simplices.append(edges)
+
+    # Forward adjacency in CSR format, the neighbours of each node are sorted
+    rowptr = torch.zeros(num_nodes + 1, dtype=torch.long)
+    rowptr[1:] = torch.cumsum(
+        torch.bincount(edges[:, 0], minlength=num_nodes), dim=0
+    )
+    edge_keys = edges[:, 0] * num_nodes + edges[:, 1]
+
+    for _ in range(2, max_rank + 1):
+        cliques = simplices[-1]
+        last = cliques[:, -1]
+        degree = rowptr[last + 1] - rowptr[last]
+        clique_idx = torch.repeat_interleave(
+            torch.arange(len(cliques)), degree
+        )
+        if len(clique_idx) == 0:
+            break
+        # Position of each candidate among the neighbours of the last vertex
+        offsets = torch.arange(len(clique_idx)) - torch.repeat_interleave(
+            torch.cumsum(degree, dim=0) - degree, degree
+        )
+        candidates = edges[rowptr[last[clique_idx]] + offsets, 1]
+
+        # Keep the candidates adjacent to every other vertex of the clique
+        mask = torch.ones(len(candidates), dtype=torch.bool)
+        for vertex in cliques[clique_idx, :-1].t():
+            keys = vertex * num_nodes + candidates
+            position = torch.searchsorted(edge_keys, keys).clamp(
+                max=len(edge_keys) - 1
+            )
+            mask &= edge_keys[position] == keys
+        if not mask.any():
+            break
+        simplices.append(
+            torch.cat(
+                [cliques[clique_idx[mask]], candidates[mask].unsqueeze(1)],
+                dim=1,
+            )
+        )
+    return simplices
+
+
+def get_boundary_matrices(simplices):
+    r"""Compute the signed boundary matrices of a simplicial complex.
+
+    The boundary matrix of rank k maps the k-simplices to their faces: the
+    face obtained by removing the i-th vertex of a simplex has sign
+    `(-1)^i`. The rank 0 boundary matrix is a row of ones, as in TopoNetX.
+
+    Parameters
+    ----------
+    simplices : list[torch.Tensor]
+        Simplices of each rank, as returned by `get_clique_complex`.
+
+    Returns
+    -------
+    dict[int, torch.sparse_coo_tensor]
+        Signed boundary matrices, indexed by rank.
+    """
+    num_nodes = len(simplices[0])
+    boundaries = {
+        0: torch.sparse_coo_tensor(
+            torch.stack(
+                [
+                    torch.zeros(num_nodes, dtype=torch.long),
+                    torch.arange(num_nodes),
+                ]
+            ),
+            torch.ones(num_nodes),
+            (1, num_nodes),
+        ).coalesce()
+    }
+    for rank in range(1, len(simplices)):
+        faces, cofaces = simplices[rank - 1], simplices[rank]
+        num_cofaces = len(cofaces)
+        removed = torch.arange(rank + 1)
+        # Face obtained by removing each vertex, for every simplex
+        keep = removed.unsqueeze(1) != removed.unsqueeze(0)
+        boundary_faces = (
+            cofaces[:, None, :]
+            .expand(-1, rank + 1, -1)[:, keep]
+            .reshape(-1, rank)
+        )
+        # The faces are sorted lexicographically, like torch.unique(dim=0)
+        _, inverse = torch.unique(
+            torch.cat([faces, boundary_faces]), dim=0, return_inverse=True
+        )
+        rows = inverse[len(faces) :]
+        cols = torch.arange(num_cofaces).repeat_interleave(rank + 1)
+        values = (1 - 2 * (removed % 2)).to(torch.float).repeat(num_cofaces)
+        boundaries[rank] = torch.sparse_coo_tensor(
+            torch.stack([rows, cols]),
+            values,
+            (len(faces), num_cofaces),
+        ).coalesce()
+    return boundaries
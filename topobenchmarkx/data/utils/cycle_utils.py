@@ -0,0 +1,173 @@
+"""Cycle basis utilities."""
+
+import torch
+
+
+def get_adjacency_in_insertion_order(edge_index, num_nodes):
+    r"""Return the adjacency of a graph in CSR format, in insertion order.
+
+    The neighbours of every node are ordered by the first occurrence of the
+    edge joining them in `edge_index`, which is the order of the adjacency of
+    a NetworkX graph whose edges are added in the order of `edge_index`.
+
+    Parameters
+    ----------
+    edge_index : torch.Tensor
+        Edge indices of the graph, of shape `(2, num_edges)`.
+    num_nodes : int
+        Number of nodes of the graph.
+
+    Returns
+    -------
+    tuple[torch.Tensor, torch.Tensor]
+        Row pointers, of shape `(num_nodes + 1,)`, and neighbours of the
+        nodes. Self-loops appear once in the neighbours of their node.
+    """
+    edge_index = edge_index.to(torch.long)
+    src = torch.cat([edge_index[0], edge_index[1]])
+    dst = torch.cat([edge_index[1], edge_index[0]])
+    occurrence = torch.arange(edge_index.shape[1]).repeat(2)
+    keys, inverse = torch.unique(src * num_nodes + dst, return_inverse=True)
+    first = torch.full((len(keys),), len(occurrence)).scatter_reduce(
+        0, inverse, occurrence, reduce="amin"
+    )
+    src, dst = keys // num_nodes, keys % num_nodes
+    order = torch.argsort(src * len(occurrence) + first)
+    rowptr = torch.zeros(num_nodes + 1, dtype=torch.long)
+    rowptr[1:] = torch.cumsum(torch.bincount(src, minlength=num_nodes), dim=0)
+    return rowptr, dst[order]
+
+
+def get_cycle_basis(edge_index, num_nodes, max_cell_length=None):
+    r"""Compute the cycle basis of a graph found by NetworkX.
+
+    The algorithm of `networkx.cycle_basis` (Paton, 1969) is run over the CSR
+    adjacency of the graph: a spanning tree of every connected component is
+    grown from its smallest node, always expanding the last reached node, and
+    every edge outside of the tree closes a cycle with the tree path between
+    its endpoints. The walk along the tree path stops as soon as the cycle is
+    longer than `max_cell_length`, so that long cycles are never
+    materialised. Self-loops are discarded.
+
+    The walk is a pure Python loop over the nodes and edges, since the order
+    in which the stack is expanded defines the basis. A vectorised spanning
+    forest (e.g. from `scipy.sparse.csgraph`) would be faster on large graphs
+    but would return a different basis than NetworkX and TopoNetX.
+
+    Parameters
+    ----------
+    edge_index : torch.Tensor
+        Edge indices of the graph, of shape `(2, num_edges)`.
+    num_nodes : int
+        Number of nodes of the graph.
+    max_cell_length : int, optional
+        Maximum number of nodes of the cycles. If None, all the cycles of
+        the basis are returned (default: None).
+
+    Returns
+    -------
+    tuple[torch.Tensor, torch.Tensor]
+        Cycles in CSR format: the nodes of the i-th cycle, in the order they
+        are traversed, are `nodes[ptr[i]:ptr[i + 1]]`. The cycles and their
+        nodes are ordered as in `networkx.cycle_basis`.
+    """
+    rowptr, cols = get_adjacency_in_insertion_order(edge_index, num_nodes)
+    rowptr, cols = rowptr.tolist(), cols.tolist()
+    max_length = (
+        max_cell_length if max_cell_length is not None else float("inf")
+    )
+
+    pred = [-1] * num_nodes
+    used = [None] * num_nodes
+    lengths, nodes = [0], []
+    for root in range(num_nodes):
+        if used[root] is not None:
+            continue
+        stack = [root]
+        pred[root] = root
+        used[root] = set()
+        while stack:
+            z = stack.pop()
+            z_used = used[z]
+            for nbr in cols[rowptr[z] : rowptr[z + 1]]:
+                if used[nbr] is None:
+                    # New node of the spanning tree
+                    pred[nbr] = z
+                    stack.append(nbr)
+                    used[nbr] = {z}
+                elif nbr != z and nbr not in z_used:
+                    # The edge closes a cycle with the tree path from z
+                    nbr_used = used[nbr]
+                    cycle = [nbr, z]
+                    p = pred[z]
+                    while p not in nbr_used and len(cycle) < max_length:
+                        cycle.append(p)
+                        p = pred[p]
+                    if len(cycle) < max_length:
+                        cycle.append(p)
+                        nodes.extend(cycle)
+                        lengths.append(len(cycle))
+                    nbr_used.add(z)
+    ptr = torch.cumsum(torch.tensor(lengths, dtype=torch.long), dim=0)
+    return ptr, torch.tensor(nodes, dtype=torch.long)
+
+
+def get_cell_boundary_matrices(edges, ptr, nodes, num_nodes):
+    r"""Compute the signed boundary matrices of a 2-dimensional cell complex.
+
+    The conventions of TopoNetX are followed: the rank 0 boundary matrix is
+    empty, an edge `(u, v)` has sign -1 on `u` and +1 on `v`, and a 2-cell has
+    sign +1 on the edges it traverses from their smaller to their larger node
+    and -1 on the others. A self-loop has sign +1 on its node.
+
+    Parameters
+    ----------
+    edges : torch.Tensor
+        Undirected edges of the graph, of shape `(num_edges, 2)`, as returned
+        by `get_undirected_edges`.
+    ptr : torch.Tensor
+        Pointers of the 2-cells to their nodes, as returned by
+        `get_cycle_basis`.
+    nodes : torch.Tensor
+        Nodes of the 2-cells, in the order they are traversed, as returned by
+        `get_cycle_basis`.
+    num_nodes : int
+        Number of nodes of the graph.
+
+    Returns
+    -------
+    dict[int, torch.sparse_coo_tensor]
+        Signed boundary matrices, indexed by rank.
+    """
+    num_edges, num_cells = len(edges), len(ptr) - 1
+    boundaries = {
+        0: torch.sparse_coo_tensor(
+            torch.zeros(2, 0, dtype=torch.long), torch.zeros(0), (0, num_nodes)
+        ).coalesce()
+    }
+    not_loop = edges[:, 0] != edges[:, 1]
+    edge_ids = torch.arange(num_edges)
+    boundaries[1] = torch.sparse_coo_tensor(
+        torch.stack(
+            [
+                torch.cat([edges[not_loop, 0], edges[:, 1]]),
+                torch.cat([edge_ids[not_loop], edge_ids]),
+            ]
+        ),
+        torch.cat([-torch.ones(int(not_loop.sum())), torch.ones(num_edges)]),
+        (num_nodes, num_edges),
+    ).coalesce()
+
+    # Each node of a cell is followed by the next one, cyclically
+    following = torch.arange(len(nodes)) + 1
+    following[ptr[1:] - 1] = ptr[:-1]
+    src, dst = nodes, nodes[following]
+    keys = torch.minimum(src, dst) * num_nodes + torch.maximum(src, dst)
+    rows = torch.searchsorted(edges[:, 0] * num_nodes + edges[:, 1], keys)
+    cols = torch.repeat_interleave(torch.arange(num_cells), ptr.diff())
+    boundaries[2] = torch.sparse_coo_tensor(
+        torch.stack([rows, cols]),
+        torch.where(src < dst, 1.0, -1.0),
+        (num_edges, num_cells),
+    ).coalesce()
+    return boundaries
@@ -0,0 +1,69 @@
+"""Utilities for the Hasse graph indices precomputed at preprocessing time."""
+
+from .utils import get_routes_from_neighborhoods
+
+HASSE_INDEX_SUFFIX = "_hasse_index"
+
+
+def get_hasse_index_key(neighborhood):
+    r"""Get the name of the precomputed Hasse graph index of a neighborhood.
+
+    Parameters
+    ----------
+    neighborhood : str
+        Name of the neighborhood, ex: "up_adjacency-0".
+
+    Returns
+    -------
+    str
+        Name of the index in the data.
+    """
+    return f"{neighborhood}{HASSE_INDEX_SUFFIX}"
+
+
+def get_neighborhood_ranks(neighborhood):
+    r"""Get the ranks of the rows and columns of the matrix of a neighborhood.
+
+    The rows of an incidence neighborhood are the cells of its destination
+    rank, the rows of the other neighborhoods are the cells of its source
+    rank. The columns are the cells of its source rank.
+
+    Parameters
+    ----------
+    neighborhood : str
+        Name of the neighborhood, ex: "up_adjacency-0".
+
+    Returns
+    -------
+    tuple[int, int]
+        The ranks of the rows and of the columns.
+    """
+    src_rank, dst_rank = get_routes_from_neighborhoods([neighborhood])[0]
+    if "incidence" in neighborhood:
+        return dst_rank, src_rank
+    return src_rank, src_rank
+
+
+def get_hasse_index(data, neighborhood):
+    r"""Get the indices of the entries of the matrix of a neighborhood.
+
+    The index precomputed by the `HasseGraphExpansion` transform is used when
+    available, otherwise the indices are read from the (coalesced) matrix.
+
+    Parameters
+    ----------
+    data : torch_geometric.data.Data
+        The data, or batch, containing the complex.
+    neighborhood : str
+        Name of the neighborhood, ex: "up_adjacency-0".
+
+    Returns
+    -------
+    torch.Tensor
+        Row and column indices of the entries, of shape `(2, num_entries)`,
+        sorted by row then column.
+    """
+    hasse_index = getattr(data, get_hasse_index_key(neighborhood), None)
+    if hasse_index is None:
+        hasse_index = getattr(data, neighborhood).coalesce().indices()
+    return hasse_index
@@ -0,0 +1,326 @@
+"""K-hop neighborhood utilities."""
+
+from itertools import chain
+
+import torch
+import torch_geometric
+
+
+def get_k_hop_neighborhoods(edge_index, num_nodes, k):
+    r"""Compute the k-hop neighborhoods of all the nodes of a graph at once.
+
+    The graph is made undirected and the neighborhoods are obtained as the
+    support of :math:`(A + I)^k`, computed with `k` sparse products whose
+    values are reset to one after each product. Every node belongs to its own
+    neighborhood, including isolated nodes.
+
+    Parameters
+    ----------
+    edge_index : torch.Tensor
+        Edge indices of the graph, of shape `(2, num_edges)`.
+    num_nodes : int
+        Number of nodes of the graph.
+    k : int
+        Number of hops.
+
+    Returns
+    -------
+    torch.sparse_coo_tensor
+        Coalesced matrix of shape `(num_nodes, num_nodes)` whose entry
+        `(i, j)` is one if node `j` is at most `k` hops away from node `i`.
+    """
+    edge_index = torch_geometric.utils.to_undirected(
+        edge_index.to(torch.long), num_nodes=num_nodes
+    )
+    loops = torch.arange(num_nodes).repeat(2, 1)
+    adjacency = torch.sparse_coo_tensor(
+        torch.cat([edge_index, loops], dim=1),
+        torch.ones(edge_index.shape[1] + num_nodes),
+        (num_nodes, num_nodes),
+    ).coalesce()
+    neighborhoods = torch.sparse_coo_tensor(
+        loops, torch.ones(num_nodes), (num_nodes, num_nodes)
+    ).coalesce()
+    for _ in range(k):
+        reached = torch.sparse.mm(neighborhoods, adjacency).coalesce()
+        if reached._nnz() == neighborhoods._nnz():
+            # No new node can be reached
+            break
+        neighborhoods = torch.sparse_coo_tensor(
+            reached.indices(),
+            torch.ones(reached._nnz()),
+            (num_nodes, num_nodes),
+        ).coalesce()
+    return neighborhoods
+
+
+def get_binomial_table(n, k):
+    r"""Tabulate the binomial coefficients :math:`\binom{c}{j}`.
+
+    Parameters
+    ----------
+    n : int
+        Largest value of `c`.
+    k : int
+        Largest value of `j`.
+
+    Returns
+    -------
+    torch.Tensor
+        Table of shape `(n + 1, k + 1)` whose entry `(c, j)` is
+        :math:`\binom{c}{j}`.
+    """
+    binomials = torch.zeros(n + 1, k + 1, dtype=torch.long)
+    binomials[:, 0] = 1
+    for j in range(1, k + 1):
+        # Hockey-stick identity: C(c, j) is the sum of C(m, j - 1) for m < c
+        binomials[1:, j] = torch.cumsum(binomials[:-1, j - 1], dim=0)
+    return binomials
+
+
+def get_closed_neighborhoods(edge_index, num_nodes):
+    r"""Return the closed 1-hop neighborhoods of a graph in CSR format.
+
+    Parameters
+    ----------
+    edge_index : torch.Tensor
+        Edge indices of the graph, of shape `(2, num_edges)`.
+    num_nodes : int
+        Number of nodes of the graph.
+
+    Returns
+    -------
+    torch.Tensor
+        Row pointers, of shape `(num_nodes + 1,)`.
+    torch.Tensor
+        Sorted neighbours of every node, including the node itself.
+    """
+    neighborhoods = get_k_hop_neighborhoods(edge_index, num_nodes, 1)
+    rows, cols = neighborhoods.indices()
+    rowptr = torch.zeros(num_nodes + 1, dtype=torch.long)
+    rowptr[1:] = torch.cumsum(torch.bincount(rows, minlength=num_nodes), 0)
+    return rowptr, cols
+
+
+def iter_neighborhood_subsets(rowptr, cols, size, chunk_size=2**16):
+    r"""Iterate over the subsets of the neighborhoods of a graph, in chunks.
+
+    The subsets of `size` nodes of every neighborhood are indexed with the
+    combinatorial number system and unranked in bulk, so the memory used
+    only depends on `chunk_size`.
+
+    Parameters
+    ----------
+    rowptr : torch.Tensor
+        Row pointers of the neighborhoods, as returned by
+        `get_closed_neighborhoods`.
+    cols : torch.Tensor
+        Sorted neighbours of every node.
+    size : int
+        Number of nodes of the subsets.
+    chunk_size : int, optional
+        Number of subsets per chunk (default: 2**16).
+
+    Yields
+    ------
+    torch.Tensor
+        Subsets, of shape `(num_subsets, size)`, whose rows are sorted.
+    torch.Tensor
+        Node whose neighborhood contains each subset.
+    """
+    degree = rowptr[1:] - rowptr[:-1]
+    max_degree = int(degree.max()) if len(degree) > 0 else 0
+    if max_degree < size:
+        return
+    # One contiguous row per j, for searchsorted
+    binomials = get_binomial_table(max_degree, size).t().contiguous()
+    counts = binomials[size, degree]
+    offsets = torch.cumsum(counts, dim=0)
+    starts = offsets - counts
+    total = int(offsets[-1])
+    for low in range(0, total, chunk_size):
+        index = torch.arange(low, min(low + chunk_size, total))
+        center = torch.searchsorted(offsets, index, right=True)
+        rank = index - starts[center]
+        positions = torch.empty(len(index), size, dtype=torch.long)
+        for i in range(size - 1, -1, -1):
+            positions[:, i] = (
+                torch.searchsorted(binomials[i + 1], rank, right=True) - 1
+            )
+            rank = rank - binomials[i + 1, positions[:, i]]
+        yield cols[rowptr[center].unsqueeze(1) + positions], center
+
+
+def sample_neighborhood_simplices(
+    edge_index,
+    num_nodes,
+    max_size,
+    max_simplices,
+    generator=None,
+    chunk_size=2**16,
+):
+    r"""Sample the simplices spanned by the 1-hop neighborhoods of a graph.
+
+    For every size from 2 to `max_size`, the candidates are the subsets of
+    that many nodes of the closed 1-hop neighborhood of some node. They are
+    streamed in chunks with `iter_neighborhood_subsets`, and a candidate is
+    only kept for the smallest node whose neighborhood contains it, so that
+    every simplex appears once in the stream. That node is found from the
+    smallest common neighbour of each pair of vertices, falling back to an
+    explicit check when no pair decides it. Up to `max_simplices` candidates
+    of each size are sampled uniformly with a reservoir that keeps the
+    candidates with the smallest random priorities, so the memory does not
+    depend on the number of candidates.
+
+    Parameters
+    ----------
+    edge_index : torch.Tensor
+        Edge indices of the graph, of shape `(2, num_edges)`.
+    num_nodes : int
+        Number of nodes of the graph.
+    max_size : int
+        Maximum number of nodes of the simplices.
+    max_simplices : int
+        Maximum number of simplices of each size to sample.
+    generator : torch.Generator, optional
+        Generator of the random priorities (default: None).
+    chunk_size : int, optional
+        Number of candidates processed at once (default: 2**16).
+
+    Returns
+    -------
+    dict[int, torch.Tensor]
+        Sampled simplices of each size, as tensors of shape
+        `(num_simplices, size)` whose rows are sorted vertex indices.
+    dict[int, int]
+        Number of candidate simplices of each size that were not sampled.
+    """
+    rowptr, cols = get_closed_neighborhoods(edge_index, num_nodes)
+    rows = torch.repeat_interleave(
+        torch.arange(num_nodes), rowptr[1:] - rowptr[:-1]
+    )
+    keys = rows * num_nodes + cols
+
+    # Smallest node whose neighborhood contains each pair of nodes. The
+    # chunks are buffered and merged once they outgrow the merged pairs
+    pair_keys = torch.empty(0, dtype=torch.long)
+    pair_centers = torch.empty(0, dtype=torch.long)
+    buffered_keys, buffered_centers = [], []
+    subsets = iter_neighborhood_subsets(rowptr, cols, 2, chunk_size)
+    for pairs, center in chain(subsets, [(None, None)]):
+        if pairs is not None:
+            buffered_keys.append(pairs[:, 0] * num_nodes + pairs[:, 1])
+            buffered_centers.append(center)
+            if sum(map(len, buffered_keys)) < len(pair_keys):
+                continue
+        pair_keys, inverse = torch.unique(
+            torch.cat([pair_keys, *buffered_keys]), return_inverse=True
+        )
+        pair_centers = torch.full_like(pair_keys, num_nodes).scatter_reduce(
+            0,
+            inverse,
+            torch.cat([pair_centers, *buffered_centers]),
+            reduce="amin",
+        )
+        buffered_keys, buffered_centers = [], []
+
+    sampled, num_dropped = {}, {}
+    for size in range(2, max_size + 1):
+        reservoir = torch.empty(0, size, dtype=torch.long)
+        priorities = torch.empty(0, dtype=torch.float64)
+        num_candidates = 0
+        for simplices, center in iter_neighborhood_subsets(
+            rowptr, cols, size, chunk_size
+        ):
+            canonical = torch.zeros(len(simplices), dtype=torch.bool)
+            for i in range(size):
+                for j in range(i + 1, size):
+                    position = torch.searchsorted(
+                        pair_keys,
+                        simplices[:, i] * num_nodes + simplices[:, j],
+                    )
+                    canonical |= pair_centers[position] == center
+            undecided = torch.nonzero(~canonical).squeeze(1)
+            if size > 2 and len(undecided) > 0:
+                canonical[undecided] = ~_has_smaller_center(
+                    simplices[undecided],
+                    center[undecided],
+                    rowptr,
+                    cols,
+                    keys,
+                    num_nodes,
+                )
+            simplices = simplices[canonical]
+
+            num_candidates += len(simplices)
+            reservoir = torch.cat([reservoir, simplices])
+            priorities = torch.cat(
+                [
+                    priorities,
+                    torch.rand(
+                        len(simplices),
+                        generator=generator,
+                        dtype=torch.float64,
+                    ),
+                ]
+            )
+            if len(reservoir) > max_simplices:
+                kept = torch.topk(
+                    priorities, max_simplices, largest=False
+                ).indices
+                reservoir, priorities = reservoir[kept], priorities[kept]
+        sampled[size] = reservoir
+        num_dropped[size] = num_candidates - len(reservoir)
+    return sampled, num_dropped
+
+
+def _has_smaller_center(simplices, center, rowptr, cols, keys, num_nodes):
+    r"""Check whether subsets are contained in the neighborhood of a smaller node.
+
+    Such a node is a neighbour of the first vertex of the subset, so the
+    neighbours of the first vertex smaller than `center` are checked.
+
+    Parameters
+    ----------
+    simplices : torch.Tensor
+        Subsets, of shape `(num_subsets, size)`, whose rows are sorted.
+    center : torch.Tensor
+        Node whose neighborhood contains each subset.
+    rowptr : torch.Tensor
+        Row pointers of the neighborhoods.
+    cols : torch.Tensor
+        Sorted neighbours of every node.
+    keys : torch.Tensor
+        Sorted keys `row * num_nodes + col` of the neighborhoods.
+    num_nodes : int
+        Number of nodes of the graph.
+
+    Returns
+    -------
+    torch.Tensor
+        Boolean mask of the subsets with a smaller node.
+    """
+    first = simplices[:, 0]
+    num_smaller = (
+        torch.searchsorted(keys, first * num_nodes + center) - rowptr[first]
+    )
+    subset_idx = torch.repeat_interleave(
+        torch.arange(len(simplices)), num_smaller
+    )
+    smaller = cols[
+        rowptr[first[subset_idx]]
+        + torch.arange(len(subset_idx))
+        - torch.repeat_interleave(
+            torch.cumsum(num_smaller, dim=0) - num_smaller, num_smaller
+        )
+    ]
+    covered = torch.ones(len(subset_idx), dtype=torch.bool)
+    for vertex in simplices[subset_idx, 1:].t():
+        subset_keys = vertex * num_nodes + smaller
+        position = torch.searchsorted(keys, subset_keys).clamp(
+            max=len(keys) - 1
+        )
+        covered &= keys[position] == subset_keys
+    has_smaller = torch.zeros(len(simplices), dtype=torch.bool)
+    has_smaller[subset_idx[covered]] = True
+    return has_smaller
@@ -5,7 +5,9 @@ import os
 import numpy as np
 import torch
 from sklearn.model_selection import StratifiedKFold
+from torch_geometric.data import Data
 
+from topobenchmarkx.data.utils.partition_utils import get_node_partition
 from topobenchmarkx.dataloader import DataloadDataset
 
 
@@ -175,6 +177,10 @@ def random_splitting(labels, parameters, global_data_seed=42):
 def assing_train_val_test_mask_to_graphs(dataset, split_idx):
     r"""Split the graph dataset into train, validation, and test datasets.
 
+    The splits are index-backed views of the data list of the dataset, so the
+    graphs are neither copied nor modified. The `train_mask`, `val_mask` and
+    `test_mask` attributes of the graphs of a split are shared by all of them.
+
     Parameters
     ----------
     dataset : torch_geometric.data.Dataset
@@ -187,45 +193,109 @@ def assing_train_val_test_mask_to_graphs(dataset, split_idx):
     list:
         List containing the train, validation, and test datasets.
     """
-    data_train_lst, data_val_lst, data_test_lst = [], [], []
-
-    # Go over each of the graph and assign correct label
-    for i in range(len(dataset)):
-        graph = dataset[i]
-        assigned = False
-        if i in split_idx["train"]:
-            graph.train_mask = torch.Tensor([1]).long()
-            graph.val_mask = torch.Tensor([0]).long()
-            graph.test_mask = torch.Tensor([0]).long()
-            data_train_lst.append(graph)
-            assigned = True
-
-        if i in split_idx["valid"]:
-            graph.train_mask = torch.Tensor([0]).long()
-            graph.val_mask = torch.Tensor([1]).long()
-            graph.test_mask = torch.Tensor([0]).long()
-            data_val_lst.append(graph)
-            assigned = True
-
-        if i in split_idx["test"]:
-            graph.train_mask = torch.Tensor([0]).long()
-            graph.val_mask = torch.Tensor([0]).long()
-            graph.test_mask = torch.Tensor([1]).long()
-            data_test_lst.append(graph)
-            assigned = True
-        if not assigned:
-            raise ValueError("Graph not in any split")
-
-    return (
-        DataloadDataset(data_train_lst),
-        DataloadDataset(data_val_lst),
-        DataloadDataset(data_test_lst),
-    )
+    assigned = torch.zeros(len(dataset.data_list), dtype=torch.bool)
+    splits = []
+    for split, key in zip(
+        ["train", "val", "test"], ["train", "valid", "test"], strict=True
+    ):
+        idx = torch.as_tensor(split_idx[key], dtype=torch.long)
+        assigned[idx] = True
+        masks = {
+            f"{name}_mask": torch.tensor([int(name == split)])
+            for name in ["train", "val", "test"]
+        }
+        splits.append(
+            DataloadDataset(dataset.data_list, shared_attrs=masks)[idx]
+        )
+    if not assigned.all():
+        raise ValueError("Graph not in any split")
+
+    return tuple(splits)
+
+
+def load_node_partition(edge_index, num_nodes, parameters):
+    r"""Load the partition of the nodes of a graph into `parameters.num_parts` parts.
+
+    If the partition already exists it loads it automatically, otherwise it creates the
+    partition file for the subsequent runs. The partition does not depend on the data seed,
+    so it is shared by all the splits.
+
+    Parameters
+    ----------
+    edge_index : torch.Tensor
+        Edge indices of the graph.
+    num_nodes : int
+        Number of nodes of the graph.
+    parameters : DictConfig
+        Configuration parameters.
+
+    Returns
+    -------
+    torch.Tensor
+        Part of each node.
+    """
+    num_parts = parameters.num_parts
+    partition_dir = os.path.join(parameters.data_split_dir, "partitions")
+    if not os.path.isdir(partition_dir):
+        os.makedirs(partition_dir)
+
+    partition_path = os.path.join(partition_dir, f"num_parts={num_parts}.npy")
+    if os.path.isfile(partition_path):
+        partition = torch.from_numpy(np.load(partition_path))
+        if partition.numel() == num_nodes:
+            return partition
+
+    partition = get_node_partition(edge_index, num_nodes, num_parts)
+    np.save(partition_path, partition.numpy())
+    return partition
+
+
+def split_into_partitions(data, partition):
+    r"""Split a lifted graph into the sub-complexes induced by a partition of its nodes.
+
+    As in Cluster-GCN, the cells of every rank are assigned to the part containing all their
+    vertices, and the cells spanning several parts are dropped. The train, validation and test
+    masks of the sub-complexes are boolean masks over their nodes, so that several sub-complexes
+    can be batched together.
+
+    Parameters
+    ----------
+    data : torch_geometric.data.Data
+        Lifted graph, with the train, validation and test node indices.
+    partition : torch.Tensor
+        Part of each node.
+
+    Returns
+    -------
+    list[torch_geometric.data.Data]
+        Sub-complex of each part.
+    """
+    # The sampler depends on the data utilities, so it is imported lazily
+    from topobenchmarkx.dataloader.neighbor_sampler import SubComplexSampler
+
+    sampler = SubComplexSampler(data, num_hops=0, mask_key=None)
+    split_masks = {}
+    for key in ["train_mask", "val_mask", "test_mask"]:
+        split_masks[key] = torch.zeros(partition.numel(), dtype=torch.bool)
+        split_masks[key][data[key]] = True
+
+    data_lst = []
+    for part in range(int(partition.max()) + 1):
+        nodes = (partition == part).nonzero().view(-1)
+        sub = sampler.sample(nodes)
+        for key, mask in split_masks.items():
+            sub[key] = mask[nodes]
+        data_lst.append(Data(**sub))
+    return data_lst
 
 
 def load_transductive_splits(dataset, parameters):
     r"""Load the graph dataset with the specified split.
 
+    If `parameters.num_parts` is given, the graph is split into the sub-complexes induced by a
+    partition of its nodes, and the same dataset of sub-complexes is returned for training,
+    validation and testing, each of them using its own mask.
+
     Parameters
     ----------
     dataset : torch_geometric.data.Dataset
@@ -274,6 +344,13 @@ def load_transductive_splits(dataset, parameters):
             data.train_mask
         ].std(0)
 
+    if parameters.get("num_parts") is not None:
+        # Cluster-GCN style training over the sub-complexes of the parts
+        num_nodes = data.x_0.size(0) if "x_0" in data else data.num_nodes
+        partition = load_node_partition(data.edge_index, num_nodes, parameters)
+        dataset = DataloadDataset(split_into_partitions(data, partition))
+        return dataset, dataset, dataset
+
     return DataloadDataset([data]), None, None
 
 
@@ -1,13 +1,14 @@
 """Data utilities."""
 
 import hashlib
+import json
 
 import networkx as nx
-import numpy as np
 import omegaconf
 import torch
 import torch_geometric
 from topomodelx.utils.sparse import from_sparse
+from toponetx.classes import CellComplex
 
 
 def get_routes_from_neighborhoods(neighborhoods):
@@ -40,10 +41,14 @@ def get_routes_from_neighborhoods(neighborhoods):
 
 
 def get_complex_connectivity(
-    complex, max_rank, neighborhoods=None, signed=False
+    complex, max_rank, neighborhoods=None, signed=False, lazy=False
 ):
     """Get the connectivity matrices for the complex.
 
+    Each incidence matrix is computed once and the other connectivity
+    matrices are derived from them. If `neighborhoods` is given, only the
+    matrices they require are computed.
+
     Parameters
     ----------
     complex : toponetx.CellComplex or toponetx.SimplicialComplex
@@ -54,52 +59,460 @@ def get_complex_connectivity(
         List of neighborhoods of interest.
     signed : bool, optional
         If True, returns signed connectivity matrices.
+    lazy : bool, optional
+        If True, only the incidence matrices and the manifest needed to
+        derive the other matrices are returned.
 
     Returns
     -------
     dict
         Dictionary containing the connectivity matrices.
     """
-    practical_shape = list(
-        np.pad(list(complex.shape), (0, max_rank + 1 - len(complex.shape)))
-    )
-    connectivity = {}
+    boundaries = {}
     for rank_idx in range(max_rank + 1):
-        for connectivity_info in [
-            "incidence",
-            "down_laplacian",
-            "up_laplacian",
-            "adjacency",
-            "coadjacency",
-            "hodge_laplacian",
-        ]:
+        try:
+            boundaries[rank_idx] = from_sparse(
+                complex.incidence_matrix(rank=rank_idx, signed=True)
+            )
+        except ValueError:
+            continue
+    return get_connectivity_from_boundaries(
+        boundaries,
+        list(complex.shape),
+        max_rank,
+        neighborhoods=neighborhoods,
+        signed=signed,
+        cell_adjacency=isinstance(complex, CellComplex),
+        lazy=lazy,
+    )
+
+
+def get_required_connectivity(neighborhoods):
+    """Get the connectivity matrices required by the neighborhoods.
+
+    Parameters
+    ----------
+    neighborhoods : list
+        List of neighborhoods of interest.
+
+    Returns
+    -------
+    set
+        Names of the connectivity matrices, besides the incidence matrices,
+        used by `select_neighborhoods_of_interest` for these neighborhoods.
+    """
+    required = set()
+    for neighborhood in neighborhoods:
+        split = neighborhood.split("-")
+        if len(split) == 1:
+            required.add(neighborhood)
+        elif len(split) == 2:
+            neighborhood_type, src_rank = split
+            if neighborhood_type == "up_adjacency":
+                required.add(f"adjacency_{src_rank}")
+            elif neighborhood_type == "down_adjacency":
+                required.add(f"coadjacency_{src_rank}")
+            elif "laplacian" in neighborhood_type:
+                required.add(f"{neighborhood_type}_{src_rank}")
+    return required
+
+
+class LazyConnectivity(dict):
+    """Connectivity matrices of a complex, derived on demand from its incidences.
+
+    The laplacians, adjacencies and coadjacencies are derived from the
+    boundary matrices with sparse products, following the conventions of
+    TopoNetX, the first time they are accessed, and are cached afterwards.
+    Neighborhoods, such as `"up_adjacency-0"`, are also derived on access with
+    `select_neighborhoods_of_interest`.
+
+    Parameters
+    ----------
+    boundaries : dict[int, torch.sparse_coo_tensor]
+        Boundary matrices, indexed by rank. Ranks without a boundary matrix
+        get zero connectivity matrices.
+    shape : list[int]
+        Number of cells of each rank of the complex.
+    max_rank : int
+        Maximum rank of the complex.
+    signed : bool, optional
+        If True, the connectivity matrices are signed (default: False).
+    cell_adjacency : bool, optional
+        If True, the (co)adjacencies count the shared cofaces (faces) using
+        the unsigned boundary matrices, as TopoNetX does for cell complexes.
+        Otherwise they are the off-diagonal parts of the laplacians, as for
+        simplicial complexes (default: False).
+    """
+
+    connectivity_types = (
+        "incidence",
+        "down_laplacian",
+        "up_laplacian",
+        "adjacency",
+        "coadjacency",
+        "hodge_laplacian",
+    )
+
+    def __init__(
+        self, boundaries, shape, max_rank, signed=False, cell_adjacency=False
+    ):
+        super().__init__()
+        self.boundaries = boundaries
+        self.shape = [int(n) for n in shape][: max_rank + 1]
+        self.shape += [0] * (max_rank + 1 - len(self.shape))
+        self.max_rank = max_rank
+        self.signed = signed
+        self.cell_adjacency = cell_adjacency
+        self._products = {}
+
+    def __missing__(self, key):
+        value = self.derive(key)
+        self[key] = value
+        return value
+
+    def derive(self, key):
+        """Derive a connectivity matrix, without caching it.
+
+        Parameters
+        ----------
+        key : str
+            Name of the connectivity matrix, such as `"up_laplacian_1"`, or of
+            a neighborhood, such as `"up_adjacency-0"`.
+
+        Returns
+        -------
+        torch.sparse_coo_tensor
+            The connectivity matrix.
+        """
+        if "-" in key:
             try:
-                connectivity[f"{connectivity_info}_{rank_idx}"] = from_sparse(
-                    getattr(complex, f"{connectivity_info}_matrix")(
-                        rank=rank_idx, signed=signed
-                    )
-                )
+                return select_neighborhoods_of_interest(self, [key])[key]
             except ValueError:
-                if connectivity_info == "incidence":
-                    connectivity[f"{connectivity_info}_{rank_idx}"] = (
-                        generate_zero_sparse_connectivity(
-                            m=practical_shape[rank_idx - 1],
-                            n=practical_shape[rank_idx],
-                        )
-                    )
-                else:
-                    connectivity[f"{connectivity_info}_{rank_idx}"] = (
-                        generate_zero_sparse_connectivity(
-                            m=practical_shape[rank_idx],
-                            n=practical_shape[rank_idx],
-                        )
-                    )
+                raise KeyError(key) from None
+        connectivity_type, _, rank = key.rpartition("_")
+        if (
+            connectivity_type not in self.connectivity_types
+            or not rank.isdigit()
+            or int(rank) > self.max_rank
+        ):
+            raise KeyError(key)
+        rank = int(rank)
+        size = self.shape[rank]
+
+        if connectivity_type == "incidence":
+            if rank not in self.boundaries:
+                return generate_zero_sparse_connectivity(
+                    m=self.shape[rank - 1], n=size
+                )
+            incidence = self.boundaries[rank].coalesce()
+            return incidence if self.signed else self._postprocess(incidence)
+
+        up = self._product(rank + 1, "up")
+        down = self._product(rank, "down")
+        if connectivity_type == "down_laplacian":
+            matrix = self._postprocess(down) if down is not None else None
+        elif connectivity_type == "up_laplacian":
+            matrix = self._postprocess(up) if up is not None else None
+        elif connectivity_type == "hodge_laplacian":
+            laplacians = [m for m in [up, down] if m is not None]
+            matrix = (
+                self._postprocess(sum(laplacians[1:], laplacians[0]))
+                if len(laplacians) > 0
+                else None
+            )
+        else:
+            direction = "up" if connectivity_type == "adjacency" else "down"
+            matrix = self._product(
+                rank + 1 if direction == "up" else rank,
+                direction,
+                absolute=self.cell_adjacency,
+            )
+            if matrix is not None:
+                matrix = self._postprocess(matrix, remove_diagonal=True)
+        return (
+            matrix
+            if matrix is not None
+            else generate_zero_sparse_connectivity(m=size, n=size)
+        )
+
+    def _postprocess(self, matrix, remove_diagonal=False):
+        """Drop the zero (and optionally the diagonal) entries of a matrix.
+
+        Parameters
+        ----------
+        matrix : torch.sparse_coo_tensor
+            Signed connectivity matrix.
+        remove_diagonal : bool, optional
+            If True, the diagonal entries are removed.
+
+        Returns
+        -------
+        torch.sparse_coo_tensor
+            Connectivity matrix, unsigned unless `signed` is True.
+        """
+        matrix = matrix.coalesce()
+        indices, values = matrix.indices(), matrix.values()
+        mask = values != 0
+        if remove_diagonal:
+            mask &= indices[0] != indices[1]
+        values = values[mask] if self.signed else values[mask].abs()
+        return torch.sparse_coo_tensor(
+            indices[:, mask], values, matrix.shape
+        ).coalesce()
+
+    def _product(self, rank, direction, absolute=False):
+        """Multiply a boundary matrix by its transpose, caching the result.
+
+        Parameters
+        ----------
+        rank : int
+            Rank of the boundary matrix.
+        direction : str
+            Either "up", for :math:`B B^T`, or "down", for :math:`B^T B`.
+        absolute : bool, optional
+            If True, the unsigned boundary matrix is used.
+
+        Returns
+        -------
+        torch.sparse_coo_tensor or None
+            The product, or None if there is no boundary matrix of this rank.
+        """
+        if rank not in self.boundaries or (direction == "down" and rank == 0):
+            return None
+        key = (rank, direction, absolute)
+        if key not in self._products:
+            incidence = self.boundaries[rank].coalesce()
+            if absolute:
+                incidence = torch.sparse_coo_tensor(
+                    incidence.indices(),
+                    incidence.values().abs(),
+                    incidence.shape,
+                )
+            self._products[key] = (
+                torch.sparse.mm(incidence, incidence.t())
+                if direction == "up"
+                else torch.sparse.mm(incidence.t(), incidence)
+            )
+        return self._products[key]
+
+    def manifest(self) -> str:
+        """Describe how to derive the connectivity from the incidences.
+
+        Returns
+        -------
+        str
+            JSON description of the connectivity, stored with the incidence
+            matrices in lazy mode.
+        """
+        return json.dumps(
+            {
+                "max_rank": self.max_rank,
+                "signed": self.signed,
+                "cell_adjacency": self.cell_adjacency,
+            }
+        )
+
+    @staticmethod
+    def orient(incidence, rank):
+        """Recover the signs of the unsigned incidence matrix of a simplicial complex.
+
+        The simplices of each rank are indexed in lexicographic order, so the
+        i-th face of a simplex in that order is obtained by removing its
+        `(rank - i)`-th vertex and has sign :math:`(-1)^{rank - i}`.
+
+        Parameters
+        ----------
+        incidence : torch.sparse_coo_tensor
+            Unsigned incidence matrix.
+        rank : int
+            Rank of the incidence matrix.
+
+        Returns
+        -------
+        torch.sparse_coo_tensor
+            Signed incidence matrix.
+        """
+        incidence = incidence.coalesce()
+        if rank == 0:
+            return incidence
+        rows, cols = incidence.indices()
+        order = torch.argsort(cols * incidence.shape[0] + rows)
+        counts = torch.bincount(cols, minlength=incidence.shape[1])
+        starts = torch.cumsum(counts, dim=0) - counts
+        position = torch.empty_like(order)
+        position[order] = torch.arange(len(order)) - starts[cols[order]]
+        signs = 1 - 2 * ((rank - position) % 2)
+        return torch.sparse_coo_tensor(
+            incidence.indices(),
+            incidence.values().abs() * signs,
+            incidence.shape,
+        ).coalesce()
+
+    @classmethod
+    def from_manifest(cls, incidences, manifest):
+        """Build the lazy connectivity of data stored in lazy mode.
+
+        The stored incidence matrices are used as boundary matrices. Unsigned
+        incidence matrices of simplicial complexes are oriented first with
+        `orient`, so that the derived matrices match the eager ones. Cell
+        complexes have no canonical orientation, so they are only stored in
+        lazy mode with signed incidences (see
+        `get_connectivity_from_boundaries`).
+
+        Parameters
+        ----------
+        incidences : dict[int, torch.sparse_coo_tensor]
+            Stored incidence matrices, indexed by rank.
+        manifest : str
+            Manifest returned by `manifest`.
+
+        Returns
+        -------
+        LazyConnectivity
+            The lazy connectivity, with the incidence matrices already set.
+        """
+        manifest = json.loads(manifest)
+        boundaries = incidences
+        if not manifest["signed"] and not manifest["cell_adjacency"]:
+            boundaries = {
+                rank: cls.orient(incidence, rank)
+                for rank, incidence in incidences.items()
+            }
+        connectivity = cls(
+            boundaries,
+            [incidences[rank].shape[1] for rank in sorted(incidences)],
+            manifest["max_rank"],
+            signed=manifest["signed"],
+            cell_adjacency=manifest["cell_adjacency"],
+        )
+        for rank, incidence in incidences.items():
+            connectivity[f"incidence_{rank}"] = incidence
+        return connectivity
+
+    @classmethod
+    def from_data(cls, data, cache=None):
+        """Build the lazy connectivity of a data object stored in lazy mode.
+
+        Parameters
+        ----------
+        data : torch_geometric.data.Data or Mapping
+            Data storing the incidence matrices and a `connectivity_manifest`,
+            possibly batched.
+        cache : LazyConnectivity, optional
+            Lazy connectivity built previously for the data. It is returned
+            if it was built from the same incidence matrices (default: None).
+
+        Returns
+        -------
+        LazyConnectivity or None
+            The lazy connectivity, or None if the data does not store a
+            connectivity manifest.
+        """
+        if "connectivity_manifest" not in data:
+            return None
+        manifest = data["connectivity_manifest"]
+        # Batching turns the manifest into a list of identical manifests
+        if isinstance(manifest, list | tuple):
+            manifest = manifest[0]
+        incidences = {}
+        for rank in range(json.loads(manifest)["max_rank"] + 1):
+            if f"incidence_{rank}" in data:
+                incidences[rank] = data[f"incidence_{rank}"]
+        if cache is not None and all(
+            cache.get(f"incidence_{rank}") is incidence
+            for rank, incidence in incidences.items()
+        ):
+            return cache
+        return cls.from_manifest(incidences, manifest)
+
+
+def get_connectivity_from_boundaries(
+    boundaries,
+    shape,
+    max_rank,
+    neighborhoods=None,
+    signed=False,
+    cell_adjacency=False,
+    lazy=False,
+):
+    """Get the connectivity matrices of a complex from its boundary matrices.
+
+    The laplacians, adjacencies and coadjacencies are derived from the signed
+    boundary matrices with sparse products, following the conventions of
+    TopoNetX, so that the output matches `get_complex_connectivity`. Only the
+    matrices required by `neighborhoods` are computed.
+
+    Parameters
+    ----------
+    boundaries : dict[int, torch.sparse_coo_tensor]
+        Signed boundary matrices, indexed by rank. Ranks without a boundary
+        matrix get zero connectivity matrices.
+    shape : list[int]
+        Number of cells of each rank of the complex.
+    max_rank : int
+        Maximum rank of the complex.
+    neighborhoods : list, optional
+        List of neighborhoods of interest.
+    signed : bool, optional
+        If True, returns signed connectivity matrices.
+    cell_adjacency : bool, optional
+        If True, the (co)adjacencies count the shared cofaces (faces) using
+        the unsigned boundary matrices, as TopoNetX does for cell complexes.
+        Otherwise they are the off-diagonal parts of the laplacians, as for
+        simplicial complexes.
+    lazy : bool, optional
+        If True, only the incidence matrices are returned, together with a
+        `connectivity_manifest` from which `DomainData` derives the other
+        matrices on access.
+
+    Returns
+    -------
+    dict
+        Dictionary containing the connectivity matrices.
+
+    Raises
+    ------
+    ValueError
+        If `lazy` is set for a cell complex (`cell_adjacency`) with unsigned
+        matrices, whose laplacians cannot be derived from the stored unsigned
+        incidences.
+    """
+    if lazy and cell_adjacency and not signed:
+        raise ValueError(
+            "Lazy connectivity is not supported for cell complexes with unsigned incidences, their laplacians depend on the orientation of the cells."
+        )
+    connectivity = LazyConnectivity(
+        boundaries, shape, max_rank, signed, cell_adjacency
+    )
+    if lazy:
+        keys = [f"incidence_{rank_idx}" for rank_idx in range(max_rank + 1)]
+        lifted_topology = {key: connectivity[key] for key in keys}
+        lifted_topology["connectivity_manifest"] = connectivity.manifest()
+        lifted_topology["shape"] = connectivity.shape
+        return lifted_topology
+
+    required = (
+        get_required_connectivity(neighborhoods)
+        if neighborhoods is not None
+        else None
+    )
+    lifted_topology = {}
+    for rank_idx in range(max_rank + 1):
+        for connectivity_type in LazyConnectivity.connectivity_types:
+            key = f"{connectivity_type}_{rank_idx}"
+            if (
+                required is not None
+                and connectivity_type != "incidence"
+                and key not in required
+            ):
+                continue
+            lifted_topology[key] = connectivity[key]
     if neighborhoods is not None:
-        connectivity = select_neighborhoods_of_interest(
-            connectivity, neighborhoods
+        lifted_topology = select_neighborhoods_of_interest(
+            lifted_topology, neighborhoods
         )
-    connectivity["shape"] = practical_shape
-    return connectivity
+    lifted_topology["shape"] = connectivity.shape
+    return lifted_topology
 
 
 def select_neighborhoods_of_interest(connectivity, neighborhoods):
@@ -294,6 +707,77 @@ def generate_zero_sparse_connectivity(m, n):
     return torch.sparse_coo_tensor((m, n)).coalesce()
 
 
+def transpose_coalesced(matrix):
+    """Transpose a sparse matrix and keep it coalesced.
+
+    `matrix.T` only swaps the indices, so the result is not coalesced and is
+    sorted again by every sparse product it is used in. The indices of a
+    coalesced matrix are sorted by row, so a single stable sort by column
+    gives the indices of the transpose sorted by row, without the duplicate
+    reduction of `coalesce`.
+
+    Parameters
+    ----------
+    matrix : torch.sparse_coo_tensor
+        Sparse matrix of shape `(m, n)`.
+
+    Returns
+    -------
+    torch.sparse_coo_tensor
+        Coalesced sparse matrix of shape `(n, m)`.
+    """
+    if not matrix.is_coalesced():
+        matrix = matrix.coalesce()
+    indices = matrix.indices()
+    order = torch.sort(indices[1], stable=True).indices
+    return torch.sparse_coo_tensor(
+        indices.flip(0)[:, order],
+        matrix.values()[order],
+        (matrix.size(1), matrix.size(0), *matrix.shape[2:]),
+        is_coalesced=True,
+    )
+
+
+def get_cell_faces(incidence, fill_value=-1):
+    """Get the faces of every cell of an incidence matrix.
+
+    The nonzeros are sorted by cell once. When every cell has the same number
+    of faces, as in a simplicial complex, the faces are obtained with a single
+    reshape. Otherwise, each face is placed at its position within the
+    segment of its cell and the shorter rows are padded.
+
+    Parameters
+    ----------
+    incidence : torch.sparse_coo_tensor
+        Incidence matrix of shape `(num_faces, num_cells)`.
+    fill_value : int, optional
+        Value padding the rows of the cells with fewer faces (default: -1).
+
+    Returns
+    -------
+    torch.Tensor
+        Matrix of shape `(num_cells, max_num_faces)` whose rows are the sorted
+        indices of the faces of each cell.
+    """
+    incidence = incidence.coalesce()
+    rows, cols = incidence.indices()
+    num_cells = incidence.shape[1]
+    # The coalesced indices are sorted by row, a stable sort keeps the faces
+    # of each cell sorted
+    cols, order = torch.sort(cols, stable=True)
+    rows = rows[order]
+    sizes = torch.bincount(cols, minlength=num_cells)
+    max_num_faces = int(sizes.max()) if num_cells > 0 else 0
+    if torch.all(sizes == max_num_faces):
+        return rows.view(num_cells, max_num_faces)
+    ptr = torch.cumsum(sizes, dim=0) - sizes
+    faces = torch.full(
+        (num_cells, max_num_faces), fill_value, dtype=rows.dtype
+    )
+    faces[cols, torch.arange(len(rows)) - ptr[cols]] = rows
+    return faces
+
+
 def load_cell_complex_dataset(cfg):
     r"""Load cell complex datasets.
 
@@ -425,3 +909,105 @@ def make_hash(o):
     hash_as_hex = sha1.hexdigest()
     # Convert the hex back to int and restrict it to the relevant int range
     return int(hash_as_hex, 16) % 4294967295
+
+
+def canonicalize_parameters(obj):
+    """Return a canonical JSON representation of (nested) parameters.
+
+    OmegaConf containers are resolved, dictionary keys are sorted and sets
+    are ordered, so that equal parameters always give the same string.
+
+    Parameters
+    ----------
+    obj : object
+        Parameters to canonicalize.
+
+    Returns
+    -------
+    str
+        Canonical JSON string of the parameters.
+    """
+
+    def to_canonical(o):
+        """Convert the object to JSON-compatible, order-independent types.
+
+        Parameters
+        ----------
+        o : object
+            Object to convert.
+
+        Returns
+        -------
+        object
+            JSON-compatible object.
+        """
+        if isinstance(o, omegaconf.DictConfig | omegaconf.ListConfig):
+            return to_canonical(
+                omegaconf.OmegaConf.to_container(o, resolve=True)
+            )
+        elif isinstance(o, dict):
+            return {str(key): to_canonical(value) for key, value in o.items()}
+        elif isinstance(o, list | tuple):
+            return [to_canonical(item) for item in o]
+        elif isinstance(o, set):
+            return sorted(
+                (to_canonical(item) for item in o),
+                key=lambda item: json.dumps(item, sort_keys=True),
+            )
+        elif isinstance(o, str | int | float | bool | type(None)):
+            return o
+        else:
+            return repr(o)
+
+    return json.dumps(to_canonical(obj), sort_keys=True, separators=(",", ":"))
+
+
+def hash_data_list(data_list):
+    """Compute a digest of the content of a list of data objects.
+
+    The digest depends on the keys, dtypes, shapes and values of every tensor
+    (and on the representation of any other attribute), so two datasets only
+    share a digest if their content is the same.
+
+    Parameters
+    ----------
+    data_list : list[torch_geometric.data.Data]
+        List of data objects.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest of the data.
+    """
+
+    def update_tensor(hasher, tensor):
+        """Feed a tensor to the hasher.
+
+        Parameters
+        ----------
+        hasher : hashlib._Hash
+            Hasher to update.
+        tensor : torch.Tensor
+            Tensor to hash.
+        """
+        if tensor.is_sparse:
+            tensor = tensor.coalesce()
+            hasher.update(str(tuple(tensor.shape)).encode())
+            update_tensor(hasher, tensor.indices())
+            update_tensor(hasher, tensor.values())
+            return
+        hasher.update(f"{tensor.dtype}{tuple(tensor.shape)}".encode())
+        tensor = tensor.detach().cpu().contiguous().reshape(-1)
+        hasher.update(tensor.view(torch.uint8).numpy().tobytes())
+
+    hasher = hashlib.sha256()
+    for data in data_list:
+        hasher.update(b"data")
+        for key in sorted(data.keys()):
+            hasher.update(key.encode())
+            value = data[key]
+            if isinstance(value, torch.Tensor):
+                update_tensor(hasher, value)
+            else:
+                hasher.update(repr(value).encode())
+    return hasher.hexdigest()
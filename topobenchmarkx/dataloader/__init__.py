@@ -2,5 +2,6 @@
 
 from .dataload_dataset import DataloadDataset
 from .dataloader import TBXDataloader
+from .neighbor_sampler import SubComplexSampler
 
-__all__ = ["DataloadDataset", "TBXDataloader"]
+__all__ = ["DataloadDataset", "SubComplexSampler", "TBXDataloader"]
@@ -6,18 +6,73 @@ import torch_geometric
 class DataloadDataset(torch_geometric.data.Dataset):
     """Custom dataset to return all the values added to the dataset object.
 
+    All the data objects must have the same attributes. Their names, layouts
+    and concatenation dimensions are stored once at construction, as the
+    `Schema` of the dataset, and the values of every data object are returned
+    in the order of the schema.
+
     Parameters
     ----------
     data_lst : list[torch_geometric.data.Data]
         List of torch_geometric.data.Data objects.
+    shared_attrs : dict, optional
+        Attributes added to every data object, and shared by all of them
+        (default: None).
     """
 
-    def __init__(self, data_lst):
+    def __init__(self, data_lst, shared_attrs=None):
+        # The dataloader utilities depend on the data utilities, which build
+        # datasets, so they are imported lazily
+        from topobenchmarkx.dataloader.utils import Schema
+
         super().__init__()
         self.data_lst = data_lst
+        self.shared_attrs = shared_attrs or {}
+        self.data_keys = self._get_data_keys()
+        self.shared_values = list(self.shared_attrs.values())
+        self.schema = Schema.from_sample(
+            self.data_keys + list(self.shared_attrs),
+            (
+                [self.data_lst[0][key] for key in self.data_keys]
+                if len(self.data_lst) > 0
+                else []
+            )
+            + self.shared_values,
+        )
 
     def __repr__(self):
-        return f"{self.__class__.__name__}({len(self.data_lst)})"
+        return f"{self.__class__.__name__}({len(self)})"
+
+    def _get_data_keys(self):
+        """Get the attributes of the data objects and check they all match.
+
+        Lazily loaded data lists are not loaded to be checked, only their
+        first data object is used.
+
+        Returns
+        -------
+        list[str]
+            Names of the attributes of the data objects, without the shared
+            attributes.
+
+        Raises
+        ------
+        ValueError
+            If the data objects do not all have the same attributes.
+        """
+        if len(self.data_lst) == 0:
+            return []
+        keys = list(self.data_lst[0].keys())
+        keys = [key for key in keys if key not in self.shared_attrs]
+        if isinstance(self.data_lst, list):
+            expected = set(keys)
+            for idx, data in enumerate(self.data_lst):
+                if set(data.keys()).difference(self.shared_attrs) != expected:
+                    raise ValueError(
+                        f"The data object at index {idx} has attributes "
+                        f"{sorted(data.keys())}, expected {sorted(expected)}."
+                    )
+        return keys
 
     def get(self, idx):
         """Get data object from data list.
@@ -30,11 +85,14 @@ class DataloadDataset(torch_geometric.data.Dataset):
         Returns
         -------
         tuple
-            Tuple containing a list of all the values for the data and the corresponding keys.
+            Tuple containing a list of all the values for the data and the corresponding keys, which are the `Schema`
+            of the dataset.
         """
         data = self.data_lst[idx]
-        keys = list(data.keys())
-        return ([data[key] for key in keys], keys)
+        return (
+            [data[key] for key in self.data_keys] + self.shared_values,
+            self.schema,
+        )
 
     def len(self):
         """Return the length of the dataset.
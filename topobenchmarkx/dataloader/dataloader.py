@@ -2,10 +2,12 @@
 
 from typing import Any
 
+import torch
 from lightning import LightningDataModule
 from torch.utils.data import DataLoader
 
 from topobenchmarkx.dataloader.dataload_dataset import DataloadDataset
+from topobenchmarkx.dataloader.neighbor_sampler import SubComplexSampler
 from topobenchmarkx.dataloader.utils import collate_fn
 
 
@@ -28,6 +30,10 @@ class TBXDataloader(LightningDataModule):
         The number of worker processes to use for data loading (default: 0).
     pin_memory : bool, optional
         If True, the data loader will copy tensors into pinned memory before returning them (default: False).
+    num_hops : int, optional
+        In the transductive setting, if given, the nodes of each split are loaded in batches of `batch_size` seed
+        nodes together with the sub-complex induced by their `num_hops`-hop neighbourhood, instead of loading the
+        whole complex at every step (default: None).
     **kwargs : optional
         Additional arguments.
 
@@ -45,6 +51,7 @@ class TBXDataloader(LightningDataModule):
         batch_size: int = 1,
         num_workers: int = 0,
         pin_memory: bool = False,
+        num_hops: int | None = None,
         **kwargs: Any,
     ) -> None:
         super().__init__()
@@ -57,14 +64,15 @@ class TBXDataloader(LightningDataModule):
         )
         self.dataset_train = dataset_train
         self.batch_size = batch_size
+        self.num_hops = num_hops
+        self.transductive = dataset_val is None and dataset_test is None
 
-        if dataset_val is None and dataset_test is None:
-            # Transductive setting
+        if self.transductive:
             self.dataset_val = dataset_train
             self.dataset_test = dataset_train
             assert (
-                self.batch_size == 1
-            ), "Batch size must be 1 for transductive setting."
+                self.batch_size == 1 or self.num_hops is not None
+            ), "Batch size must be 1 for transductive setting, unless num_hops is given."
         else:
             self.dataset_val = dataset_val
             self.dataset_test = dataset_test
@@ -83,14 +91,8 @@ class TBXDataloader(LightningDataModule):
         torch.utils.data.DataLoader
             The train dataloader.
         """
-        return DataLoader(
-            dataset=self.dataset_train,
-            batch_size=self.batch_size,
-            num_workers=self.num_workers,
-            pin_memory=self.pin_memory,
-            shuffle=True,
-            collate_fn=collate_fn,
-            persistent_workers=self.persistent_workers,
+        return self._get_dataloader(
+            self.dataset_train, "train_mask", shuffle=True
         )
 
     def val_dataloader(self) -> DataLoader:
@@ -101,14 +103,8 @@ class TBXDataloader(LightningDataModule):
         torch.utils.data.DataLoader
             The validation dataloader.
         """
-        return DataLoader(
-            dataset=self.dataset_val,
-            batch_size=self.batch_size,
-            num_workers=self.num_workers,
-            pin_memory=self.pin_memory,
-            shuffle=False,
-            collate_fn=collate_fn,
-            persistent_workers=self.persistent_workers,
+        return self._get_dataloader(
+            self.dataset_val, "val_mask", shuffle=False
         )
 
     def test_dataloader(self) -> DataLoader:
@@ -121,13 +117,43 @@ class TBXDataloader(LightningDataModule):
         """
         if self.dataset_test is None:
             raise ValueError("There is no test dataloader.")
+        return self._get_dataloader(
+            self.dataset_test, "test_mask", shuffle=False
+        )
+
+    def _get_dataloader(self, dataset, mask_key, shuffle) -> DataLoader:
+        r"""Create a dataloader over a dataset, or over the seed nodes of a split if the neighbourhoods are sampled.
+
+        Parameters
+        ----------
+        dataset : DataloadDataset
+            The dataset.
+        mask_key : str
+            The attribute containing the nodes of the split, used in the transductive setting.
+        shuffle : bool
+            Whether to shuffle the data at every epoch.
+
+        Returns
+        -------
+        torch.utils.data.DataLoader
+            The dataloader.
+        """
+        if self.transductive and self.num_hops is not None:
+            data = dataset.data_lst[0]
+            seeds = data[mask_key]
+            if seeds.dtype == torch.bool:
+                seeds = seeds.nonzero().view(-1)
+            dataset = seeds.tolist()
+            collate = SubComplexSampler(data, self.num_hops, mask_key)
+        else:
+            collate = collate_fn
         return DataLoader(
-            dataset=self.dataset_test,
+            dataset=dataset,
             batch_size=self.batch_size,
             num_workers=self.num_workers,
             pin_memory=self.pin_memory,
-            shuffle=False,
-            collate_fn=collate_fn,
+            shuffle=shuffle,
+            collate_fn=collate,
             persistent_workers=self.persistent_workers,
         )
 
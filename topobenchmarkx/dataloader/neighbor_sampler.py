@@ -0,0 +1,337 @@
+"""Neighbour sampling of sub-complexes for transductive learning."""
+
+import torch
+
+from topobenchmarkx.data.utils.hasse_utils import (
+    HASSE_INDEX_SUFFIX,
+    get_neighborhood_ranks,
+)
+from topobenchmarkx.data.utils.utils import get_routes_from_neighborhoods
+from topobenchmarkx.dataloader.utils import collate_fn
+
+SQUARE_CONNECTIVITY_TYPES = [
+    "adjacency",
+    "coadjacency",
+    "up_laplacian",
+    "down_laplacian",
+    "hodge_laplacian",
+]
+SPLIT_MASK_KEYS = ["train_mask", "val_mask", "test_mask"]
+
+
+def get_key_ranks(key):
+    r"""Return the ranks of the cells indexing the dimensions of an attribute.
+
+    The ranks are deduced from the name of the attribute: features (`x_{rank}`),
+    incidence matrices (`incidence_{rank}`), connectivity matrices (for
+    instance `hodge_laplacian_{rank}`) and neighborhoods (for instance
+    `up_adjacency-0`). Hyperedges have rank `"hyperedges"`.
+
+    Parameters
+    ----------
+    key : str
+        Name of the attribute.
+
+    Returns
+    -------
+    tuple or None
+        Rank of the cells indexing each dimension of the attribute, None for
+        a dimension that is not indexed by cells. None if the attribute is not
+        indexed by cells.
+    """
+    if key in ["x", "y"]:
+        return (0,)
+    if key == "incidence_hyperedges":
+        return (0, "hyperedges")
+    if "-" in key:
+        if not key.split("-")[-1].isdigit():
+            return None
+        src_rank, dst_rank = get_routes_from_neighborhoods([key])[0]
+        if "incidence" in key:
+            return (dst_rank, src_rank)
+        return (src_rank, src_rank)
+    name, _, suffix = key.rpartition("_")
+    if name == "x":
+        return (int(suffix),) if suffix.isdigit() else (suffix,)
+    if not suffix.isdigit():
+        return None
+    rank = int(suffix)
+    if name == "incidence":
+        return (rank - 1 if rank > 0 else None, rank)
+    if name in SQUARE_CONNECTIVITY_TYPES:
+        return (rank, rank)
+    return None
+
+
+class SubComplexSampler:
+    r"""Sample the sub-complexes induced by the neighbourhoods of seed nodes.
+
+    The sampler is used as the collate function of a dataloader over seed
+    nodes. The seed nodes are expanded for `num_hops` hops, two nodes being
+    neighbours if they are faces of a common edge (or hyperedge, or graph edge
+    if the domain has no edges). The sub-complex contains the cells of every
+    rank whose faces all belong to it. All the attributes indexed by cells,
+    including the Hasse graph indices of `HasseGraphExpansion`, are restricted
+    to these cells and re-indexed, and the result is batched with `collate_fn`.
+
+    The connectivity matrices are restricted rather than recomputed, so the
+    rows of the seed nodes are the same as in the whole complex.
+
+    Parameters
+    ----------
+    data : torch_geometric.data.Data
+        The lifted graph.
+    num_hops : int
+        Number of hops of the neighbourhoods of the seed nodes.
+    mask_key : str, optional
+        Attribute storing the positions of the seed nodes in the sub-complexes.
+        If None, the positions are not stored (default: "train_mask").
+    """
+
+    def __init__(self, data, num_hops, mask_key="train_mask"):
+        self.data = data
+        self.num_hops = num_hops
+        self.mask_key = mask_key
+
+        # Ranks and number of cells indexing each attribute
+        self.key_ranks, self.num_cells = {}, {}
+        # Ranks of the rows and columns of the precomputed Hasse graph indices
+        self.hasse_ranks = {}
+        num_nodes = data.x_0.size(0) if "x_0" in data else data.num_nodes
+        for key, value in data:
+            if key.endswith(HASSE_INDEX_SUFFIX):
+                self.hasse_ranks[key] = get_neighborhood_ranks(
+                    key[: -len(HASSE_INDEX_SUFFIX)]
+                )
+                continue
+            ranks = get_key_ranks(key)
+            if ranks is None or not isinstance(value, torch.Tensor):
+                continue
+            if key == "y" and (value.dim() == 0 or value.size(0) != num_nodes):
+                continue
+            self.key_ranks[key] = ranks
+            for dim, rank in enumerate(ranks):
+                if rank is not None:
+                    self.num_cells.setdefault(rank, value.size(dim))
+
+        # Sparse matrices in CSR format, to gather the rows of the kept cells
+        self.sparse = {}
+        for key in self.key_ranks:
+            if data[key].is_sparse:
+                matrix = data[key].coalesce()
+                indices = matrix.indices()
+                rowptr = torch.zeros(matrix.size(0) + 1, dtype=torch.long)
+                torch.cumsum(
+                    torch.bincount(indices[0], minlength=matrix.size(0)),
+                    dim=0,
+                    out=rowptr[1:],
+                )
+                self.sparse[key] = (indices, matrix.values(), rowptr)
+
+        # Faces of the cells of every positive rank
+        self.faces = {}
+        for rank in self.num_cells:
+            if rank == 0:
+                continue
+            key = (
+                "incidence_hyperedges"
+                if rank == "hyperedges"
+                else f"incidence_{rank}"
+            )
+            if key not in data:
+                raise ValueError(
+                    f"Cells of rank {rank} can only be sampled with their incidence matrix '{key}'."
+                )
+            self.faces[rank] = data[key].coalesce().indices()
+        for key, ranks in self.hasse_ranks.items():
+            for rank in ranks:
+                if rank not in self.num_cells:
+                    raise ValueError(
+                        f"The Hasse graph index '{key}' can only be sampled with the cells of rank {rank}."
+                    )
+
+        # Cells through which the neighbourhoods of the nodes are expanded
+        if 1 in self.faces:
+            self.hop_faces = self.faces[1]
+        elif "hyperedges" in self.faces:
+            self.hop_faces = self.faces["hyperedges"]
+        else:
+            edge_index = data.edge_index
+            edge_ids = torch.arange(edge_index.size(1))
+            self.hop_faces = torch.stack(
+                [edge_index.reshape(-1), torch.cat([edge_ids, edge_ids])]
+            )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(num_hops={self.num_hops}, mask_key={self.mask_key!r})"
+
+    def get_cell_masks(self, seeds):
+        r"""Get the cells of every rank belonging to the sampled sub-complex.
+
+        Parameters
+        ----------
+        seeds : torch.Tensor
+            Indices of the seed nodes.
+
+        Returns
+        -------
+        dict[int or str, torch.Tensor]
+            Boolean masks of the cells of the sub-complex, indexed by rank.
+        """
+        node_mask = torch.zeros(self.num_cells[0], dtype=torch.bool)
+        node_mask[seeds] = True
+        nodes, cells = self.hop_faces
+        num_hop_cells = int(cells.max()) + 1 if cells.numel() > 0 else 0
+        for _ in range(self.num_hops):
+            cell_mask = torch.zeros(num_hop_cells, dtype=torch.bool)
+            cell_mask[cells[node_mask[nodes]]] = True
+            node_mask[nodes[cell_mask[cells]]] = True
+
+        masks = {0: node_mask}
+        ranks = sorted(rank for rank in self.faces if rank != "hyperedges")
+        if "hyperedges" in self.faces:
+            ranks.append("hyperedges")
+        for rank in ranks:
+            faces, cofaces = self.faces[rank]
+            face_rank = 0 if rank == "hyperedges" else rank - 1
+            missing = torch.zeros(self.num_cells[rank], dtype=torch.long)
+            missing.index_add_(0, cofaces, (~masks[face_rank][faces]).long())
+            masks[rank] = missing == 0
+        return masks
+
+    def sample(self, seeds):
+        r"""Sample the sub-complex induced by the neighbourhood of seed nodes.
+
+        Parameters
+        ----------
+        seeds : torch.Tensor
+            Indices of the seed nodes.
+
+        Returns
+        -------
+        dict
+            Attributes of the sub-complex. The positions of the seed nodes in
+            the sub-complex are stored in `mask_key`, and the split masks are
+            dropped.
+        """
+        masks = self.get_cell_masks(seeds)
+        index, new_index = {}, {}
+        for rank, mask in masks.items():
+            index[rank] = mask.nonzero().view(-1)
+            new_index[rank] = torch.full((mask.numel(),), -1, dtype=torch.long)
+            new_index[rank][index[rank]] = torch.arange(index[rank].numel())
+
+        data = self.data
+        sub = {}
+        for key, value in data:
+            if key in SPLIT_MASK_KEYS:
+                continue
+            if key in self.key_ranks:
+                ranks = self.key_ranks[key]
+                if value.is_sparse:
+                    sub[key] = _restrict_sparse(
+                        *self.sparse[key],
+                        value.shape,
+                        [
+                            (index[rank], new_index[rank])
+                            if rank is not None
+                            else None
+                            for rank in ranks
+                        ],
+                    )
+                else:
+                    sub[key] = value.index_select(0, index[ranks[0]])
+            elif key in self.hasse_ranks:
+                row_rank, col_rank = self.hasse_ranks[key]
+                rows = new_index[row_rank][value[0]]
+                cols = new_index[col_rank][value[1]]
+                # The re-indexing is increasing, so the entries stay sorted
+                keep = (rows >= 0) & (cols >= 0)
+                sub[key] = torch.stack([rows[keep], cols[keep]])
+            elif key == "edge_index":
+                keep = masks[0][value[0]] & masks[0][value[1]]
+                sub[key] = new_index[0][value[:, keep]]
+                if "edge_attr" in data and (
+                    data.edge_attr.size(0) == value.size(1)
+                ):
+                    sub["edge_attr"] = data.edge_attr[keep]
+            elif key == "edge_attr" and "edge_attr" in sub:
+                continue
+            elif key == "shape":
+                sub[key] = [
+                    int(masks[rank].sum()) if rank in masks else n
+                    for rank, n in enumerate(value)
+                ]
+            elif key == "num_nodes":
+                sub[key] = index[0].numel()
+            else:
+                sub[key] = value
+        if self.mask_key is not None:
+            sub[self.mask_key] = new_index[0][seeds]
+        return sub
+
+    def __call__(self, seeds):
+        r"""Sample and batch the sub-complex of a batch of seed nodes.
+
+        Parameters
+        ----------
+        seeds : list[int]
+            Indices of the seed nodes.
+
+        Returns
+        -------
+        torch_geometric.data.Batch
+            Batch containing the sampled sub-complex.
+        """
+        sub = self.sample(torch.as_tensor(seeds, dtype=torch.long))
+        keys = list(sub.keys())
+        return collate_fn([([sub[key] for key in keys], keys)])
+
+
+def _restrict_sparse(indices, values, rowptr, size, dim_index):
+    r"""Restrict a coalesced sparse matrix to a subset of its rows and columns.
+
+    Only the entries of the kept rows are visited, through the row pointers
+    of the matrix.
+
+    Parameters
+    ----------
+    indices : torch.Tensor
+        Indices of the entries of the coalesced matrix.
+    values : torch.Tensor
+        Values of the entries of the coalesced matrix.
+    rowptr : torch.Tensor
+        Row pointers of the matrix in CSR format.
+    size : torch.Size
+        Size of the matrix.
+    dim_index : list[tuple[torch.Tensor, torch.Tensor] or None]
+        For each dimension, the sorted kept indices and the new position of
+        every index (-1 if it is not kept), or None to keep the dimension
+        unchanged.
+
+    Returns
+    -------
+    torch.sparse_coo_tensor
+        Restricted sparse matrix, coalesced.
+    """
+    size = list(size)
+    if dim_index[0] is not None:
+        rows = dim_index[0][0]
+        start, count = rowptr[rows], rowptr[rows + 1] - rowptr[rows]
+        offsets = torch.cumsum(count, dim=0) - count
+        entries = torch.arange(int(count.sum())) + torch.repeat_interleave(
+            start - offsets, count
+        )
+        indices, values = indices[:, entries], values[entries]
+    new_indices = []
+    for dim, dim_idx in enumerate(dim_index):
+        if dim_idx is None:
+            new_indices.append(indices[dim])
+        else:
+            new_indices.append(dim_idx[1][indices[dim]])
+            size[dim] = dim_idx[0].numel()
+    new_indices = torch.stack(new_indices)
+    keep = (new_indices >= 0).all(dim=0)
+    return torch.sparse_coo_tensor(
+        new_indices[:, keep], values[keep], size, is_coalesced=True
+    )
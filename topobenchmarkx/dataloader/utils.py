@@ -1,19 +1,73 @@
 """Dataloader utilities."""
 
-from collections import defaultdict
+import copy
 from typing import Any
 
 import torch
 import torch_geometric
-from torch_sparse import SparseTensor
+
+from topobenchmarkx.data.utils.hasse_utils import (
+    HASSE_INDEX_SUFFIX,
+    get_neighborhood_ranks,
+)
+from topobenchmarkx.data.utils.utils import LazyConnectivity
 
 
 class DomainData(torch_geometric.data.Data):
     r"""Helper Data class so that not only sparse matrices with adj in the name can work with PyG dataloaders.
 
-    It overwrites some methods from `torch_geometric.data.Data`
+    It overwrites some methods from `torch_geometric.data.Data`. When the data
+    was lifted with `lazy_connectivity`, it only stores the incidence matrices
+    and a `connectivity_manifest`; the other connectivity matrices are derived
+    from the (batched) incidence matrices the first time they are accessed and
+    cached afterwards.
     """
 
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return super().__getattr__(key)
+        except AttributeError:
+            connectivity = self._lazy_connectivity()
+            if connectivity is None or key.startswith("_"):
+                raise
+            try:
+                return connectivity[key]
+            except KeyError:
+                raise AttributeError(
+                    f"'{self.__class__.__name__}' object has no attribute "
+                    f"'{key}'"
+                ) from None
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return super().__getitem__(key)
+        except KeyError:
+            connectivity = self._lazy_connectivity()
+            if connectivity is None:
+                raise
+            return connectivity[key]
+
+    def _lazy_connectivity(self):
+        r"""Return the lazily derived connectivity of the data, if any.
+
+        The cache is rebuilt whenever the stored incidence matrices change,
+        e.g. when the data is moved to another device.
+
+        Returns
+        -------
+        LazyConnectivity or None
+            The lazy connectivity, or None if the data does not store a
+            connectivity manifest.
+        """
+        store = self.__dict__.get("_store")
+        if store is None:
+            return None
+        cache = LazyConnectivity.from_data(
+            store, self.__dict__.get("_connectivity_cache")
+        )
+        self.__dict__["_connectivity_cache"] = cache
+        return cache
+
     def is_valid(self, string):
         r"""Check if the string contains any of the valid names.
 
@@ -56,9 +110,96 @@ class DomainData(torch_geometric.data.Data):
         else:
             return 0
 
+    def __inc__(self, key: str, value: Any, *args, **kwargs) -> Any:
+        r"""Overwrite the `__inc__` method to offset the Hasse graph indices precomputed by `HasseGraphExpansion`.
+
+        The rows and the columns of a Hasse graph index are offset by the number of cells of their ranks, so that the
+        batched index is the index of the block-diagonal matrix of the neighborhood.
+
+        Parameters
+        ----------
+        key : str
+            Key of the data.
+        value : Any
+            Value of the data.
+        *args : Any
+            Additional arguments.
+        **kwargs : Any
+            Additional keyword arguments.
+
+        Returns
+        -------
+        Any
+            The increment.
+        """
+        if key.endswith(HASSE_INDEX_SUFFIX):
+            ranks = get_neighborhood_ranks(key[: -len(HASSE_INDEX_SUFFIX)])
+            return torch.tensor(
+                [[self[f"x_{rank}"].size(0)] for rank in ranks]
+            )
+        return super().__inc__(key, value, *args, **kwargs)
+
+
+class Schema(list):
+    r"""Names of the attributes of the samples, with their layout and concatenation dimension.
+
+    The schema is a list of the names of the attributes, so that it can be used wherever the keys of the samples
+    are expected. `collate_fn` reads the layout and the concatenation dimension of every attribute from it instead
+    of inspecting the values of each batch.
+
+    Parameters
+    ----------
+    keys : list[str]
+        Names of the attributes.
+    layouts : list[str]
+        Layout of each attribute: "sparse" or "dense" for tensors, "scalar" for numbers and "object" otherwise.
+    cat_dims : list
+        Concatenation dimension of each attribute, as given by `DomainData.__cat_dim__`, or None for the attributes
+        that are not tensors.
+    """
+
+    def __init__(self, keys, layouts, cat_dims):
+        super().__init__(keys)
+        self.layouts = list(layouts)
+        self.cat_dims = list(cat_dims)
+
+    @classmethod
+    def from_sample(cls, keys, values):
+        r"""Build the schema of the attributes of a sample.
+
+        Parameters
+        ----------
+        keys : list[str]
+            Names of the attributes.
+        values : list
+            Values of the attributes in the sample.
+
+        Returns
+        -------
+        Schema
+            The schema of the sample.
+        """
+        reference = DomainData()
+        layouts, cat_dims = [], []
+        for key, value in zip(keys, values, strict=True):
+            if isinstance(value, torch.Tensor):
+                layouts.append("sparse" if value.is_sparse else "dense")
+                cat_dims.append(reference.__cat_dim__(key, value))
+            else:
+                layouts.append(
+                    "scalar" if isinstance(value, int | float) else "object"
+                )
+                cat_dims.append(None)
+        return cls(keys, layouts, cat_dims)
+
 
 def to_data_list(batch):
-    """Workaround needed since `torch_geometric` doesn't work when using `torch.sparse` instead of `torch_sparse`.
+    """Split a batch into its data objects, including its `torch.sparse` matrices.
+
+    `torch_geometric` can only separate `torch_sparse` matrices, so the sparse matrices are removed from the batch
+    before separating it and are split separately: the entries of each block are selected with the slices of the
+    batch, which keeps them in order, so the blocks of a coalesced matrix are coalesced as well. The batch is not
+    modified.
 
     Parameters
     ----------
@@ -70,23 +211,92 @@ def to_data_list(batch):
     list
         List of data objects.
     """
-    for key, _ in batch:
-        if batch[key].is_sparse:
-            sparse_data = batch[key].coalesce()
-            batch[key] = SparseTensor.from_torch_sparse_coo_tensor(sparse_data)
-    data_list = batch.to_data_list()
-    for i, data in enumerate(data_list):
-        for key, d in data:
-            if isinstance(data[key], SparseTensor):
-                data_list[i][key] = d.to_torch_sparse_coo_tensor()
+    sparse = {
+        key: value
+        for key, value in batch
+        if isinstance(value, torch.Tensor) and value.is_sparse
+    }
+    # Shallow copy of the batch without the sparse matrices
+    dense = copy.copy(batch)
+    for key in sparse:
+        del dense[key]
+    data_list = dense.to_data_list()
+    for key, value in sparse.items():
+        cat_dim = batch.__cat_dim__(key, value)
+        blocks = _split_sparse(value, batch._slice_dict[key], cat_dim)
+        for data, block in zip(data_list, blocks, strict=True):
+            data[key] = block
     return data_list
 
 
+def _split_sparse(matrix, slices, cat_dim):
+    r"""Split a batched sparse matrix into the matrices of the samples.
+
+    Parameters
+    ----------
+    matrix : torch.sparse_coo_tensor
+        Batched sparse matrix.
+    slices : torch.Tensor
+        Cumulative sizes of the matrices along the concatenation dimensions, of shape `(num_graphs + 1,)` or
+        `(num_graphs + 1, len(cat_dim))`.
+    cat_dim : int or tuple[int]
+        Concatenation dimensions.
+
+    Returns
+    -------
+    list[torch.sparse_coo_tensor]
+        Sparse matrices of the samples, coalesced if the batched matrix is.
+    """
+    cat_dim = (cat_dim,) if isinstance(cat_dim, int) else tuple(cat_dim)
+    slices = slices.view(slices.size(0), -1)
+    num_graphs = slices.size(0) - 1
+    coalesced = matrix.is_coalesced()
+    indices, values = matrix._indices(), matrix._values()
+    # The sample of every entry, from its index along the first concatenation dimension
+    graph = torch.bucketize(
+        indices[cat_dim[0]], slices[1:, 0].contiguous(), right=True
+    )
+    if cat_dim[0] != 0 or not coalesced:
+        # Gather the entries of each sample, the stable sort keeps their order
+        graph, order = torch.sort(graph, stable=True)
+        indices, values = indices[:, order], values[order]
+    counts = torch.bincount(graph, minlength=num_graphs).tolist()
+    offsets = torch.zeros(matrix.sparse_dim(), num_graphs, dtype=torch.long)
+    offsets[list(cat_dim)] = slices[:-1].t()
+    indices = indices - torch.repeat_interleave(
+        offsets, torch.tensor(counts), dim=1
+    )
+    size = list(matrix.shape)
+    blocks = []
+    for i, (block_indices, block_values) in enumerate(
+        zip(indices.split(counts, 1), values.split(counts), strict=True)
+    ):
+        for j, dim in enumerate(cat_dim):
+            size[dim] = int(slices[i + 1, j] - slices[i, j])
+        blocks.append(
+            torch.sparse_coo_tensor(
+                block_indices,
+                block_values,
+                list(size),
+                is_coalesced=coalesced,
+            )
+        )
+    return blocks
+
+
 def collate_fn(batch):
     r"""Overwrite `torch_geometric.data.DataLoader` collate function to use the `DomainData` class.
 
     This ensures that the `torch_geometric` dataloaders work with sparse matrices that are not necessarily named `adj`. The function also generates the batch slices for the different cell dimensions.
 
+    The output matches `torch_geometric.data.Batch.from_data_list` on the `DomainData` objects of the samples, but the
+    batch is built directly from the samples: the sparse matrices, coalesced once at preprocessing time, are stacked
+    block-diagonally by offsetting their indices, and the `batch_*` vectors are built with `repeat_interleave`. The
+    samples share the `Schema` of the `DataloadDataset`, so their values are processed column by column, with the
+    layouts and the concatenation dimensions stored in the schema. A
+    `batch_{rank}` vector is generated for every rank of `cell_statistics`, so that the models do not need to rebuild
+    the membership of the cells at every step.
+
     Parameters
     ----------
     batch : list
@@ -97,63 +307,228 @@ def collate_fn(batch):
     torch_geometric.data.Batch
         A `torch_geometric.data.Batch` object.
     """
-    data_list = []
-    batch_idx_dict = defaultdict(list)
-
-    # Keep track of the running index for each cell dimension
-    running_idx = {}
-
-    for batch_idx, b in enumerate(batch):
-        values, keys = b[0], b[1]
-        data = DomainData()
-        for key, value in zip(keys, values, strict=False):
-            if torch_geometric.utils.is_sparse(value):
-                value = value.coalesce()
-            data[key] = value
-
-        # Generate batch_slice values for x_1, x_2, x_3, ...
-        x_keys = [el for el in keys if ("x_" in el)]
-        for x_key in x_keys:
-            if x_key != "x_0":
-                if x_key != "x_hyperedges":
-                    cell_dim = int(x_key.split("_")[1])
-                else:
-                    cell_dim = x_key.split("_")[1]
-
-                current_number_of_cells = data[x_key].shape[0]
-
-                batch_idx_dict[f"batch_{cell_dim}"].append(
-                    torch.tensor([[batch_idx] * current_number_of_cells])
+    keys = batch[0][1]
+    if not isinstance(keys, Schema):
+        keys = Schema.from_sample(keys, batch[0][0])
+    columns = [
+        list(values) for values in zip(*[b[0] for b in batch], strict=True)
+    ]
+    num_graphs = len(batch)
+    num_nodes = (
+        _infer_num_nodes(keys, columns) if keys else [None] * num_graphs
+    )
+
+    samples = dict(zip(keys, columns, strict=True))
+    out = torch_geometric.data.Batch(_base_cls=DomainData)
+    slice_dict, inc_dict = {}, {}
+    for key, values, layout, cat_dim in zip(
+        keys, columns, keys.layouts, keys.cat_dims, strict=True
+    ):
+        if key == "num_nodes":
+            out._num_nodes = values
+            out.num_nodes = sum(values)
+            continue
+        if layout == "sparse":
+            if cat_dim == (0, 1):
+                value, slices = _block_diag(values)
+            else:
+                sizes = torch.tensor([v.size(cat_dim) for v in values])
+                slices = torch_geometric.utils.cumsum(sizes)
+                value = torch_geometric.utils.sparse.cat(values, dim=cat_dim)
+            incs = None
+        elif layout == "dense":
+            if values[0].dim() == 0:
+                values = [v.unsqueeze(0) for v in values]
+            sizes = torch.tensor([v.size(cat_dim) for v in values])
+            slices = torch_geometric.utils.cumsum(sizes)
+            incs = _get_incs(key, values, num_nodes, samples)
+            if incs.dim() > 1 or int(incs[-1]) != 0:
+                values = [v + inc for v, inc in zip(values, incs, strict=True)]
+            value = _cat(values, cat_dim)
+        elif layout == "scalar":
+            value = torch.tensor(values)
+            incs = _get_incs(key, values, num_nodes, samples)
+            if int(incs[-1]) != 0:
+                value.add_(incs)
+            slices = torch.arange(num_graphs + 1)
+        else:
+            value, slices, incs = values, torch.arange(num_graphs + 1), None
+        out[key] = value
+        slice_dict[key] = slices
+        inc_dict[key] = incs
+
+    graph_idx = torch.arange(num_graphs)
+    if num_nodes[0] is not None:
+        repeats = torch.tensor([n or 0 for n in num_nodes])
+        out["batch_0"] = torch.repeat_interleave(graph_idx, repeats)
+        out["ptr"] = torch_geometric.utils.cumsum(repeats)
+
+    # Generate batch_slice values for x_1, x_2, x_3, ...
+    for key in keys:
+        if key.startswith("x_") and key != "x_0":
+            cell_dim = key.split("_")[1]
+            repeats = slice_dict[key].diff()
+            out[f"batch_{cell_dim}"] = torch.repeat_interleave(
+                graph_idx, repeats
+            )
+
+    # "shape" describes the number of n_cells in each graph, it also gives
+    # the batch slices of the ranks without features
+    if out.get("shape") is not None:
+        cell_statistics = out.pop("shape")
+        out["cell_statistics"] = torch.tensor(
+            [[int(n) for n in shape] for shape in cell_statistics],
+            dtype=torch.long,
+        )
+        for rank, repeats in enumerate(out["cell_statistics"].t()):
+            if f"batch_{rank}" not in out:
+                out[f"batch_{rank}"] = torch.repeat_interleave(
+                    graph_idx, repeats
                 )
 
-                if (
-                    running_idx.get(f"cell_running_idx_number_{cell_dim}")
-                    is None
-                ):
-                    running_idx[f"cell_running_idx_number_{cell_dim}"] = (
-                        current_number_of_cells
-                    )
+    out._slice_dict = slice_dict
+    out._inc_dict = inc_dict
+    out._num_graphs = num_graphs
+    return out
+
+
+def _infer_num_nodes(keys, columns):
+    r"""Infer the number of nodes of the samples as `torch_geometric` does.
+
+    Parameters
+    ----------
+    keys : Schema
+        Schema of the attributes, shared by all the samples.
+    columns : list[list]
+        Values of each attribute in every sample.
 
-                else:
-                    running_idx[f"cell_running_idx_number_{cell_dim}"] += (
-                        current_number_of_cells
-                    )
+    Returns
+    -------
+    list[int or None]
+        The number of nodes of each sample, or None if it cannot be inferred.
+    """
+    cat_dims = dict(zip(keys, keys.cat_dims, strict=True))
+    columns = dict(zip(keys, columns, strict=True))
+    if "num_nodes" in columns:
+        return columns["num_nodes"]
+    node_keys = {"x", "feat", "pos", "batch", "node_type", "n_id", "tf"}
+    for key, values in columns.items():
+        if cat_dims[key] is not None and (key in node_keys or "node" in key):
+            return [value.size(cat_dims[key]) for value in values]
+    edge_index = columns.get("edge_index")
+    if edge_index is not None and isinstance(edge_index[0], torch.Tensor):
+        return [
+            int(value.max()) + 1 if value.numel() > 0 else 0
+            for value in edge_index
+        ]
+    return [None] * len(next(iter(columns.values())))
+
+
+def _get_incs(key, values, num_nodes, samples):
+    r"""Compute the increments of an attribute, as `DomainData.__inc__` does.
 
-        data_list.append(data)
+    Parameters
+    ----------
+    key : str
+        Name of the attribute.
+    values : list
+        Values of the attribute in each sample.
+    num_nodes : list[int]
+        Number of nodes of each sample.
+    samples : dict[str, list]
+        Values of every attribute in each sample.
 
-    batch = torch_geometric.data.Batch.from_data_list(data_list)
+    Returns
+    -------
+    torch.Tensor
+        Cumulative increments of the samples.
+    """
+    if key.endswith(HASSE_INDEX_SUFFIX):
+        ranks = get_neighborhood_ranks(key[: -len(HASSE_INDEX_SUFFIX)])
+        repeats = [
+            [[x.size(0)] for x in cells]
+            for cells in zip(
+                *[samples[f"x_{rank}"] for rank in ranks], strict=True
+            )
+        ]
+    elif "batch" in key and isinstance(values[0], torch.Tensor):
+        repeats = [int(value.max()) + 1 for value in values]
+    elif "index" in key or key == "face":
+        repeats = num_nodes
+    else:
+        repeats = [0] * len(values)
+    return torch_geometric.utils.cumsum(torch.tensor(repeats[:-1]))
+
+
+def _cat(tensors, dim):
+    r"""Concatenate tensors, in shared memory inside dataloader workers.
 
-    # Rename batch.batch to batch.batch_0 for consistency
-    batch["batch_0"] = batch.pop("batch")
+    Parameters
+    ----------
+    tensors : list[torch.Tensor]
+        Tensors to concatenate.
+    dim : int
+        Concatenation dimension.
 
-    # Add batch slices to batch
-    for key, value in batch_idx_dict.items():
-        batch[key] = torch.cat(value, dim=1).squeeze(0).long()
+    Returns
+    -------
+    torch.Tensor
+        The concatenated tensor.
+    """
+    out = None
+    if torch.utils.data.get_worker_info() is not None:
+        # Avoid copying the batch again when sending it to the main process
+        shape = list(tensors[0].shape)
+        shape[dim] = sum(tensor.size(dim) for tensor in tensors)
+        numel = 1
+        for size in shape:
+            numel *= size
+        storage = (
+            tensors[0]
+            .untyped_storage()
+            ._new_shared(
+                numel * tensors[0].element_size(), device=tensors[0].device
+            )
+        )
+        out = tensors[0].new(storage).resize_(*shape)
+    return torch.cat(tensors, dim=dim, out=out)
+
+
+def _block_diag(matrices):
+    r"""Stack sparse matrices block-diagonally.
+
+    The matrices are coalesced if needed. Their indices are concatenated and
+    offset by the sizes of the previous matrices, which keeps them sorted, so
+    the output is coalesced as well.
 
-    # Ensure shape is torch.Tensor
-    # "shape" describes the number of n_cells in each graph
-    if batch.get("shape") is not None:
-        cell_statistics = batch.pop("shape")
-        batch["cell_statistics"] = torch.Tensor(cell_statistics).long()
+    Parameters
+    ----------
+    matrices : list[torch.sparse_coo_tensor]
+        Sparse matrices.
 
-    return batch
+    Returns
+    -------
+    tuple[torch.sparse_coo_tensor, torch.Tensor]
+        The block-diagonal matrix and the cumulative sizes of the blocks, of
+        shape `(len(matrices) + 1, 2)`.
+    """
+    shapes, nnz, indices, values = [], [], [], []
+    for matrix in matrices:
+        if not matrix.is_coalesced():
+            matrix = matrix.coalesce()
+        shapes.append(matrix.shape)
+        nnz.append(matrix._nnz())
+        indices.append(matrix._indices())
+        values.append(matrix._values())
+    slices = torch_geometric.utils.cumsum(torch.tensor(shapes))
+    indices = _cat(indices, 1)
+    indices += torch.repeat_interleave(
+        slices[:-1], torch.tensor(nnz), dim=0
+    ).t()
+    value = torch.sparse_coo_tensor(
+        indices,
+        _cat(values, 0),
+        slices[-1].tolist(),
+        is_coalesced=True,
+    )
+    return value, slices
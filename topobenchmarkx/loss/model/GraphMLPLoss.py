@@ -17,16 +17,40 @@ class GraphMLPLoss(AbstractLoss):
         Temperature parameter (default: 1).
     loss_weight : float, optional
         Loss weight (default: 0.5).
+    num_negatives : int, optional
+        Number of nodes sampled per node to estimate the denominator of the
+        contrastive loss. If None, the loss is computed on the dense distance
+        matrix of the nodes. Otherwise the backbone must return the normalized
+        embeddings of the nodes (`GraphMLP` with the same `num_negatives`),
+        the power of the adjacency matrix is kept sparse and the memory of the
+        loss is linear in the number of nodes (default: None).
+
+    Raises
+    ------
+    ValueError
+        If `num_negatives` is not None or a positive integer.
     """
 
-    def __init__(self, r_adj_power=2, tau=1.0, loss_weight=0.5):
+    def __init__(
+        self, r_adj_power=2, tau=1.0, loss_weight=0.5, num_negatives=None
+    ):
         super().__init__()
+        if num_negatives is not None and (
+            not isinstance(num_negatives, int) or num_negatives < 1
+        ):
+            raise ValueError(
+                f"num_negatives must be None or a positive integer, got {num_negatives!r}."
+            )
         self.r_adj_power = r_adj_power
         self.tau = tau
         self.loss_weight = loss_weight
+        self.num_negatives = num_negatives
+        # Edge index and number of nodes of the cached sparse adjacency power
+        self._cached_graph = None
+        self._cached_adj_power = None
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(r_adj_power={self.r_adj_power}, tau={self.tau}, loss_weight={self.loss_weight})"
+        return f"{self.__class__.__name__}(r_adj_power={self.r_adj_power}, tau={self.tau}, loss_weight={self.loss_weight}, num_negatives={self.num_negatives})"
 
     def get_power_adj(self, edge_index):
         r"""Get the power of the adjacency matrix.
@@ -48,6 +72,46 @@ class GraphMLPLoss(AbstractLoss):
             adj_power = torch.matmul(adj_power, adj)
         return adj_power
 
+    def get_sparse_power_adj(self, edge_index, num_nodes):
+        r"""Get the power of the adjacency matrix as a sparse matrix.
+
+        The power only depends on the graph, so it is cached and recomputed
+        only when the edge index changes.
+
+        Parameters
+        ----------
+        edge_index : torch.Tensor
+            Edge index tensor.
+        num_nodes : int
+            Number of nodes.
+
+        Returns
+        -------
+        torch.Tensor
+            Power of the adjacency matrix, as a coalesced sparse COO matrix.
+        """
+        cached = self._cached_graph
+        if (
+            cached is not None
+            and cached[1] == num_nodes
+            and cached[0].shape == edge_index.shape
+            and cached[0].device == edge_index.device
+            and torch.equal(cached[0], edge_index)
+        ):
+            return self._cached_adj_power
+        no_loops, _ = torch_geometric.utils.remove_self_loops(edge_index)
+        adj = torch.sparse_coo_tensor(
+            no_loops,
+            torch.ones(no_loops.size(1), device=edge_index.device),
+            (num_nodes, num_nodes),
+        ).coalesce()
+        adj_power = adj
+        for _ in range(self.r_adj_power - 1):
+            adj_power = torch.sparse.mm(adj_power, adj).coalesce()
+        self._cached_graph = (edge_index.clone(), num_nodes)
+        self._cached_adj_power = adj_power
+        return adj_power
+
     def graph_mlp_contrast_loss(self, x_dis, adj_label):
         """Graph MLP contrastive loss.
 
@@ -69,6 +133,56 @@ class GraphMLPLoss(AbstractLoss):
         loss = -torch.log(x_dis_sum_pos * (x_dis_sum ** (-1)) + 1e-8).mean()
         return loss
 
+    def sampled_contrast_loss(self, z, adj_power):
+        r"""Graph MLP contrastive loss with a sampled denominator.
+
+        The positive term of every node is computed exactly on the entries of
+        the sparse power of the adjacency matrix. The sum over all the nodes
+        of the denominator is estimated from `num_negatives` nodes sampled
+        uniformly, with replacement, per node; it is exact if `num_negatives`
+        is at least the number of nodes. As in the dense loss, the similarity
+        of a node with itself is 0.
+
+        Parameters
+        ----------
+        z : torch.Tensor
+            Normalized embeddings of the nodes.
+        adj_power : torch.Tensor
+            Sparse power of the adjacency matrix.
+
+        Returns
+        -------
+        torch.Tensor
+            Contrastive loss.
+        """
+        num_nodes = z.size(0)
+        # The dense loss sums the weighted similarities over the rows
+        row, col = adj_power.indices()
+        sim_pos = torch.where(row == col, 0.0, (z[row] * z[col]).sum(-1))
+        x_dis_sum_pos = torch.zeros(num_nodes, device=z.device).index_add_(
+            0, col, adj_power.values() * torch.exp(self.tau * sim_pos)
+        )
+
+        nodes = torch.arange(num_nodes, device=z.device).unsqueeze(-1)
+        if self.num_negatives >= num_nodes:
+            negatives = nodes.T.expand(num_nodes, -1)
+        else:
+            negatives = torch.randint(
+                num_nodes, (num_nodes, self.num_negatives), device=z.device
+            )
+        sim_neg = torch.where(
+            negatives == nodes,
+            0.0,
+            (z[negatives] @ z.unsqueeze(-1)).squeeze(-1),
+        )
+        x_dis_sum = (
+            torch.exp(self.tau * sim_neg).sum(1)
+            * num_nodes
+            / negatives.size(1)
+        )
+        loss = -torch.log(x_dis_sum_pos * (x_dis_sum ** (-1)) + 1e-8).mean()
+        return loss
+
     def forward(
         self, model_out: dict, batch: torch_geometric.data.Data
     ) -> torch.Tensor:
@@ -85,10 +199,27 @@ class GraphMLPLoss(AbstractLoss):
         -------
         dict
             Dictionary containing the model output with the loss.
+
+        Raises
+        ------
+        ValueError
+            If the dense loss does not get a square distance matrix, i.e. the
+            backbone was built with `num_negatives` and the loss was not.
         """
         x_dis = model_out["x_dis"]
         if x_dis is None:  # Validation and test
             return torch.tensor(0.0)
+        if self.num_negatives is None and x_dis.shape[0] != x_dis.shape[1]:
+            raise ValueError(
+                f"The dense GraphMLP loss expects a square distance matrix, got a tensor of shape {tuple(x_dis.shape)}. Set `num_negatives` of the backbone and of the loss to the same value."
+            )
+        if self.num_negatives is not None:
+            adj_power = self.get_sparse_power_adj(
+                batch.edge_index, x_dis.size(0)
+            )
+            return self.loss_weight * self.sampled_contrast_loss(
+                x_dis, adj_power
+            )
         adj_label = self.get_power_adj(batch.edge_index)
         graph_mlp_loss = self.loss_weight * self.graph_mlp_contrast_loss(
             x_dis, adj_label
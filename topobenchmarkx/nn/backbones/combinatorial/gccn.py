@@ -6,7 +6,11 @@ import torch
 import torch.nn.functional as F
 from torch_geometric.data import Data
 
-from topobenchmarkx.data.utils import get_routes_from_neighborhoods
+from topobenchmarkx.data.utils import (
+    get_hasse_index,
+    get_hasse_index_key,
+    get_routes_from_neighborhoods,
+)
 
 
 class TopoTune(torch.nn.Module):
@@ -60,6 +64,9 @@ class TopoTune(torch.nn.Module):
     def get_nbhd_cache(self, params):
         """Cache the nbhd information into a dict for the complex at hand.
 
+        The indices precomputed by the `HasseGraphExpansion` transform are
+        used when available.
+
         Parameters
         ----------
         params : dict
@@ -77,24 +84,12 @@ class TopoTune(torch.nn.Module):
             src_rank, dst_rank = route
             if src_rank != dst_rank and (src_rank, dst_rank) not in nbhd_cache:
                 n_dst_nodes = getattr(params, f"x_{dst_rank}").shape[0]
-                if src_rank > dst_rank:
-                    boundary = getattr(params, neighborhood).coalesce()
-                    nbhd_cache[(src_rank, dst_rank)] = (
-                        interrank_boundary_index(
-                            getattr(params, f"x_{src_rank}"),
-                            boundary.indices(),
-                            n_dst_nodes,
-                        )
-                    )
-                elif src_rank < dst_rank:
-                    coboundary = getattr(params, neighborhood).coalesce()
-                    nbhd_cache[(src_rank, dst_rank)] = (
-                        interrank_boundary_index(
-                            getattr(params, f"x_{src_rank}"),
-                            coboundary.indices(),
-                            n_dst_nodes,
-                        )
-                    )
+                # (Co)boundary index, its rows are the destination cells
+                nbhd_cache[(src_rank, dst_rank)] = interrank_boundary_index(
+                    getattr(params, f"x_{src_rank}"),
+                    get_hasse_index(params, neighborhood),
+                    n_dst_nodes,
+                )
         return nbhd_cache
 
     def intrarank_expand(self, params, src_rank, nbhd):
@@ -114,6 +109,15 @@ class TopoTune(torch.nn.Module):
         torch_geometric.data.Data
             The expanded batch of intrarank Hasse graphs for this route.
         """
+        hasse_index = getattr(params, get_hasse_index_key(nbhd), None)
+        if hasse_index is not None:
+            # Precomputed by HasseGraphExpansion, the matrix is not needed
+            return Data(
+                x=getattr(params, f"x_{src_rank}"),
+                edge_index=hasse_index,
+                requires_grad=True,
+            )
+
         batch_route = Data(
             x=getattr(params, f"x_{src_rank}"),
             edge_index=getattr(params, nbhd).indices(),
@@ -250,6 +254,10 @@ class TopoTune(torch.nn.Module):
     def generate_membership_vectors(self, batch: Data):
         """Generate membership vectors based on batch.cell_statistics.
 
+        The `batch_{rank}` vectors generated by the collate function are used
+        when available, otherwise they are derived from `batch.cell_statistics`
+        on its device.
+
         Parameters
         ----------
         batch : torch_geometric.data.Data
@@ -260,20 +268,17 @@ class TopoTune(torch.nn.Module):
         dict
             The batch membership of the graphs per rank.
         """
-        max_dim = batch.cell_statistics.shape[1]
         cell_statistics = batch.cell_statistics
-        membership = {
-            j: torch.tensor(
-                [
-                    elem
-                    for list in [
-                        [i] * x for i, x in enumerate(cell_statistics[:, j])
-                    ]
-                    for elem in list
-                ]
-            )
-            for j in range(max_dim)
-        }
+        graph_idx = torch.arange(
+            cell_statistics.shape[0], device=cell_statistics.device
+        )
+        membership = {}
+        for rank in range(cell_statistics.shape[1]):
+            membership[rank] = getattr(batch, f"batch_{rank}", None)
+            if membership[rank] is None:
+                membership[rank] = torch.repeat_interleave(
+                    graph_idx, cell_statistics[:, rank]
+                )
         return membership
 
     def forward(self, batch):
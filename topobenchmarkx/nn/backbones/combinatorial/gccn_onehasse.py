@@ -6,7 +6,11 @@ import torch
 import torch.nn.functional as F
 from torch_geometric.data import Data
 
-from topobenchmarkx.data.utils import get_routes_from_neighborhoods
+from topobenchmarkx.data.utils import (
+    get_hasse_index,
+    get_neighborhood_ranks,
+    get_routes_from_neighborhoods,
+)
 
 
 class TopoTune_OneHasse(torch.nn.Module):
@@ -14,7 +18,9 @@ class TopoTune_OneHasse(torch.nn.Module):
 
     This class takes a GNN and its kwargs as inputs, and tunes it with specified additional relations.
     Unlike the case of TopoTune, this class expects a single Hasse graph as input, where all
-    higher-order neighborhoods are represented as a single adjacency matrix.
+    higher-order neighborhoods are represented as a single adjacency matrix. The Hasse graph
+    contains the cells of rank 0 to the highest rank of the routes, and at least the nodes,
+    edges and faces.
 
     Parameters
     ----------
@@ -44,7 +50,18 @@ class TopoTune_OneHasse(torch.nn.Module):
 
         self.layers = layers
         self.use_edge_attr = use_edge_attr
-        self.max_rank = 2
+        self.max_rank = max(2, *(max(route) for route in self.routes))
+        # Ranks of the rows and columns of the matrix of every neighborhood
+        self.register_buffer(
+            "nbhd_ranks",
+            torch.tensor(
+                [
+                    get_neighborhood_ranks(neighborhood)
+                    for neighborhood in neighborhoods
+                ]
+            ),
+            persistent=False,
+        )
         self.graph_routes = torch.nn.ModuleList()
         self.GNN = [i for i in GNN.named_modules()]
         self.activation = activation
@@ -59,6 +76,11 @@ class TopoTune_OneHasse(torch.nn.Module):
     def all_nbhds_expand(self, params, membership):
         """Expand the complex into a single Hasse graph which contains all ranks and all nbhd.
 
+        The cells are ordered by rank. The indices of every neighborhood,
+        precomputed by the `HasseGraphExpansion` transform when available,
+        are shifted by the offsets of the ranks of their rows and columns,
+        computed once per batch on the device of the model.
+
         Parameters
         ----------
         params : dict
@@ -71,138 +93,33 @@ class TopoTune_OneHasse(torch.nn.Module):
         torch_geometric.data.Data
             The expanded Hasse graph.
         """
-
-        device = params.x_0.device
-
-        x = torch.cat(
-            [getattr(params, f"x_{i}") for i in range(self.max_rank + 1)],
-            dim=0,
-        ).to(device)
-
-        max_node_id = params.x_0.shape[0]
-        max_edge_id = params.x_1.shape[0]
-
-        edge_indices = []
-        edge_attrs = []
-
-        for route, neighborhood in zip(
-            self.routes, self.neighborhoods, strict=False
-        ):
-            src_rank, dst_rank = route
-
-            if (
-                "up_laplacian" in neighborhood
-                or "up_adjacency" in neighborhood
-            ):
-                if src_rank == 0:  # node-to-edge
-                    adjustment = torch.tensor([[0], [0]]).to(device)
-                elif src_rank == 1:  # edge-to-face
-                    adjustment = torch.tensor(
-                        [[max_node_id], [max_node_id]]
-                    ).to(device)
-                else:
-                    raise ValueError(
-                        f"Unsupported src_rank for 'up' neighborhood: {src_rank}"
-                    )
-
-                edge_indices.append(
-                    getattr(params, neighborhood).indices().to(device)
-                    + adjustment
-                )
-                edge_attrs.append(
-                    getattr(params, neighborhood).values().squeeze()
-                )
-
-            elif (
-                "down_laplacian" in neighborhood
-                or "down_adjacency" in neighborhood
-            ):
-                if src_rank == 1:  # edge-to-node
-                    adjustment = torch.tensor(
-                        [[max_node_id], [max_node_id]]
-                    ).to(device)
-                elif src_rank == 2:  # face-to-edge
-                    adjustment = torch.tensor(
-                        [
-                            [max_node_id + max_edge_id],
-                            [max_node_id + max_edge_id],
-                        ]
-                    ).to(device)
-                else:
-                    raise ValueError(
-                        f"Unsupported src_rank for 'down' neighborhood: {src_rank}"
-                    )
-
-                edge_indices.append(
-                    getattr(params, neighborhood).indices().to(device)
-                    + adjustment
-                )
-                edge_attrs.append(
-                    getattr(params, neighborhood).values().squeeze()
-                )
-
-            elif "down_incidence" in neighborhood:
-                if src_rank == 1:  # edge-to-face
-                    adjustment = torch.tensor([[0], [max_node_id]]).to(device)
-                elif src_rank == 2:  # face-to-edge
-                    adjustment = torch.tensor(
-                        [[max_node_id], [max_node_id + max_edge_id]]
-                    ).to(device)
-                else:
-                    raise ValueError(
-                        f"Unsupported src_rank for 'down_incidence' neighborhood: {src_rank}"
-                    )
-
-                edge_indices.append(
-                    getattr(params, neighborhood)
-                    .coalesce()
-                    .indices()
-                    .to(device)
-                    + adjustment
-                )
-                edge_attrs.append(
-                    getattr(params, neighborhood).values().squeeze()
-                )
-
-            elif "up_incidence" in neighborhood:
-                if src_rank == 0:  # node-to-edge
-                    adjustment = torch.tensor([[max_node_id], [0]]).to(device)
-                elif src_rank == 1:  # edge-to-face
-                    adjustment = torch.tensor(
-                        [[max_node_id + max_edge_id], [max_node_id]]
-                    ).to(device)
-                else:
-                    raise ValueError(
-                        f"Unsupported src_rank for 'up_incidence' neighborhood: {src_rank}"
-                    )
-                coincidence_indices = (
-                    getattr(params, neighborhood)
-                    .T.coalesce()
-                    .indices()
-                    .to(device)
-                    + adjustment
+        xs = [
+            getattr(params, f"x_{rank}") for rank in range(self.max_rank + 1)
+        ]
+        num_cells = torch.tensor(
+            [x.shape[0] for x in xs], device=self.nbhd_ranks.device
+        )
+        # Offsets of the rows and columns of every neighborhood
+        adjustments = (torch.cumsum(num_cells, dim=0) - num_cells)[
+            self.nbhd_ranks
+        ].unsqueeze(-1)
+
+        edge_index = torch.cat(
+            [
+                get_hasse_index(params, neighborhood) + adjustment
+                for neighborhood, adjustment in zip(
+                    self.neighborhoods, adjustments, strict=True
                 )
-
-                edge_indices.append(coincidence_indices)
-                # edge_attrs.append(
-                #     getattr(params, neighborhood)
-                #     .T.coalesce()
-                #     .values()
-                #     .squeeze()
-                # )
-
-        edge_index = torch.cat(edge_indices, dim=1)
-        # edge_attr = torch.cat(edge_attrs, dim=0)
-
-        batch_expanded = torch.cat(
-            [membership[0], membership[1], membership[2]], dim=0
-        ).to(device)
+            ],
+            dim=1,
+        )
 
         return Data(
-            x=x,
+            x=torch.cat(xs, dim=0),
             edge_index=edge_index,
-            # edge_attr=edge_attr,
-            batch=batch_expanded,
+            batch=torch.cat(
+                [membership[rank] for rank in range(self.max_rank + 1)], dim=0
+            ),
         )
 
     def all_nbhds_gnn_forward(
@@ -265,6 +182,10 @@ class TopoTune_OneHasse(torch.nn.Module):
     def generate_membership_vectors(self, batch: Data):
         """Generate membership vectors based on batch.cell_statistics.
 
+        The `batch_{rank}` vectors generated by the collate function are used
+        when available, otherwise they are derived from `batch.cell_statistics`
+        on its device.
+
         Parameters
         ----------
         batch : torch_geometric.data.Data
@@ -275,20 +196,17 @@ class TopoTune_OneHasse(torch.nn.Module):
         dict
             The batch membership of the graphs per rank.
         """
-        max_dim = batch.cell_statistics.shape[1]
         cell_statistics = batch.cell_statistics
-        membership = {
-            j: torch.tensor(
-                [
-                    elem
-                    for list in [
-                        [i] * x for i, x in enumerate(cell_statistics[:, j])
-                    ]
-                    for elem in list
-                ]
-            )
-            for j in range(max_dim)
-        }
+        graph_idx = torch.arange(
+            cell_statistics.shape[0], device=cell_statistics.device
+        )
+        membership = {}
+        for rank in range(cell_statistics.shape[1]):
+            membership[rank] = getattr(batch, f"batch_{rank}", None)
+            if membership[rank] is None:
+                membership[rank] = torch.repeat_interleave(
+                    graph_idx, cell_statistics[:, rank]
+                )
         return membership
 
     def forward(self, batch):
@@ -314,8 +232,10 @@ class TopoTune_OneHasse(torch.nn.Module):
             x_out_per_rank[2] = batch.x_2
             return x_out_per_rank
 
+        # The Hasse graph does not depend on the features, only they are
+        # updated at every layer
+        batch_route = self.all_nbhds_expand(batch, self.membership)
         for layer_idx in range(self.layers):
-            batch_route = self.all_nbhds_expand(batch, self.membership)
             x_out = self.all_nbhds_gnn_forward(
                 batch_route,
                 layer_idx,
@@ -328,6 +248,10 @@ class TopoTune_OneHasse(torch.nn.Module):
             for rank in x_out_per_rank:
                 x_out_per_rank[rank] = act(x_out_per_rank[rank])
                 setattr(batch, f"x_{rank}", x_out_per_rank[rank])
+            batch_route.x = torch.cat(
+                [x_out_per_rank[rank] for rank in range(self.max_rank + 1)],
+                dim=0,
+            )
 
         for rank in range(self.max_rank + 1):
             if rank not in x_out_per_rank:
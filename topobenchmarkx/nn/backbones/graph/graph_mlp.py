@@ -18,16 +18,29 @@ class GraphMLP(nn.Module):
         To compute order-th power of adj matrix (default: 1).
     dropout : float, optional
         Dropout rate (default: 0.0).
+    num_negatives : int, optional
+        Number of nodes sampled per node by the `GraphMLPLoss`, which must be
+        given the same value. If given, the L2-normalized embeddings are
+        returned during training instead of the dense matrix of the cosine
+        similarities of the nodes, and the loss computes the similarities of
+        the sampled pairs only (default: None).
     **kwargs
         Additional arguments.
     """
 
     def __init__(
-        self, in_channels, hidden_channels, order=1, dropout=0.0, **kwargs
+        self,
+        in_channels,
+        hidden_channels,
+        order=1,
+        dropout=0.0,
+        num_negatives=None,
+        **kwargs,
     ):
         super().__init__()
         self.out_channels = hidden_channels
         self.order = order
+        self.num_negatives = num_negatives
         self.mlp = Mlp(in_channels, self.out_channels, dropout)
 
     def forward(self, x):
@@ -42,11 +55,19 @@ class GraphMLP(nn.Module):
         -------
         torch.Tensor
             Output tensor.
+        torch.Tensor
+            Feature distance matrix, or normalized embeddings if
+            `num_negatives` is given, during training, None otherwise.
         """
         x = self.mlp(x)
         Z = x
 
-        x_dis = get_feature_dis(Z) if self.training else None
+        if not self.training:
+            x_dis = None
+        elif self.num_negatives is None:
+            x_dis = get_feature_dis(Z)
+        else:
+            x_dis = torch.nn.functional.normalize(Z, dim=1)
 
         return x, x_dis
 
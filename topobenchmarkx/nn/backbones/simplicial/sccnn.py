@@ -2,6 +2,7 @@
 
 import torch
 from torch.nn.parameter import Parameter
+from torch_geometric.utils import scatter
 
 
 class SCCNNCustom(torch.nn.Module):
@@ -85,10 +86,20 @@ class SCCNNCustom(torch.nn.Module):
         in_x_1 = self.in_linear_1(x_1)
         in_x_2 = self.in_linear_2(x_2)
 
+        # The aggregation normalisations only depend on the Laplacians, so
+        # they are computed once for all the layers
+        aggr_norms = (
+            self.layers[0].get_aggr_norms(laplacian_all)
+            if len(self.layers) > 0 and self.layers[0].aggr_norm
+            else None
+        )
+
         # Forward through SCCNN
         x_all = (in_x_0, in_x_1, in_x_2)
         for layer in self.layers:
-            x_all = layer(x_all, laplacian_all, incidence_all)
+            x_all = layer(
+                x_all, laplacian_all, incidence_all, aggr_norms=aggr_norms
+            )
 
         return x_all
 
@@ -209,7 +220,61 @@ class SCCNNLayer(torch.nn.Module):
                 "Should be either xavier_uniform or xavier_normal."
             )
 
-    def aggr_norm_func(self, conv_operator, x):
+    @staticmethod
+    def get_neighborhood_size_inv(conv_operator):
+        r"""Compute the inverse of the neighborhood size of every cell.
+
+        The neighborhood size is the sum of the row of the convolution
+        operator. For sparse operators it is a scatter-sum of the nonzero
+        values, so the operator is never densified.
+
+        Parameters
+        ----------
+        conv_operator : torch.sparse
+            Convolution operator.
+
+        Returns
+        -------
+        torch.Tensor
+            Inverse of the neighborhood size of every cell, 0 for the cells
+            with an empty neighborhood.
+        """
+        if conv_operator.is_sparse:
+            if not conv_operator.is_coalesced():
+                conv_operator = conv_operator.coalesce()
+            neighborhood_size = scatter(
+                conv_operator.values(),
+                conv_operator.indices()[0],
+                dim=0,
+                dim_size=conv_operator.size(0),
+                reduce="sum",
+            )
+        else:
+            neighborhood_size = torch.sum(conv_operator, dim=1)
+        neighborhood_size_inv = 1 / neighborhood_size
+        neighborhood_size_inv[~(torch.isfinite(neighborhood_size_inv))] = 0
+        return neighborhood_size_inv
+
+    def get_aggr_norms(self, laplacian_all):
+        r"""Compute the aggregation normalisation of every Laplacian.
+
+        Parameters
+        ----------
+        laplacian_all : tuple of tensors
+            Tuple of Laplacian tensors.
+
+        Returns
+        -------
+        tuple of tensors
+            Inverse of the neighborhood sizes of every Laplacian, in the same
+            order.
+        """
+        return tuple(
+            self.get_neighborhood_size_inv(laplacian)
+            for laplacian in laplacian_all
+        )
+
+    def aggr_norm_func(self, conv_operator, x, neighborhood_size_inv=None):
         r"""Perform aggregation normalization.
 
         Parameters
@@ -218,19 +283,22 @@ class SCCNNLayer(torch.nn.Module):
             Convolution operator.
         x : torch.Tensor
             Feature tensor.
+        neighborhood_size_inv : torch.Tensor, optional
+            Precomputed inverse of the neighborhood sizes of the operator, see
+            `get_neighborhood_size_inv` (default: None).
 
         Returns
         -------
         torch.Tensor
             Normalized feature tensor.
         """
-        neighborhood_size = torch.sum(conv_operator.to_dense(), dim=1)
-        neighborhood_size_inv = 1 / neighborhood_size
-        neighborhood_size_inv[~(torch.isfinite(neighborhood_size_inv))] = 0
+        if neighborhood_size_inv is None:
+            neighborhood_size_inv = self.get_neighborhood_size_inv(
+                conv_operator
+            )
 
-        x = torch.einsum("i,ij->ij ", neighborhood_size_inv, x)
-        x[~torch.isfinite(x)] = 0
-        return x
+        x = neighborhood_size_inv.unsqueeze(1) * x
+        return torch.where(torch.isfinite(x), x, 0)
 
     def update(self, x):
         """Update embeddings on each cell (step 4).
@@ -251,7 +319,9 @@ class SCCNNLayer(torch.nn.Module):
             return torch.nn.functional.relu(x)
         return None
 
-    def chebyshev_conv(self, conv_operator, conv_order, x):
+    def chebyshev_conv(
+        self, conv_operator, conv_order, x, neighborhood_size_inv=None
+    ):
         r"""Perform Chebyshev convolution.
 
         Parameters
@@ -262,30 +332,63 @@ class SCCNNLayer(torch.nn.Module):
             Order of the convolution.
         x : torch.Tensor
             Feature tensor.
+        neighborhood_size_inv : torch.Tensor, optional
+            Precomputed inverse of the neighborhood sizes of the operator, used
+            if `aggr_norm` is True (default: None).
 
         Returns
         -------
         torch.Tensor
             Output tensor.
         """
-        num_simplices, num_channels = x.shape
-        X = torch.empty(size=(num_simplices, num_channels, conv_order)).to(
-            x.device
+        return torch.stack(
+            self._chebyshev_terms(
+                conv_operator, conv_order, x, neighborhood_size_inv
+            ),
+            dim=2,
         )
 
-        if self.aggr_norm:
-            X[:, :, 0] = torch.mm(conv_operator, x)
-            X[:, :, 0] = self.aggr_norm_func(conv_operator, X[:, :, 0])
-            for k in range(1, conv_order):
-                X[:, :, k] = torch.mm(conv_operator, X[:, :, k - 1])
-                X[:, :, k] = self.aggr_norm_func(conv_operator, X[:, :, k])
-        else:
-            X[:, :, 0] = torch.mm(conv_operator, x)
-            for k in range(1, conv_order):
-                X[:, :, k] = torch.mm(conv_operator, X[:, :, k - 1])
-        return X
+    def _chebyshev_terms(
+        self, conv_operator, conv_order, x, neighborhood_size_inv=None
+    ):
+        r"""Compute the terms of the Chebyshev convolution.
 
-    def forward(self, x_all, laplacian_all, incidence_all):
+        The terms are computed in a single loop and returned as a list, so
+        that the terms of all the filters of a rank are stacked only once.
+
+        Parameters
+        ----------
+        conv_operator : torch.sparse
+            Convolution operator.
+        conv_order : int
+            Order of the convolution.
+        x : torch.Tensor
+            Feature tensor.
+        neighborhood_size_inv : torch.Tensor, optional
+            Precomputed inverse of the neighborhood sizes of the operator, used
+            if `aggr_norm` is True (default: None).
+
+        Returns
+        -------
+        list[torch.Tensor]
+            Terms of order 1 to `conv_order`.
+        """
+        if self.aggr_norm and neighborhood_size_inv is None:
+            neighborhood_size_inv = self.get_neighborhood_size_inv(
+                conv_operator
+            )
+
+        terms = []
+        for _ in range(conv_order):
+            x = torch.mm(conv_operator, x)
+            if self.aggr_norm:
+                x = self.aggr_norm_func(
+                    conv_operator, x, neighborhood_size_inv
+                )
+            terms.append(x)
+        return terms
+
+    def forward(self, x_all, laplacian_all, incidence_all, aggr_norms=None):
         r"""Forward computation.
 
         Parameters
@@ -296,6 +399,9 @@ class SCCNNLayer(torch.nn.Module):
             Tuple of Laplacian tensors (graph laplacian L0, down edge laplacian L1_d, upper edge laplacian L1_u, face laplacian L2).
         incidence_all : tuple of tensors
             Tuple of order 1 and 2 incidence matrices.
+        aggr_norms : tuple of tensors, optional
+            Aggregation normalisations of the Laplacians, see `get_aggr_norms`. They are computed if `aggr_norm` is
+            True and they are not given (default: None).
 
         Returns
         -------
@@ -321,165 +427,96 @@ class SCCNNLayer(torch.nn.Module):
                 laplacian_up_2,
             ) = laplacian_all
 
-        # num_nodes, num_edges, num_triangles = x_0.shape[0], x_1.shape[0], x_2.shape[0]
+        if self.aggr_norm and aggr_norms is None:
+            aggr_norms = self.get_aggr_norms(laplacian_all)
+        if aggr_norms is None:
+            aggr_norms = (None,) * len(laplacian_all)
+        norm_0, norm_down_1, norm_up_1, norm_down_2, norm_up_2 = aggr_norms
 
         b1, b2 = incidence_all
 
-        # identity_0, identity_1, identity_2 = (
-        #     torch.eye(num_nodes).to(x_0.device),
-        #     torch.eye(num_edges).to(x_0.device),
-        #     torch.eye(num_triangles).to(x_0.device),
-        # )
+        # The terms of the filters of each rank are gathered in a list and
+        # stacked once, in the order of the weights
         """
         Convolution in the node space
         """
-        # -----------Logic to obtain update for 0-cells --------
-        # x_identity_0 = torch.unsqueeze(identity_0 @ x_0, 2)
-        # x_0_to_0 = self.chebyshev_conv(laplacian_0, self.conv_order, x_0)
-        # x_0_to_0 = torch.cat((x_identity_0, x_0_to_0), 2)
-
-        x_0_laplacian = self.chebyshev_conv(laplacian_0, self.conv_order, x_0)
-        x_0_to_0 = torch.cat([x_0.unsqueeze(2), x_0_laplacian], dim=2)
-        # -------------------
-
-        # x_1_to_0 = torch.mm(b1, x_1)
-        # x_1_to_0_identity = torch.unsqueeze(identity_0 @ x_1_to_0, 2)
-        # x_1_to_0 = self.chebyshev_conv(laplacian_0, self.conv_order, x_1_to_0)
-        # x_1_to_0 = torch.cat((x_1_to_0_identity, x_1_to_0), 2)
-
         x_1_to_0_upper = torch.mm(b1, x_1)
-        x_1_to_0_laplacian = self.chebyshev_conv(
-            laplacian_0, self.conv_order, x_1_to_0_upper
-        )
-        x_1_to_0 = torch.cat(
-            [x_1_to_0_upper.unsqueeze(2), x_1_to_0_laplacian], dim=2
-        )
-        # -------------------
+        x_0_all = [
+            x_0,
+            *self._chebyshev_terms(laplacian_0, self.conv_order, x_0, norm_0),
+            x_1_to_0_upper,
+            *self._chebyshev_terms(
+                laplacian_0, self.conv_order, x_1_to_0_upper, norm_0
+            ),
+        ]
 
-        x_0_all = torch.cat((x_0_to_0, x_1_to_0), 2)
-
-        # -------------------
         """
         Convolution in the edge space
         """
-
-        # -----------Logic to obtain update for 1-cells --------
-        # x_identity_1 = torch.unsqueeze(identity_1 @ x_1, 2)
-        # x_1_down = self.chebyshev_conv(laplacian_down_1, self.conv_order, x_1)
-        # x_1_up = self.chebyshev_conv(laplacian_up_1, self.conv_order, x_1)
-        # x_1_to_1 = torch.cat((x_identity_1, x_1_down, x_1_up), 2)
-
-        x_1_down = self.chebyshev_conv(laplacian_down_1, self.conv_order, x_1)
-        x_1_up = self.chebyshev_conv(laplacian_down_1, self.conv_order, x_1)
-        x_1_to_1 = torch.cat((x_1.unsqueeze(2), x_1_down, x_1_up), 2)
-
-        # -------------------
-
-        # x_0_to_1 = torch.mm(b1.T, x_0)
-        # x_0_to_1_identity = torch.unsqueeze(identity_1 @ x_0_to_1, 2)
-        # x_0_to_1 = self.chebyshev_conv(laplacian_down_1, self.conv_order, x_0_to_1)
-        # x_0_to_1 = torch.cat((x_0_to_1_identity, x_0_to_1), 2)
-
         # Lower projection
         x_0_1_lower = torch.mm(b1.T, x_0)
-
-        # Calculate lowwer chebyshev_conv
-        x_0_1_down = self.chebyshev_conv(
-            laplacian_down_1, self.conv_order, x_0_1_lower
-        )
-
-        # Calculate upper chebyshev_conv (Note: in case of signed incidence should be always zero)
-        x_0_1_up = self.chebyshev_conv(
-            laplacian_up_1, self.conv_order, x_0_1_lower
-        )
-
-        # Concatenate output of filters
-        x_0_to_1 = torch.cat(
-            [x_0_1_lower.unsqueeze(2), x_0_1_down, x_0_1_up], dim=2
-        )
-        # -------------------
-
-        # x_2_to_1 = torch.mm(b2, x_2)
-        # x_2_to_1_identity = torch.unsqueeze(identity_1 @ x_2_to_1, 2)
-        # x_2_to_1 = self.chebyshev_conv(laplacian_up_1, self.conv_order, x_2_to_1)
-        # x_2_to_1 = torch.cat((x_2_to_1_identity, x_2_to_1), 2)
-
         x_2_1_upper = torch.mm(b2, x_2)
-
-        # Calculate lowwer chebyshev_conv (Note: In case of signed incidence should be always zero)
-        x_2_1_down = self.chebyshev_conv(
-            laplacian_down_1, self.conv_order, x_2_1_upper
+        # The lower Laplacian is used for both the lower and upper filters of
+        # x_1, so they are computed once
+        x_1_down = self._chebyshev_terms(
+            laplacian_down_1, self.conv_order, x_1, norm_down_1
         )
+        x_1_all = [
+            x_0_1_lower,
+            *self._chebyshev_terms(
+                laplacian_down_1, self.conv_order, x_0_1_lower, norm_down_1
+            ),
+            # Note: in case of signed incidence should be always zero
+            *self._chebyshev_terms(
+                laplacian_up_1, self.conv_order, x_0_1_lower, norm_up_1
+            ),
+            x_1,
+            *x_1_down,
+            *x_1_down,
+            x_2_1_upper,
+            # Note: in case of signed incidence should be always zero
+            *self._chebyshev_terms(
+                laplacian_down_1, self.conv_order, x_2_1_upper, norm_down_1
+            ),
+            *self._chebyshev_terms(
+                laplacian_up_1, self.conv_order, x_2_1_upper, norm_up_1
+            ),
+        ]
 
-        # Calculate upper chebyshev_conv
-        x_2_1_up = self.chebyshev_conv(
-            laplacian_up_1, self.conv_order, x_2_1_upper
-        )
-
-        x_2_to_1 = torch.cat(
-            [x_2_1_upper.unsqueeze(2), x_2_1_down, x_2_1_up], dim=2
-        )
-
-        # -------------------
-        x_1_all = torch.cat((x_0_to_1, x_1_to_1, x_2_to_1), 2)
         """Convolution in the face (triangle) space, depending on the SC order,
         the exact form maybe a little different."""
-        # -------------------Logic to obtain update for 2-cells --------
-        # x_identity_2 = torch.unsqueeze(identity_2 @ x_2, 2)
-
-        # if self.sc_order == 2:
-        #     x_2 = self.chebyshev_conv(laplacian_2, self.conv_order, x_2)
-        #     x_2_to_2 = torch.cat((x_identity_2, x_2), 2)
-        # elif self.sc_order > 2:
-        #     x_2_down = self.chebyshev_conv(laplacian_down_2, self.conv_order, x_2)
-        #     x_2_up = self.chebyshev_conv(laplacian_up_2, self.conv_order, x_2)
-        #     x_2_to_2 = torch.cat((x_identity_2, x_2_down, x_2_up), 2)
-        x_2_down = self.chebyshev_conv(laplacian_down_2, self.conv_order, x_2)
-        x_2_up = self.chebyshev_conv(laplacian_up_2, self.conv_order, x_2)
-        x_2_to_2 = torch.cat((x_2.unsqueeze(2), x_2_down, x_2_up), 2)
+        x_1_2_lower = torch.mm(b2.T, x_1)
+        # The upper filter of the lower projection is used twice, its lower
+        # filter is not used
+        x_1_2_up = self._chebyshev_terms(
+            laplacian_up_2, self.conv_order, x_1_2_lower, norm_up_2
+        )
+        # To execute the upper projection we need simplices of order 3
+        x_2_all = [
+            x_1_2_lower,
+            *x_1_2_up,
+            *x_1_2_up,
+            x_2,
+            *self._chebyshev_terms(
+                laplacian_down_2, self.conv_order, x_2, norm_down_2
+            ),
+            *self._chebyshev_terms(
+                laplacian_up_2, self.conv_order, x_2, norm_up_2
+            ),
+        ]
 
         # -------------------
 
-        # x_1_to_2 = torch.mm(b2.T, x_1)
-        # x_1_to_2_identity = torch.unsqueeze(identity_2 @ x_1_to_2, 2)
-        # if self.sc_order == 2:
-        #     x_1_to_2 = self.chebyshev_conv(laplacian_2, self.conv_order, x_1_to_2)
-        # elif self.sc_order > 2:
-        #     x_1_to_2 = self.chebyshev_conv(laplacian_down_2, self.conv_order, x_1_to_2)
-        # x_1_to_2 = torch.cat((x_1_to_2_identity, x_1_to_2), 2)
-
-        x_1_2_lower = torch.mm(b2.T, x_1)
-        x_1_2_down = self.chebyshev_conv(
-            laplacian_down_2, self.conv_order, x_1_2_lower
+        y_0 = torch.einsum(
+            "nik,iok->no", torch.stack(x_0_all, dim=2), self.weight_0
         )
-        x_1_2_down = self.chebyshev_conv(
-            laplacian_up_2, self.conv_order, x_1_2_lower
+        y_1 = torch.einsum(
+            "nik,iok->no", torch.stack(x_1_all, dim=2), self.weight_1
         )
-
-        x_1_to_2 = torch.cat(
-            [x_1_2_lower.unsqueeze(2), x_1_2_down, x_1_2_down], dim=2
+        y_2 = torch.einsum(
+            "nik,iok->no", torch.stack(x_2_all, dim=2), self.weight_2
         )
 
-        # That is my code, but to execute this part we need to have simplices order of k+1 in this case order of 3
-        # x_3_2_upper = x_1_to_2 = torch.mm(b2, x_3)
-        # x_3_2_down = self.chebyshev_conv(laplacian_down_2, self.conv_order, x_3_2_upper)
-        # x_3_2_up = self.chebyshev_conv(laplacian_up_2, self.conv_order, x_3_2_upper)
-
-        # x_3_to_2 = torch.cat([x_3_2_upper.unsueeze(2), x_3_2_down, x_3_2_up], dim=2)
-
-        # -------------------
-
-        x_2_all = torch.cat([x_1_to_2, x_2_to_2], dim=2)
-        # The final version of this model should have the following line
-        # x_2_all = torch.cat([x_1_to_2, x_2_to_2, x_3_to_2], dim=2)
-
-        # -------------------
-
-        # Need to check that this einsums are correct
-        y_0 = torch.einsum("nik,iok->no", x_0_all, self.weight_0)
-        y_1 = torch.einsum("nik,iok->no", x_1_all, self.weight_1)
-        y_2 = torch.einsum("nik,iok->no", x_2_all, self.weight_2)
-
         if self.update_func is None:
             return y_0, y_1, y_2
 
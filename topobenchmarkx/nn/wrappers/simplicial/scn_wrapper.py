@@ -1,6 +1,7 @@
 """Wrapper for the SCNW model."""
 
 import torch
+from torch_geometric.utils import scatter
 
 from topobenchmarkx.nn.wrappers.base import AbstractWrapper
 
@@ -49,6 +50,9 @@ class SCNWrapper(AbstractWrapper):
 
         The normalization is performed using the diagonal matrix of the inverse square root of the sum of the absolute values of the rows.
 
+        The row sums are computed from the nonzero values of the matrix, and the values are rescaled directly, so the
+        matrix is never densified and no sparse products are needed.
+
         Parameters
         ----------
         matrix : torch.sparse.FloatTensor
@@ -59,18 +63,22 @@ class SCNWrapper(AbstractWrapper):
         torch.sparse.FloatTensor
             Normalized matrix.
         """
-        matrix_ = matrix.to_dense()
-        n, _ = matrix_.shape
-        abs_matrix = abs(matrix_)
-        diag_sum = abs_matrix.sum(axis=1)
+        if not matrix.is_coalesced():
+            matrix = matrix.coalesce()
+        indices, values = matrix.indices(), matrix.values()
+        row, col = indices
+        diag_sum = scatter(
+            values.abs(), row, dim=0, dim_size=matrix.size(0), reduce="sum"
+        )
 
         # Handle division by zero
-        idxs = torch.where(diag_sum != 0)
-        diag_sum[idxs] = 1.0 / torch.sqrt(diag_sum[idxs])
-
-        diag_indices = torch.stack([torch.arange(n), torch.arange(n)])
-        diag_matrix = torch.sparse_coo_tensor(
-            diag_indices, diag_sum, matrix_.shape, device=matrix.device
-        ).coalesce()
-        normalized_matrix = diag_matrix @ (matrix @ diag_matrix)
-        return normalized_matrix
+        diag_sum = torch.where(
+            diag_sum != 0, diag_sum.rsqrt(), torch.zeros_like(diag_sum)
+        )
+
+        return torch.sparse_coo_tensor(
+            indices,
+            diag_sum[row] * values * diag_sum[col],
+            matrix.shape,
+            is_coalesced=True,
+        )
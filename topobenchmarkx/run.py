@@ -134,7 +134,12 @@ def run(cfg: DictConfig) -> tuple[dict[str, Any], dict[str, Any]]:
     # Preprocess dataset and load the splits
     log.info("Instantiating preprocessor...")
     transform_config = cfg.get("transforms", None)
-    preprocessor = PreProcessor(dataset, dataset_dir, transform_config)
+    preprocessor = PreProcessor(
+        dataset,
+        dataset_dir,
+        transform_config,
+        **cfg.dataset.get("preprocessor_params", {}),
+    )
     dataset_train, dataset_val, dataset_test = (
         preprocessor.load_dataset_splits(cfg.dataset.split_params)
     )
@@ -0,0 +1,63 @@
+"""A transform that precomputes the Hasse graph indices of the neighborhoods."""
+
+import torch_geometric
+
+from topobenchmarkx.data.utils import LazyConnectivity, get_hasse_index_key
+
+
+class HasseGraphExpansion(torch_geometric.transforms.BaseTransform):
+    r"""A transform that precomputes the Hasse graph indices of the neighborhoods.
+
+    The indices of the entries of the (coalesced) matrix of every neighborhood
+    are stored under `get_hasse_index_key(neighborhood)`. They only depend on
+    the complex, so TopoTune and TopoTune_OneHasse read them instead of
+    expanding the sparse matrices of the batch at every forward pass. When
+    collated, the rows and columns of an index are offset by the number of
+    cells of their ranks, as the indices of the block-diagonal matrix of the
+    batch.
+
+    Parameters
+    ----------
+    **kwargs : optional
+        Parameters for the base transform. The `neighborhoods` parameter
+        lists the neighborhoods to expand, ex: ["up_adjacency-0",
+        "down_incidence-1"]. If it is None, as when the model has no
+        neighborhoods, the data is left unchanged.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.type = "hasse_graph_expansion"
+        self.parameters = kwargs
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(type={self.type!r}, parameters={self.parameters!r})"
+
+    def forward(self, data: torch_geometric.data.Data):
+        r"""Apply the transform to the input data.
+
+        Parameters
+        ----------
+        data : torch_geometric.data.Data
+            The input data.
+
+        Returns
+        -------
+        torch_geometric.data.Data
+            The transformed data.
+        """
+        neighborhoods = self.parameters.get("neighborhoods")
+        if not neighborhoods:
+            return data
+        # Matrices that are not stored are derived from the incidences
+        connectivity = LazyConnectivity.from_data(data)
+        for neighborhood in neighborhoods:
+            matrix = (
+                data[neighborhood]
+                if neighborhood in data
+                else connectivity[neighborhood]
+            )
+            data[get_hasse_index_key(neighborhood)] = (
+                matrix.coalesce().indices()
+            )
+        return data
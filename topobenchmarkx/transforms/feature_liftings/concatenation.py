@@ -3,21 +3,34 @@
 import torch
 import torch_geometric
 
+from topobenchmarkx.data.utils.utils import get_cell_faces
+
 
 class Concatenation(torch_geometric.transforms.BaseTransform):
     r"""Lift r-cell features to r+1-cells by concatenation.
 
+    The features of the faces of each cell are concatenated in the order of
+    the face indices. Cells with different numbers of faces, as in cell
+    complexes with ragged boundaries, need `max_num_faces`: the features of
+    the cells of rank 2 and above are then padded with zeros to the features
+    of `max_num_faces` faces, so that their width is the same in every graph.
+
     Parameters
     ----------
+    max_num_faces : int, optional
+        Maximum number of faces of the cells of rank 2 and above, ex: the
+        `max_cell_length` of a cycle lifting. If None, the cells of a rank
+        must all have the same number of faces (default: None).
     **kwargs : optional
         Additional arguments for the class.
     """
 
-    def __init__(self, **kwargs):
+    def __init__(self, max_num_faces=None, **kwargs):
         super().__init__()
+        self.max_num_faces = max_num_faces
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}()"
+        return f"{self.__class__.__name__}(max_num_faces={self.max_num_faces})"
 
     def lift_features(
         self, data: torch_geometric.data.Data | dict
@@ -33,6 +46,12 @@ class Concatenation(torch_geometric.transforms.BaseTransform):
         -------
         torch_geometric.data.Data | dict
             The lifted data.
+
+        Raises
+        ------
+        ValueError
+            If the cells of a rank have different numbers of faces and
+            `max_num_faces` is not set, or more faces than `max_num_faces`.
         """
         keys = sorted(
             [
@@ -46,19 +65,35 @@ class Concatenation(torch_geometric.transforms.BaseTransform):
                 idx_to_project = 0 if elem == "hyperedges" else int(elem) - 1
                 incidence = data["incidence_" + elem]
                 _, n = incidence.shape
+                num_faces = (
+                    self.max_num_faces
+                    if elem != "hyperedges" and int(elem) > 1
+                    else None
+                )
 
                 if n != 0:
-                    idxs_list = []
-                    for n_feature in range(n):
-                        idxs_for_feature = incidence.indices()[
-                            0, incidence.indices()[1, :] == n_feature
-                        ]
-                        idxs_list.append(torch.sort(idxs_for_feature)[0])
-
-                    idxs = torch.stack(idxs_list, dim=0)
-                    values = data[f"x_{idx_to_project}"][idxs].view(n, -1)
+                    idxs = get_cell_faces(incidence)
+                    if num_faces is None and (idxs < 0).any():
+                        raise ValueError(
+                            f"The cells of rank {elem} have different numbers of faces, set `max_num_faces` to concatenate their features."
+                        )
+                    if num_faces is not None:
+                        if idxs.shape[1] > num_faces:
+                            raise ValueError(
+                                f"The cells of rank {elem} have up to {idxs.shape[1]} faces, more than max_num_faces={num_faces}."
+                            )
+                        idxs = torch.nn.functional.pad(
+                            idxs, (0, num_faces - idxs.shape[1]), value=-1
+                        )
+                    values = (
+                        data[f"x_{idx_to_project}"][idxs.clamp(min=0)]
+                        .masked_fill((idxs < 0).unsqueeze(-1), 0)
+                        .view(n, -1)
+                    )
                 else:
-                    m = data[f"x_{int(elem)-1}"].shape[1] * (int(elem) + 1)
+                    m = data[f"x_{int(elem) - 1}"].shape[1] * (
+                        num_faces if num_faces is not None else int(elem) + 1
+                    )
                     values = torch.zeros([0, m])
 
                 data["x_" + elem] = values
@@ -3,10 +3,16 @@
 import torch
 import torch_geometric
 
+from topobenchmarkx.data.utils.utils import get_cell_faces
+
 
 class Set(torch_geometric.transforms.BaseTransform):
     r"""Lift r-cell features to r+1-cells by set operations.
 
+    Cells with fewer faces than the others, as in cell complexes with ragged
+    boundaries, are padded by repeating their first face, which leaves their
+    set of features unchanged.
+
     Parameters
     ----------
     **kwargs : optional
@@ -44,14 +50,8 @@ class Set(torch_geometric.transforms.BaseTransform):
                 _, n = incidence.shape
 
                 if n != 0:
-                    idxs_list = []
-                    for n_feature in range(n):
-                        idxs_for_feature = incidence.indices()[
-                            0, incidence.indices()[1, :] == n_feature
-                        ]
-                        idxs_list.append(torch.sort(idxs_for_feature)[0])
-
-                    idxs = torch.stack(idxs_list, dim=0)
+                    idxs = get_cell_faces(incidence)
+                    idxs = torch.where(idxs < 0, idxs[:, :1], idxs)
                     if elem == "1":
                         values = idxs
                     else:
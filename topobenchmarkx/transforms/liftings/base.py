@@ -14,14 +14,22 @@ class AbstractLifting(torch_geometric.transforms.BaseTransform):
     ----------
     feature_lifting : str, optional
         The feature lifting method to be used. Default is 'ProjectionSum'.
+    feature_lifting_kwargs : dict, optional
+        Arguments of the feature lifting, e.g. `max_num_faces` for the
+        Concatenation feature lifting. Default is None.
     **kwargs : optional
         Additional arguments for the class.
     """
 
-    def __init__(self, feature_lifting=None, **kwargs):
+    def __init__(
+        self, feature_lifting=None, feature_lifting_kwargs=None, **kwargs
+    ):
         super().__init__()
-        self.feature_lifting = FEATURE_LIFTINGS[feature_lifting]()
+        self.feature_lifting = FEATURE_LIFTINGS[feature_lifting](
+            **(feature_lifting_kwargs or {})
+        )
         self.neighborhoods = kwargs.get("neighborhoods")
+        self.lazy_connectivity = kwargs.get("lazy_connectivity", False)
 
     @abstractmethod
     def lift_topology(self, data: torch_geometric.data.Data) -> dict:
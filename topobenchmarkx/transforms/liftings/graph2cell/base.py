@@ -2,9 +2,13 @@
 
 import networkx as nx
 import torch
+import torch_geometric
 from toponetx.classes import CellComplex
 
-from topobenchmarkx.data.utils.utils import get_complex_connectivity
+from topobenchmarkx.data.utils.utils import (
+    get_complex_connectivity,
+    get_connectivity_from_boundaries,
+)
 from topobenchmarkx.transforms.liftings import GraphLifting
 
 
@@ -17,10 +21,21 @@ class Graph2CellLifting(GraphLifting):
         The dimension of the cell complex to be generated. Default is 2.
     **kwargs : optional
         Additional arguments for the class.
+
+    Raises
+    ------
+    ValueError
+        If `lazy_connectivity` is set: the orientation of the cells is lost
+        in the stored unsigned incidences, so the laplacians could not be
+        derived as in eager mode.
     """
 
     def __init__(self, complex_dim=2, **kwargs):
         super().__init__(**kwargs)
+        if self.lazy_connectivity:
+            raise ValueError(
+                "Lazy connectivity is not supported for cell complexes, their laplacians depend on the orientation of the cells."
+            )
         self.complex_dim = complex_dim
         self.type = "graph2cell"
 
@@ -42,7 +57,10 @@ class Graph2CellLifting(GraphLifting):
             The lifted topology.
         """
         lifted_topology = get_complex_connectivity(
-            cell_complex, self.complex_dim, neighborhoods=self.neighborhoods
+            cell_complex,
+            self.complex_dim,
+            neighborhoods=self.neighborhoods,
+            lazy=self.lazy_connectivity,
         )
         lifted_topology["x_0"] = torch.stack(
             list(cell_complex.get_cell_attributes("features", 0).values())
@@ -55,3 +73,61 @@ class Graph2CellLifting(GraphLifting):
                 list(cell_complex.get_cell_attributes("features", 1).values())
             )
         return lifted_topology
+
+    def _get_lifted_topology_from_boundaries(
+        self,
+        boundaries: dict[int, torch.Tensor],
+        edges: torch.Tensor,
+        data: torch_geometric.data.Data,
+    ) -> dict:
+        r"""Return the lifted topology of a complex given by its boundaries.
+
+        The output matches `_get_lifted_topology` on the equivalent TopoNetX
+        cell complex, without building it, except that the edge attributes
+        always follow the order of the edges in the incidence matrices.
+
+        Parameters
+        ----------
+        boundaries : dict[int, torch.Tensor]
+            Signed boundary matrices, indexed by rank.
+        edges : torch.Tensor
+            Edges of the complex, sorted lexicographically, of shape
+            `(num_edges, 2)`.
+        data : torch_geometric.data.Data
+            The input graph.
+
+        Returns
+        -------
+        dict
+            The lifted topology.
+        """
+        shape = [data.x.shape[0]] + [
+            boundaries[rank].shape[1] for rank in range(1, len(boundaries))
+        ]
+        lifted_topology = get_connectivity_from_boundaries(
+            boundaries,
+            shape,
+            self.complex_dim,
+            neighborhoods=self.neighborhoods,
+            cell_adjacency=True,
+            lazy=self.lazy_connectivity,
+        )
+        lifted_topology["x_0"] = data.x
+        self.contains_edge_attr = (
+            self.preserve_edge_attr and self._data_has_edge_attr(data)
+        )
+        num_nodes = data.x.shape[0]
+        low = torch.minimum(data.edge_index[0], data.edge_index[1])
+        high = torch.maximum(data.edge_index[0], data.edge_index[1])
+        keys = low * num_nodes + high
+        if self.contains_edge_attr and len(edges) == len(torch.unique(keys)):
+            # Each edge takes the attribute of its last occurrence
+            position = torch.searchsorted(
+                edges[:, 0] * num_nodes + edges[:, 1], keys
+            )
+            last = torch.full((len(edges),), -1, dtype=torch.long)
+            last = last.scatter_reduce(
+                0, position, torch.arange(len(keys)), reduce="amax"
+            )
+            lifted_topology["x_1"] = data.edge_attr[last]
+        return lifted_topology
@@ -1,9 +1,12 @@
 """This module implements the cycle lifting for graphs to cell complexes."""
 
-import networkx as nx
 import torch_geometric
-from toponetx.classes import CellComplex
 
+from topobenchmarkx.data.utils.clique_utils import get_undirected_edges
+from topobenchmarkx.data.utils.cycle_utils import (
+    get_cell_boundary_matrices,
+    get_cycle_basis,
+)
 from topobenchmarkx.transforms.liftings.graph2cell.base import (
     Graph2CellLifting,
 )
@@ -13,6 +16,10 @@ class CellCycleLifting(Graph2CellLifting):
     r"""Lift graphs to cell complexes.
 
     The algorithm creates 2-cells by identifying the cycles and considering them as 2-cells.
+    The cycles are the fundamental cycles of the depth-first, stack-based spanning forest of
+    `networkx.cycle_basis` (Paton, 1969), and the connectivity matrices are built with sparse tensor
+    operations, without going through NetworkX and TopoNetX. The forest is still grown by a sequential
+    Python loop, see `get_cycle_basis`.
 
     Parameters
     ----------
@@ -40,17 +47,14 @@ class CellCycleLifting(Graph2CellLifting):
         dict
             The lifted topology.
         """
-        G = self._generate_graph_from_data(data)
-        cycles = nx.cycle_basis(G)
-        cell_complex = CellComplex(G)
-
-        # Eliminate self-loop cycles
-        cycles = [cycle for cycle in cycles if len(cycle) != 1]
-        # Eliminate cycles that are greater than the max_cell_lenght
-        if self.max_cell_length is not None:
-            cycles = [
-                cycle for cycle in cycles if len(cycle) <= self.max_cell_length
-            ]
-        if len(cycles) != 0:
-            cell_complex.add_cells_from(cycles, rank=self.complex_dim)
-        return self._get_lifted_topology(cell_complex, G)
+        num_nodes = data.x.shape[0]
+        ptr, nodes = get_cycle_basis(
+            data.edge_index, num_nodes, self.max_cell_length
+        )
+        edges = get_undirected_edges(
+            data.edge_index, num_nodes, remove_self_loops=False
+        )
+        boundaries = get_cell_boundary_matrices(edges, ptr, nodes, num_nodes)
+        return self._get_lifted_topology_from_boundaries(
+            boundaries, edges, data
+        )
@@ -1,8 +1,8 @@
 """This module implements the k-hop lifting of graphs to hypergraphs."""
 
-import torch
 import torch_geometric
 
+from topobenchmarkx.data.utils.khop_utils import get_k_hop_neighborhoods
 from topobenchmarkx.transforms.liftings.graph2hypergraph import (
     Graph2HypergraphLifting,
 )
@@ -13,7 +13,8 @@ class HypergraphKHopLifting(Graph2HypergraphLifting):
 
     The class transforms graphs to hypergraph domain by considering k-hop neighborhoods of
     a node. This lifting extracts a number of hyperedges equal to the number of
-    nodes in the graph.
+    nodes in the graph. The neighborhoods of all the nodes are computed at once with sparse
+    products and the incidence matrix is built directly as a sparse tensor.
 
     Parameters
     ----------
@@ -49,33 +50,13 @@ class HypergraphKHopLifting(Graph2HypergraphLifting):
         else:
             num_nodes = data.num_nodes
 
-        incidence_1 = torch.zeros(num_nodes, num_nodes)
-        edge_index = torch_geometric.utils.to_undirected(data.edge_index)
-
-        # Detect isolated nodes
-        isolated_nodes = [
-            i for i in range(num_nodes) if i not in edge_index[0]
-        ]
-        if len(isolated_nodes) > 0:
-            # Add completely isolated nodes to the edge_index
-            edge_index = torch.cat(
-                [
-                    edge_index,
-                    torch.tensor(
-                        [isolated_nodes, isolated_nodes], dtype=torch.long
-                    ),
-                ],
-                dim=1,
-            )
-
-        for n in range(num_nodes):
-            neighbors, _, _, _ = torch_geometric.utils.k_hop_subgraph(
-                n, self.k, edge_index
-            )
-            incidence_1[n, neighbors] = 1
-
+        # Row n lists the hyperedges containing node n, and the hyperedge of
+        # node n contains its k-hop neighborhood, so the incidence matrix is
+        # the (symmetric) k-hop neighborhood matrix
+        incidence_1 = get_k_hop_neighborhoods(
+            data.edge_index, num_nodes, self.k
+        )
         num_hyperedges = incidence_1.shape[1]
-        incidence_1 = torch.Tensor(incidence_1).to_sparse_coo()
         return {
             "incidence_hyperedges": incidence_1,
             "num_hyperedges": num_hyperedges,
@@ -11,12 +11,19 @@ from topobenchmarkx.transforms.liftings.graph2hypergraph import (
 class HypergraphKNNLifting(Graph2HypergraphLifting):
     r"""Lift graphs to hypergraph domain by considering k-nearest neighbors.
 
+    The nearest neighbors are computed in chunks of rows of the pairwise
+    distance matrix, so that the memory does not grow quadratically with the
+    number of nodes, and the incidence matrix is built directly as a sparse
+    tensor. Ties are broken in favour of the nodes with the smallest indices.
+
     Parameters
     ----------
     k_value : int, optional
         The number of nearest neighbors to consider. Must be positive. Default is 1.
     loop : bool, optional
         If True the hyperedges will contain the node they were created from.
+    chunk_size : int, optional
+        Maximum number of pairwise distances computed at once. Default is 2**24.
     **kwargs : optional
         Additional arguments for the class.
 
@@ -28,7 +35,7 @@ class HypergraphKNNLifting(Graph2HypergraphLifting):
         If k_value is not an integer or if loop is not a boolean.
     """
 
-    def __init__(self, k_value=1, loop=True, **kwargs):
+    def __init__(self, k_value=1, loop=True, chunk_size=2**24, **kwargs):
         super().__init__(**kwargs)
 
         # Validate k_value
@@ -43,7 +50,7 @@ class HypergraphKNNLifting(Graph2HypergraphLifting):
 
         self.k = k_value
         self.loop = loop
-        self.transform = torch_geometric.transforms.KNNGraph(self.k, self.loop)
+        self.chunk_size = chunk_size
 
     def lift_topology(self, data: torch_geometric.data.Data) -> dict:
         r"""Lift a graph to hypergraph by considering k-nearest neighbors.
@@ -59,47 +66,76 @@ class HypergraphKNNLifting(Graph2HypergraphLifting):
             The lifted topology.
         """
         num_nodes = data.x.shape[0]
-        data.pos = data.x
         num_hyperedges = num_nodes
-        incidence_1 = torch.zeros(num_nodes, num_nodes)
-        data_lifted = self.transform(data)
-        # check for loops, since KNNGraph is inconsistent with nodes with equal features
-        if self.loop:
-            for i in range(num_nodes):
-                if not torch.any(
-                    torch.all(
-                        data_lifted.edge_index == torch.tensor([[i, i]]).T,
-                        dim=0,
-                    )
-                ):
-                    connected_nodes = data_lifted.edge_index[
-                        0, data_lifted.edge_index[1] == i
-                    ]
-                    dists = torch.sqrt(
-                        torch.sum(
-                            (
-                                data.pos[connected_nodes]
-                                - data.pos[i].unsqueeze(0) ** 2
-                            ),
-                            dim=1,
-                        )
-                    )
-                    furthest = torch.argmax(dists)
-                    idx = torch.where(
-                        torch.all(
-                            data_lifted.edge_index
-                            == torch.tensor(
-                                [[connected_nodes[furthest], i]]
-                            ).T,
-                            dim=0,
-                        )
-                    )[0]
-                    data_lifted.edge_index[:, idx] = torch.tensor([[i, i]]).T
-
-        incidence_1[data_lifted.edge_index[1], data_lifted.edge_index[0]] = 1
-        incidence_1 = torch.Tensor(incidence_1).to_sparse_coo()
+        rows, cols = self._get_nearest_neighbors(data.x)
+        incidence_1 = torch.sparse_coo_tensor(
+            torch.stack([rows, cols]),
+            torch.ones(len(rows)),
+            (num_nodes, num_hyperedges),
+        ).coalesce()
         return {
             "incidence_hyperedges": incidence_1,
             "num_hyperedges": num_hyperedges,
             "x_0": data.x,
         }
+
+    def _get_nearest_neighbors(self, x: torch.Tensor) -> tuple:
+        r"""Compute the k nearest neighbors of every node.
+
+        When `loop` is True, every node is its own nearest neighbor, even if
+        other nodes have the same features.
+
+        Parameters
+        ----------
+        x : torch.Tensor
+            Node features, of shape `(num_nodes, num_features)`.
+
+        Returns
+        -------
+        tuple[torch.Tensor, torch.Tensor]
+            Indices of the nodes and of their nearest neighbors.
+        """
+        num_nodes = x.shape[0]
+        k = min(self.k, num_nodes if self.loop else num_nodes - 1)
+        if k < 1:
+            empty = torch.empty(0, dtype=torch.long)
+            return empty, empty
+        x = x.float().view(num_nodes, -1)
+        chunk_rows = max(1, self.chunk_size // num_nodes)
+        squared_norms = (x * x).sum(dim=1)
+        rows, cols = [], []
+        for start in range(0, num_nodes, chunk_rows):
+            end = min(start + chunk_rows, num_nodes)
+            chunk = torch.arange(end - start)
+            # Squared distances, up to the norm of the chunk nodes, which does
+            # not change the order of the neighbors
+            distances = torch.addmm(
+                squared_norms.unsqueeze(0), x[start:end], x.t(), alpha=-2
+            )
+            distances[chunk, chunk + start] = (
+                -float("inf") if self.loop else float("inf")
+            )
+            # One more neighbor tells whether the k-th distance is tied
+            values, neighbors = torch.topk(
+                distances, min(k + 1, num_nodes), dim=1, largest=False
+            )
+            threshold = values[:, k - 1 : k]
+            neighbors = neighbors[:, :k]
+            tied = torch.empty(0, dtype=torch.long)
+            if values.shape[1] > k:
+                tied = torch.nonzero(values[:, k] == values[:, k - 1])
+                tied = tied.squeeze(1)
+            # Break these ties in favour of the smallest indices, so that the
+            # result does not depend on topk
+            if len(tied) > 0:
+                closer = distances[tied] < threshold[tied]
+                at_threshold = distances[tied] == threshold[tied]
+                num_missing = k - closer.sum(dim=1, keepdim=True)
+                selected = closer | (
+                    at_threshold
+                    & (torch.cumsum(at_threshold, dim=1) <= num_missing)
+                )
+                neighbors[tied] = torch.nonzero(selected)[:, 1].view(-1, k)
+            rows.append((chunk + start).repeat_interleave(k))
+            cols.append(neighbors.flatten())
+        return torch.cat(rows), torch.cat(cols)
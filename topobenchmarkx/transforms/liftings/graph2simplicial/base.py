@@ -2,9 +2,14 @@
 
 import networkx as nx
 import torch
+import torch_geometric
 from toponetx.classes import SimplicialComplex
 
-from topobenchmarkx.data.utils.utils import get_complex_connectivity
+from topobenchmarkx.data.utils.clique_utils import get_boundary_matrices
+from topobenchmarkx.data.utils.utils import (
+    get_complex_connectivity,
+    get_connectivity_from_boundaries,
+)
 from topobenchmarkx.transforms.liftings import GraphLifting
 
 
@@ -47,6 +52,7 @@ class Graph2SimplicialLifting(GraphLifting):
             self.complex_dim,
             neighborhoods=self.neighborhoods,
             signed=self.signed,
+            lazy=self.lazy_connectivity,
         )
         lifted_topology["x_0"] = torch.stack(
             list(
@@ -67,3 +73,60 @@ class Graph2SimplicialLifting(GraphLifting):
                 )
             )
         return lifted_topology
+
+    def _get_lifted_topology_from_simplices(
+        self, simplices: list[torch.Tensor], data: torch_geometric.data.Data
+    ) -> dict:
+        r"""Return the lifted topology of a complex given by its simplices.
+
+        The output matches `_get_lifted_topology` on the equivalent TopoNetX
+        simplicial complex, without building it.
+
+        Parameters
+        ----------
+        simplices : list[torch.Tensor]
+            Simplices of each rank, whose rows are sorted vertex indices,
+            sorted lexicographically.
+        data : torch_geometric.data.Data
+            The input graph.
+
+        Returns
+        -------
+        dict
+            The lifted topology.
+        """
+        lifted_topology = get_connectivity_from_boundaries(
+            get_boundary_matrices(simplices),
+            [len(rank_simplices) for rank_simplices in simplices],
+            self.complex_dim,
+            neighborhoods=self.neighborhoods,
+            signed=self.signed,
+            lazy=self.lazy_connectivity,
+        )
+        lifted_topology["x_0"] = data.x
+        self.contains_edge_attr = (
+            self.preserve_edge_attr and self._data_has_edge_attr(data)
+        )
+        num_nodes = data.x.shape[0]
+        low = torch.minimum(data.edge_index[0], data.edge_index[1])
+        high = torch.maximum(data.edge_index[0], data.edge_index[1])
+        keys = low * num_nodes + high
+        # Self-loops count as graph edges but not as simplices, so the edge
+        # attributes are discarded as when new edges are added
+        if (
+            self.contains_edge_attr
+            and len(simplices) > 1
+            and not torch.any(low == high)
+            and len(simplices[1]) == len(torch.unique(keys))
+        ):
+            edges = simplices[1]
+            # Each edge takes the attribute of its last occurrence
+            position = torch.searchsorted(
+                edges[:, 0] * num_nodes + edges[:, 1], keys
+            )
+            last = torch.full((len(edges),), -1, dtype=torch.long)
+            last = last.scatter_reduce(
+                0, position, torch.arange(len(keys)), reduce="amax"
+            )
+            lifted_topology["x_1"] = data.edge_attr[last]
+        return lifted_topology
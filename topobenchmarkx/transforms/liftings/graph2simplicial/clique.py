@@ -1,12 +1,8 @@
 """This module implements the CliqueLifting class, which lifts graphs to simplicial complexes."""
 
-from itertools import combinations
-from typing import Any
-
-import networkx as nx
 import torch_geometric
-from toponetx.classes import SimplicialComplex
 
+from topobenchmarkx.data.utils.clique_utils import get_clique_complex
 from topobenchmarkx.transforms.liftings.graph2simplicial import (
     Graph2SimplicialLifting,
 )
@@ -16,6 +12,8 @@ class SimplicialCliqueLifting(Graph2SimplicialLifting):
     r"""Lift graphs to simplicial complex domain.
 
     The algorithm creates simplices by identifying the cliques and considering them as simplices of the same dimension.
+    The cliques are enumerated and the connectivity matrices are built with sparse tensor operations, without going
+    through NetworkX and TopoNetX.
 
     Parameters
     ----------
@@ -39,18 +37,7 @@ class SimplicialCliqueLifting(Graph2SimplicialLifting):
         dict
             The lifted topology.
         """
-        graph = self._generate_graph_from_data(data)
-        simplicial_complex = SimplicialComplex(graph)
-        cliques = nx.find_cliques(graph)
-        simplices: list[set[tuple[Any, ...]]] = [
-            set() for _ in range(2, self.complex_dim + 1)
-        ]
-        for clique in cliques:
-            for i in range(2, self.complex_dim + 1):
-                for c in combinations(clique, i + 1):
-                    simplices[i - 2].add(tuple(c))
-
-        for set_k_simplices in simplices:
-            simplicial_complex.add_simplices_from(list(set_k_simplices))
-
-        return self._get_lifted_topology(simplicial_complex, graph)
+        simplices = get_clique_complex(
+            data.edge_index, data.x.shape[0], self.complex_dim
+        )
+        return self._get_lifted_topology_from_simplices(simplices, data)
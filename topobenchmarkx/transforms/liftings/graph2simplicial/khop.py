@@ -1,12 +1,13 @@
 """This module implements the k-hop lifting of graphs to simplicial complexes."""
 
-import random
+import warnings
 from itertools import combinations
-from typing import Any
 
+import torch
 import torch_geometric
-from toponetx.classes import SimplicialComplex
 
+from topobenchmarkx.data.utils.clique_utils import get_undirected_edges
+from topobenchmarkx.data.utils.khop_utils import sample_neighborhood_simplices
 from topobenchmarkx.transforms.liftings.graph2simplicial.base import (
     Graph2SimplicialLifting,
 )
@@ -21,17 +22,29 @@ class SimplicialKHopLifting(Graph2SimplicialLifting):
     added to the simplicial complex. For this reason this lifting does not
     conserve the initial graph topology.
 
+    The neighborhoods are computed in bulk and, for each dimension, up to
+    `max_k_simplices` simplices are sampled uniformly with a seeded reservoir,
+    without enumerating all the candidates at once. Dropping candidates raises
+    a warning with the number of dropped candidates of each rank, and the
+    totals over all the graphs lifted by this instance are accumulated in
+    `num_dropped_simplices`. When the lifting runs in worker processes, these
+    totals stay in the workers and only the warnings are reported.
+
     Parameters
     ----------
     max_k_simplices : int, optional
         The maximum number of k-simplices to consider. Default is 5000.
+    seed : int, optional
+        Seed of the sampling of the simplices. Default is 0.
     **kwargs : optional
         Additional arguments for the class.
     """
 
-    def __init__(self, max_k_simplices=5000, **kwargs):
+    def __init__(self, max_k_simplices=5000, seed=0, **kwargs):
         super().__init__(**kwargs)
         self.max_k_simplices = max_k_simplices
+        self.seed = seed
+        self.num_dropped_simplices = None
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(max_k_simplices={self.max_k_simplices!r})"
@@ -49,28 +62,53 @@ class SimplicialKHopLifting(Graph2SimplicialLifting):
         dict
             The lifted topology.
         """
-        graph = self._generate_graph_from_data(data)
-        simplicial_complex = SimplicialComplex(graph)
-        edge_index = torch_geometric.utils.to_undirected(data.edge_index)
-        simplices: list[set[tuple[Any, ...]]] = [
-            set() for _ in range(2, self.complex_dim + 1)
+        num_nodes = data.x.shape[0]
+        generator = torch.Generator().manual_seed(self.seed)
+        simplices = [
+            [torch.arange(num_nodes).unsqueeze(1)],
+            [get_undirected_edges(data.edge_index, num_nodes)],
         ]
-        for n in range(graph.number_of_nodes()):
-            # Find 1-hop node n neighbors
-            neighbors, _, _, _ = torch_geometric.utils.k_hop_subgraph(
-                n, 1, edge_index
+        simplices += [[] for _ in range(2, self.complex_dim)]
+        sampled, num_dropped = sample_neighborhood_simplices(
+            data.edge_index,
+            num_nodes,
+            self.complex_dim,
+            self.max_k_simplices,
+            generator=generator,
+        )
+        for size, size_simplices in sampled.items():
+            # The faces of the sampled simplices are added as well
+            for face_size in range(2, size + 1):
+                faces = list(combinations(range(size), face_size))
+                simplices[face_size - 1].append(
+                    size_simplices[:, faces].reshape(-1, face_size)
+                )
+
+        lifted_simplices = []
+        for rank_simplices in simplices:
+            rank_simplices = torch.unique(torch.cat(rank_simplices), dim=0)
+            if len(rank_simplices) == 0:
+                break
+            lifted_simplices.append(rank_simplices)
+        lifted_topology = self._get_lifted_topology_from_simplices(
+            lifted_simplices, data
+        )
+        # Number of dropped candidates of each rank, kept out of the data so
+        # that it is not collated with the model inputs
+        dropped = {
+            size - 1: count
+            for size, count in sorted(num_dropped.items())
+            if count
+        }
+        if self.num_dropped_simplices is None:
+            self.num_dropped_simplices = torch.zeros(
+                self.complex_dim + 1, dtype=torch.long
+            )
+        for rank, count in dropped.items():
+            self.num_dropped_simplices[rank] += count
+        if dropped:
+            warnings.warn(
+                f"{self.__class__.__name__} kept at most max_k_simplices={self.max_k_simplices} simplices per rank and dropped {dropped} candidates (rank: count).",
+                stacklevel=2,
             )
-            if n not in neighbors:
-                neighbors.append(n)
-            neighbors = neighbors.numpy()
-            neighbors = set(neighbors)
-            for i in range(1, self.complex_dim):
-                for c in combinations(neighbors, i + 1):
-                    simplices[i - 1].add(tuple(c))
-        for set_k_simplices in simplices:
-            list_k_simplices = list(set_k_simplices)
-            if len(set_k_simplices) > self.max_k_simplices:
-                random.shuffle(list_k_simplices)
-                list_k_simplices = list_k_simplices[: self.max_k_simplices]
-            simplicial_complex.add_simplices_from(list_k_simplices)
-        return self._get_lifted_topology(simplicial_complex, graph)
+        return lifted_topology